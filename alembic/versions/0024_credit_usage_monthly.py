@@ -0,0 +1,51 @@
+"""add credit_usage_monthly counters
+
+Revision ID: 0024_credit_usage_monthly
+Revises: 0023_fsm_states
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0024_credit_usage_monthly"
+down_revision = "0023_fsm_states"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "credit_usage_monthly",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("basic_used_seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("topup_used_seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("charge_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=True,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO credit_usage_monthly
+            (user_id, month, basic_used_seconds, topup_used_seconds, charge_count)
+        SELECT
+            user_id,
+            date_trunc('month', created_at)::date,
+            -SUM(basic_delta_seconds),
+            -SUM(topup_delta_seconds),
+            COUNT(*)
+        FROM credit_ledger
+        WHERE event_type = 'charge' AND created_at IS NOT NULL
+        GROUP BY user_id, date_trunc('month', created_at)::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("credit_usage_monthly")
@@ -0,0 +1,27 @@
+"""add review_logs.review_key for idempotent buffered reviews
+
+Revision ID: 0025_review_log_review_key
+Revises: 0024_credit_usage_monthly
+Create Date: 2026-10-17 15:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0025_review_log_review_key"
+down_revision = "0024_credit_usage_monthly"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("review_logs", sa.Column("review_key", sa.String(length=36), nullable=True))
+    op.create_index(
+        "ix_review_logs_review_key", "review_logs", ["review_key"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_review_logs_review_key", table_name="review_logs")
+    op.drop_column("review_logs", "review_key")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import pickle
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.config import settings
+from app.db.repo.fsm_states import (
+    list_expired_fsm_states,
+    load_fsm_state,
+    purge_expired_fsm_states,
+    save_fsm_data,
+    save_fsm_state,
+)
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger("fsm.storage")
+
+_CACHE_MAX_KEYS = 10_000
+
+# Called with the data of a state that is dropped without its handler finishing it
+# (TTL expiry, or shutdown for the in-memory storage).
+ExpireHook = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def _encode(data: dict[str, Any]) -> bytes | None:
+    if not data:
+        return None
+    return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(raw: bytes | None) -> dict[str, Any]:
+    if not raw:
+        return {}
+    return pickle.loads(raw)
+
+
+async def _run_expire_hook(hook: ExpireHook, state: str, data: dict[str, Any]) -> bool:
+    try:
+        await hook(data)
+    except Exception:
+        logger.exception("FSM_EXPIRE_HOOK_ERROR state=%s", state)
+        return False
+    return True
+
+
+class PostgresStorage(BaseStorage):
+    def __init__(
+        self, ttl_seconds: int | None = None, expire_hooks: dict[str, ExpireHook] | None = None
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.expire_hooks = expire_hooks or {}
+        # key -> (version, state, data); a row is only re-read when its version moved.
+        self._cache: OrderedDict[str, tuple[int, str | None, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(
+            str(part)
+            for part in (
+                key.bot_id,
+                key.chat_id,
+                key.user_id,
+                key.thread_id or 0,
+                key.business_connection_id or "",
+                key.destiny,
+            )
+        )
+
+    def _expires_at(self) -> datetime | None:
+        if not self.ttl_seconds:
+            return None
+        return datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+
+    def _remember(self, key: str, version: int, state: str | None, data: dict[str, Any]) -> None:
+        self._cache[key] = (version, state, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > _CACHE_MAX_KEYS:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: str) -> tuple[str | None, dict[str, Any]]:
+        cached = self._cache.get(key)
+        async with AsyncSessionLocal() as session:
+            row = await load_fsm_state(session, key, cached[0] if cached else None)
+        if row is None:
+            self._cache.pop(key, None)
+            return None, {}
+        version, state, raw = row
+        if cached and cached[0] == version:
+            data = cached[2]
+        else:
+            data = _decode(raw)
+        self._remember(key, version, state, data)
+        return state, data
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self._key(key)
+        value = state.state if isinstance(state, State) else state
+        async with AsyncSessionLocal() as session:
+            version = await save_fsm_state(session, storage_key, value, self._expires_at())
+        cached = self._cache.get(storage_key)
+        if cached and cached[0] == version - 1:
+            self._remember(storage_key, version, value, cached[2])
+        else:
+            self._cache.pop(storage_key, None)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state, _ = await self._load(self._key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        storage_key = self._key(key)
+        payload = dict(data)
+        async with AsyncSessionLocal() as session:
+            version = await save_fsm_data(
+                session, storage_key, _encode(payload), self._expires_at()
+            )
+        cached = self._cache.get(storage_key)
+        if cached and cached[0] == version - 1:
+            self._remember(storage_key, version, cached[1], payload)
+        else:
+            self._cache.pop(storage_key, None)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data = await self._load(self._key(key))
+        return dict(data)
+
+    async def purge_expired(self) -> None:
+        now = datetime.utcnow()
+        failed: list[str] = []
+        async with AsyncSessionLocal() as session:
+            expired = []
+            if self.expire_hooks:
+                expired = await list_expired_fsm_states(session, self.expire_hooks, now)
+        for key, state, raw in expired:
+            if not await _run_expire_hook(self.expire_hooks[state], state, _decode(raw)):
+                failed.append(key)
+        # Rows whose hook failed stay for the next run; hooks must tolerate a retry.
+        async with AsyncSessionLocal() as session:
+            removed = await purge_expired_fsm_states(session, now, keep=failed)
+        if removed:
+            logger.info("FSM_PURGE removed=%s", removed)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class HookedMemoryStorage(MemoryStorage):
+    # Everything is lost on shutdown, so hand the hooked states to their hooks first.
+    def __init__(self, expire_hooks: dict[str, ExpireHook] | None = None) -> None:
+        super().__init__()
+        self.expire_hooks = expire_hooks or {}
+
+    async def close(self) -> None:
+        for record in list(self.storage.values()):
+            hook = self.expire_hooks.get(record.state) if record.state else None
+            if hook is not None:
+                await _run_expire_hook(hook, record.state, dict(record.data))
+        self.storage.clear()
+
+
+def build_fsm_storage(expire_hooks: dict[str, ExpireHook] | None = None) -> BaseStorage:
+    if settings.fsm_storage == "postgres":
+        return PostgresStorage(
+            ttl_seconds=settings.fsm_state_ttl_seconds, expire_hooks=expire_hooks
+        )
+    return HookedMemoryStorage(expire_hooks=expire_hooks)
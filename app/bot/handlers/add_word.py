@@ -13,10 +13,9 @@ from app.config import settings
 from app.db.repo.users import get_user_by_telegram_id
 from app.db.repo.words import create_word_with_review, get_word_by_user_word
 from app.db.session import AsyncSessionLocal
-from app.db.repo.translation_cache import get_cached_translation, save_translation
 from app.db.repo.user_settings import get_or_create_user_settings
-from app.services.feature_flags import is_feature_enabled
-from app.services.translation import translate
+from app.services.feature_flags import is_feature_enabled_cached
+from app.services.translation import TranslationLookup, suggest_translation
 from app.utils.bad_words import contains_bad_words
 from app.services.i18n import b, t
 
@@ -162,63 +161,57 @@ async def add_word_word(message: Message, state: FSMContext) -> None:
         )
         return
 
-    async with AsyncSessionLocal() as session:
-        user = await get_user_by_telegram_id(session, message.from_user.id)
-        if not user:
-            await message.answer(t("common.start_required"))
-            await state.clear()
-            return
-        user_settings = await get_or_create_user_settings(session, user)
-        existing = await get_word_by_user_word(session, user.id, word)
-        if existing:
-            lines = [
-                t("add_word.word_exists_header"),
-                t("add_word.word_line", word=existing.word),
-                t("add_word.translation_line", translation=existing.translation),
-            ]
-            if existing.example:
-                lines.append(t("add_word.example_line", example=existing.example))
-            if existing.pos:
-                lines.append(t("add_word.pos_line", pos=existing.pos))
+    translation_enabled = is_feature_enabled_cached("translation")
+    lookup = TranslationLookup(word)
+    try:
+        async with AsyncSessionLocal() as session:
+            user = await get_user_by_telegram_id(session, message.from_user.id)
+            if not user:
+                await message.answer(t("common.start_required"))
+                await state.clear()
+                return
+            user_settings = await get_or_create_user_settings(session, user)
+            suggest = (
+                translation_enabled
+                and user_settings.translation_enabled
+                and user_settings.auto_translation_suggest
+            )
+            if suggest:
+                # On a memory and DB cache miss the API call starts here and overlaps the
+                # duplicate check below.
+                await lookup.check_db(session, speculate=settings.translation_speculative)
+            existing = await get_word_by_user_word(session, user.id, word)
+            if existing:
+                lines = [
+                    t("add_word.word_exists_header"),
+                    t("add_word.word_line", word=existing.word),
+                    t("add_word.translation_line", translation=existing.translation),
+                ]
+                if existing.example:
+                    lines.append(t("add_word.example_line", example=existing.example))
+                if existing.pos:
+                    lines.append(t("add_word.pos_line", pos=existing.pos))
+                await message.answer(
+                    "\n".join(lines),
+                    reply_markup=main_menu_kb(
+                        is_admin=message.from_user.id in settings.admin_user_ids,
+                        streak=user.current_streak,
+                    ),
+                )
+                await state.clear()
+                return
+
+        await state.update_data(word=word)
+        if not suggest:
+            await state.update_data(suggested_translation=None)
+            await state.set_state(AddWordStates.translation_suggest)
             await message.answer(
-                "\n".join(lines),
-                reply_markup=main_menu_kb(
-                    is_admin=message.from_user.id in settings.admin_user_ids,
-                    streak=user.current_streak,
-                ),
+                t("add_word.translation_disabled")
             )
-            await state.clear()
             return
-
-    await state.update_data(word=word)
-    async with AsyncSessionLocal() as session:
-        translation_enabled = await is_feature_enabled(session, "translation")
-    if (
-        not translation_enabled
-        or not user_settings.translation_enabled
-        or not user_settings.auto_translation_suggest
-    ):
-        await state.update_data(suggested_translation=None)
-        await state.set_state(AddWordStates.translation_suggest)
-        await message.answer(
-            t("add_word.translation_disabled")
-        )
-        return
-    normalized = " ".join(word.lower().split())
-    suggestion = None
-    async with AsyncSessionLocal() as session:
-        user = await get_user_by_telegram_id(session, message.from_user.id)
-        if user:
-            suggestion = await get_cached_translation(session, normalized, "en", "uz")
-    if suggestion and contains_bad_words(suggestion):
-        suggestion = None
-    if not suggestion:
-        suggestion = await translate(word)
-        if suggestion and contains_bad_words(suggestion):
-            suggestion = None
-        if suggestion:
-            async with AsyncSessionLocal() as session:
-                await save_translation(session, word, normalized, "en", "uz", suggestion)
+        suggestion = await lookup.result()
+    finally:
+        lookup.detach()
     await state.update_data(suggested_translation=suggestion)
     await state.set_state(AddWordStates.translation_suggest)
     if suggestion:
@@ -291,13 +284,7 @@ async def add_word_translation_retry(callback: CallbackQuery, state: FSMContext)
         )
         await callback.answer()
         return
-    suggestion = await translate(word)
-    if suggestion and contains_bad_words(suggestion):
-        suggestion = None
-    if suggestion:
-        normalized = " ".join(word.lower().split())
-        async with AsyncSessionLocal() as session:
-            await save_translation(session, word, normalized, "en", "uz", suggestion)
+    suggestion = await suggest_translation(word)
     await state.update_data(suggested_translation=suggestion)
     if suggestion:
         await callback.message.answer(
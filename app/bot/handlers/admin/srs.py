@@ -1,14 +1,16 @@
+from datetime import timedelta
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
 from app.bot.handlers.admin.common import ensure_admin_callback
 from app.bot.handlers.admin.states import AdminStates
-from app.bot.keyboards.admin.main import admin_back_kb
-from app.bot.keyboards.admin.srs import admin_srs_reset_kb
+from app.bot.keyboards.admin.srs import admin_srs_overview_kb, admin_srs_reset_kb
 from app.db.repo.admin import log_admin_action, reset_user_srs, srs_health_overview
 from app.db.session import AsyncSessionLocal
 from app.services.i18n import t
+from app.services.srs_forecast import forecast_due_load
 
 router = Router()
 
@@ -27,8 +29,41 @@ async def admin_srs_overview(callback: CallbackQuery, state: FSMContext) -> None
         ratio=f"{overview['due_ratio']:.0f}",
         top_again=top_lines,
     )
-    await callback.message.edit_text(text, reply_markup=admin_back_kb())
+    await callback.message.edit_text(text, reply_markup=admin_srs_overview_kb())
+    await callback.answer()
+
+
+@router.callback_query(F.data == "admin:srs:forecast")
+async def admin_srs_forecast(callback: CallbackQuery, state: FSMContext) -> None:
+    if not await ensure_admin_callback(callback):
+        return
     await callback.answer()
+    await callback.message.edit_text(t("admin_srs.forecast_running"))
+    forecast = await forecast_due_load()
+    if forecast is None:
+        await callback.message.edit_text(
+            t("admin_srs.forecast_failed"), reply_markup=admin_srs_overview_kb()
+        )
+        return
+    peak = max(forecast.daily, default=0)
+    peak_index = forecast.daily.index(peak) if forecast.daily else 0
+    rows = []
+    for offset, count in enumerate(forecast.daily):
+        day = forecast.start + timedelta(days=offset)
+        bar = "▇" * round(count / peak * 10) if peak else ""
+        rows.append(f"{day:%d.%m} {count:>7} {bar}")
+    text = t(
+        "admin_srs.forecast",
+        days=len(forecast.daily),
+        cards=forecast.cards,
+        overdue=forecast.overdue,
+        peak_day=f"{forecast.start + timedelta(days=peak_index):%d.%m}",
+        peak=peak,
+        rows="\n".join(rows),
+        load=f"{forecast.load_seconds:.1f}",
+        simulate=f"{forecast.simulate_seconds:.1f}",
+    )
+    await callback.message.edit_text(text, reply_markup=admin_srs_overview_kb())
 
 
 @router.callback_query(F.data == "admin:srs:reset")
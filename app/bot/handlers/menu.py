@@ -1,6 +1,7 @@
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.handlers.add_word import start_add_word_message
 from app.bot.handlers.quiz import start_quiz_message
@@ -10,14 +11,15 @@ from app.bot.handlers.practice.menu import practice_entry_text
 from app.bot.handlers.admin.entry import open_admin_panel
 from app.bot.handlers.admin.common import ensure_admin_message
 from app.bot.handlers.leaderboard.menu import open_leaderboard_menu
+from app.db.repo.user_context import UserContext
 from app.services.i18n import b
 
 router = Router()
 
 
 @router.message(F.text == b("menu.practice"))
-async def menu_training(message: Message, state: FSMContext) -> None:
-    await practice_entry_text(message, state)
+async def menu_training(message: Message, state: FSMContext, session: AsyncSession) -> None:
+    await practice_entry_text(message, state, session)
 
 
 @router.message(F.text == b("menu.quiz"))
@@ -48,10 +50,12 @@ async def menu_manage_words(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == b("menu.pronunciation"))
-async def menu_pronunciation(message: Message, state: FSMContext) -> None:
+async def menu_pronunciation(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     from app.bot.handlers.pronunciation import open_pronunciation_menu
 
-    await open_pronunciation_menu(message, state)
+    await open_pronunciation_menu(message, state, session, user_ctx)
 
 
 @router.message(F.text == b("menu.leaderboards"))
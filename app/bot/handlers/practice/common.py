@@ -3,18 +3,18 @@ from __future__ import annotations
 from typing import Iterable
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 from rapidfuzz.fuzz import ratio
 
+from app.config import settings
 from app.db.models import Word
-from app.db.repo.sessions import create_session, delete_session, get_session, update_session_word
-from app.db.repo.srs import apply_review, get_due_words, get_new_words
-from app.db.repo.user_settings import get_or_create_user_settings
-from app.db.repo.users import get_or_create_user
-from app.db.session import AsyncSessionLocal
+from app.db.repo.srs import apply_review
+from app.db.repo.user_context import UserContext
+from app.services.review_buffer import review_buffer
 
 
 SESSION_SIZE_DEFAULT = 10
@@ -53,56 +53,22 @@ async def edit_or_send(
     await state.update_data(practice_message_id=sent.message_id)
 
 
-async def ensure_session(user_id: int) -> tuple[int, bool]:
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, user_id)
-        settings = await get_or_create_user_settings(session, user)
-        existed = await get_session(session, user.id)
-        if existed:
-            await delete_session(session, user.id)
-        created = await create_session(session, user.id)
-        if not created:
-            await delete_session(session, user.id)
-            await create_session(session, user.id)
-        limit = settings.learning_words_per_day or SESSION_SIZE_DEFAULT
-        if limit < 1:
-            limit = SESSION_SIZE_DEFAULT
-        return user.id, limit
-
-
-async def build_due_items(telegram_id: int, limit: int) -> list[Word]:
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, telegram_id)
-        due_words = await get_due_words(session, user.id, limit)
-        return due_words
-
-
-async def build_new_items(telegram_id: int, limit: int) -> list[Word]:
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, telegram_id)
-        new_words = await get_new_words(session, user.id, limit)
-        return new_words
-
-
-async def update_current_review(user_id: int, word_id: int) -> None:
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, user_id)
-        await update_session_word(session, user.id, word_id)
-
-
-async def apply_rating(word_id: int, q: int) -> None:
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Word).where(Word.id == word_id))
-        word = result.scalar_one_or_none()
-        if not word:
-            return
-        await apply_review(session, word, q)
+def session_limit(user_ctx: UserContext) -> int:
+    limit = user_ctx.settings.learning_words_per_day or SESSION_SIZE_DEFAULT
+    if limit < 1:
+        limit = SESSION_SIZE_DEFAULT
+    return limit
 
 
-def pick_review(items: list[Word], idx: int) -> Word | None:
-    if idx < 0 or idx >= len(items):
-        return None
-    return items[idx]
+async def apply_rating(session: AsyncSession, user_ctx: UserContext, word_id: int, q: int) -> None:
+    if settings.review_write_behind:
+        await review_buffer.add(user_ctx.user_id, word_id, q)
+        return
+    result = await session.execute(select(Word).where(Word.id == word_id))
+    word = result.scalar_one_or_none()
+    if not word:
+        return
+    await apply_review(session, word, q)
 
 
 def as_list(value: Iterable[int] | None) -> list[int]:
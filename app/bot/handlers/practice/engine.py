@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiogram.fsm.context import FSMContext
+
+from app.bot.handlers.practice.common import init_stats
+from app.db.repo.srs import PracticeCard, get_practice_cards
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger("practice")
+
+# Start loading the next due batch when this many cards are left.
+PREFETCH_AHEAD = 2
+PREFETCH_TTL_SECONDS = 600
+
+
+class PracticeSession:
+    __slots__ = ("mode", "source", "cards", "idx", "stats")
+
+    def __init__(
+        self,
+        mode: str,
+        source: str,
+        cards: list[PracticeCard],
+        idx: int = 0,
+        stats: dict[str, int] | None = None,
+    ) -> None:
+        self.mode = mode
+        self.source = source
+        self.cards = cards
+        self.idx = idx
+        self.stats = stats or init_stats()
+
+    @property
+    def current(self) -> PracticeCard | None:
+        if 0 <= self.idx < len(self.cards):
+            return self.cards[self.idx]
+        return None
+
+    @property
+    def total(self) -> int:
+        return len(self.cards)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.cards) - self.idx
+
+    def rate(self, rating: str) -> None:
+        self.stats[rating] = self.stats.get(rating, 0) + 1
+
+    def advance(self) -> PracticeCard | None:
+        self.idx += 1
+        return self.current
+
+    def to_data(self) -> dict[str, Any]:
+        # Plain lists and dicts only, so any FSM storage can serialize it.
+        return {
+            "mode": self.mode,
+            "source": self.source,
+            "cards": [list(card) for card in self.cards],
+            "idx": self.idx,
+            "stats": dict(self.stats),
+        }
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any] | None) -> PracticeSession | None:
+        if not data:
+            return None
+        return cls(
+            mode=data["mode"],
+            source=data.get("source", "due"),
+            cards=[PracticeCard(*card) for card in data["cards"]],
+            idx=data.get("idx", 0),
+            stats=data.get("stats"),
+        )
+
+
+async def load_practice(state: FSMContext) -> PracticeSession | None:
+    data = await state.get_data()
+    return PracticeSession.from_data(data.get("practice"))
+
+
+async def save_practice(state: FSMContext, practice: PracticeSession) -> None:
+    await state.update_data(practice=practice.to_data())
+
+
+_prefetched: dict[int, tuple[asyncio.Task, float]] = {}
+
+
+async def _load_next_batch(user_id: int, limit: int, exclude_ids: list[int]) -> list[PracticeCard]:
+    async with AsyncSessionLocal() as session:
+        return await get_practice_cards(session, user_id, limit, exclude_ids=exclude_ids)
+
+
+def maybe_prefetch(practice: PracticeSession, user_id: int, limit: int) -> None:
+    if practice.source != "due" or practice.remaining > PREFETCH_AHEAD:
+        return
+    now = time.monotonic()
+    for key, (task, created_at) in list(_prefetched.items()):
+        if now - created_at > PREFETCH_TTL_SECONDS:
+            task.cancel()
+            _prefetched.pop(key, None)
+    if user_id in _prefetched:
+        return
+    exclude_ids = [card.id for card in practice.cards]
+    task = asyncio.get_running_loop().create_task(_load_next_batch(user_id, limit, exclude_ids))
+    _prefetched[user_id] = (task, now)
+
+
+async def take_prefetched(user_id: int) -> list[PracticeCard]:
+    entry = _prefetched.pop(user_id, None)
+    if entry is None:
+        return []
+    task, created_at = entry
+    if time.monotonic() - created_at > PREFETCH_TTL_SECONDS:
+        task.cancel()
+        return []
+    try:
+        return await task
+    except Exception:
+        logger.exception("PRACTICE_PREFETCH_ERROR user_id=%s", user_id)
+        return []
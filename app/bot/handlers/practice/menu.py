@@ -1,37 +1,36 @@
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards.main import main_menu_kb
 from app.bot.keyboards.practice import practice_due_empty_kb, practice_menu_kb
 from app.config import settings
-from app.bot.handlers.practice.common import (
-    build_due_items,
-    build_new_items,
-    edit_or_send,
-    ensure_session,
-    init_stats,
-    update_current_review,
-)
+from app.bot.handlers.practice.common import edit_or_send, session_limit
+from app.bot.handlers.practice.engine import PracticeSession, save_practice, take_prefetched
 from app.bot.handlers.practice.states import PracticeStates
 from app.bot.handlers.practice.summary import show_summary
-from app.db.session import AsyncSessionLocal
-from app.db.repo.users import get_or_create_user
+from app.db.repo.sessions import upsert_session
+from app.db.repo.srs import get_practice_cards
+from app.db.repo.user_context import UserContext
 from app.services.feature_flags import is_feature_enabled
 from app.services.i18n import b, t
 
 router = Router()
 
 
-async def _start_mode(message: Message, state: FSMContext, mode: str, user_id: int) -> None:
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "practice"):
-            await message.answer(t("practice.disabled"))
-            await state.clear()
-            return
-    _, limit = await ensure_session(user_id)
-    items = await build_due_items(user_id, limit)
-    if not items:
+async def _start_mode(
+    message: Message, state: FSMContext, mode: str, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    if not await is_feature_enabled(session, "practice"):
+        await message.answer(t("practice.disabled"))
+        await state.clear()
+        return
+    limit = session_limit(user_ctx)
+    cards = await take_prefetched(user_ctx.user_id) or await get_practice_cards(
+        session, user_ctx.user_id, limit
+    )
+    if not cards:
         await state.set_state(PracticeStates.due_confirm)
         await state.update_data(pending_mode=mode)
         await edit_or_send(
@@ -42,21 +41,15 @@ async def _start_mode(message: Message, state: FSMContext, mode: str, user_id: i
         )
         return
 
-    await state.update_data(
-        word_ids=[word.id for word in items],
-        items=items,
-        idx=0,
-        mode=mode,
-        stats=init_stats(),
-    )
-    await update_current_review(user_id, items[0].id)
-    start_line = t("practice.start_due", count=len(items))
+    await save_practice(state, PracticeSession(mode, "due", cards))
+    await upsert_session(session, user_ctx.user_id, cards[0].id)
+    start_line = t("practice.start_due", count=len(cards))
     if mode == "quick":
         await state.set_state(PracticeStates.quick_word)
         await edit_or_send(
             message,
             state,
-            f"{start_line}\n\n{_quick_word_text(1, len(items), items[0].word)}",
+            f"{start_line}\n\n{_quick_word_text(1, len(cards), cards[0].word)}",
             reply_markup=_quick_step_kb(),
         )
     else:
@@ -64,7 +57,7 @@ async def _start_mode(message: Message, state: FSMContext, mode: str, user_id: i
         await edit_or_send(
             message,
             state,
-            f"{start_line}\n\n{_recall_prompt_text(items[0].translation)}",
+            f"{start_line}\n\n{_recall_prompt_text(cards[0].translation)}",
             reply_markup=_recall_prompt_kb(),
         )
 
@@ -90,13 +83,12 @@ def _recall_prompt_kb():
 
 
 @router.callback_query(F.data == "menu:training")
-async def practice_entry(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_entry(callback: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
     await callback.message.edit_reply_markup(reply_markup=None)
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "practice"):
-            await callback.message.answer(t("practice.disabled"))
-            await callback.answer()
-            return
+    if not await is_feature_enabled(session, "practice"):
+        await callback.message.answer(t("practice.disabled"))
+        await callback.answer()
+        return
     await state.set_state(PracticeStates.menu)
     await callback.message.answer(
         t("practice.menu_prompt"), reply_markup=practice_menu_kb()
@@ -105,52 +97,48 @@ async def practice_entry(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.message(F.text == b("menu.practice"))
-async def practice_entry_text(message: Message, state: FSMContext) -> None:
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "practice"):
-            await message.answer(t("practice.disabled"))
-            return
+async def practice_entry_text(message: Message, state: FSMContext, session: AsyncSession) -> None:
+    if not await is_feature_enabled(session, "practice"):
+        await message.answer(t("practice.disabled"))
+        return
     await state.set_state(PracticeStates.menu)
     await message.answer(t("practice.menu_prompt"), reply_markup=practice_menu_kb())
 
 
 @router.callback_query(F.data.startswith("practice:mode:"))
-async def practice_mode(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_mode(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     mode = callback.data.split(":")[-1]
     if mode not in {"quick", "recall"}:
         await callback.answer()
         return
     await callback.message.edit_reply_markup(reply_markup=None)
-    await _start_mode(callback.message, state, mode, callback.from_user.id)
+    await _start_mode(callback.message, state, mode, session, user_ctx)
     await callback.answer()
 
 
 @router.callback_query(PracticeStates.due_confirm, F.data == "practice:due:new")
-async def practice_due_new(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_due_new(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     data = await state.get_data()
     mode = data.get("pending_mode", "quick")
-    _, limit = await ensure_session(callback.from_user.id)
-    items = await build_new_items(callback.from_user.id, limit)
-    if not items:
+    cards = await get_practice_cards(session, user_ctx.user_id, session_limit(user_ctx), new=True)
+    if not cards:
         await callback.message.edit_text(t("practice.no_new"))
         await state.clear()
         await callback.answer()
         return
-    await state.update_data(
-        word_ids=[word.id for word in items],
-        items=items,
-        idx=0,
-        mode=mode,
-        stats=init_stats(),
-    )
-    await update_current_review(callback.from_user.id, items[0].id)
-    start_line = t("practice.start_new", count=len(items))
+    await save_practice(state, PracticeSession(mode, "new", cards))
+    await upsert_session(session, user_ctx.user_id, cards[0].id)
+    start_line = t("practice.start_new", count=len(cards))
     if mode == "quick":
         await state.set_state(PracticeStates.quick_word)
         await edit_or_send(
             callback.message,
             state,
-            f"{start_line}\n\n{_quick_word_text(1, len(items), items[0].word)}",
+            f"{start_line}\n\n{_quick_word_text(1, len(cards), cards[0].word)}",
             reply_markup=_quick_step_kb(),
         )
     else:
@@ -158,23 +146,21 @@ async def practice_due_new(callback: CallbackQuery, state: FSMContext) -> None:
         await edit_or_send(
             callback.message,
             state,
-            f"{start_line}\n\n{_recall_prompt_text(items[0].word)}",
+            f"{start_line}\n\n{_recall_prompt_text(cards[0].word)}",
             reply_markup=_recall_prompt_kb(),
         )
     await callback.answer()
 
 
 @router.callback_query(PracticeStates.due_confirm, F.data == "practice:due:exit")
-async def practice_due_exit(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_due_exit(callback: CallbackQuery, state: FSMContext, user_ctx: UserContext) -> None:
     await state.clear()
     await callback.message.edit_text(t("practice.back_to_menu"), reply_markup=None)
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        streak = user.current_streak
     await callback.message.answer(
         t("common.main_menu"),
         reply_markup=main_menu_kb(
-            is_admin=callback.from_user.id in settings.admin_user_ids, streak=streak
+            is_admin=callback.from_user.id in settings.admin_user_ids,
+            streak=user_ctx.user.current_streak,
         ),
     )
     await callback.answer()
@@ -190,22 +176,22 @@ async def practice_menu(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "practice:exit")
-async def practice_exit(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_exit(callback: CallbackQuery, state: FSMContext, user_ctx: UserContext) -> None:
     await state.clear()
     await callback.message.edit_text(t("practice.back_to_menu"), reply_markup=None)
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        streak = user.current_streak
     await callback.message.answer(
         t("common.main_menu"),
         reply_markup=main_menu_kb(
-            is_admin=callback.from_user.id in settings.admin_user_ids, streak=streak
+            is_admin=callback.from_user.id in settings.admin_user_ids,
+            streak=user_ctx.user.current_streak,
         ),
     )
     await callback.answer()
 
 
 @router.callback_query(F.data == "practice:stop")
-async def practice_stop(callback: CallbackQuery, state: FSMContext) -> None:
-    await show_summary(callback.message, state)
+async def practice_stop(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    await show_summary(callback.message, state, session, user_ctx)
     await callback.answer()
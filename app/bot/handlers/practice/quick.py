@@ -1,16 +1,19 @@
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards.practice import practice_quick_rate_kb, practice_quick_step_kb
-from app.bot.handlers.practice.common import (
-    apply_rating,
-    edit_or_send,
-    pick_review,
-    update_current_review,
+from app.bot.handlers.practice.common import apply_rating, edit_or_send, session_limit
+from app.bot.handlers.practice.engine import (
+    PracticeSession,
+    load_practice,
+    maybe_prefetch,
+    save_practice,
 )
 from app.bot.handlers.practice.states import PracticeStates
 from app.bot.handlers.practice.summary import show_summary
+from app.db.repo.user_context import UserContext
 from app.services.i18n import t
 
 router = Router()
@@ -27,30 +30,26 @@ def _quick_reveal_text(word: str, translation: str, example: str | None) -> str:
     return text
 
 
-async def _advance(callback: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    ids = data.get("word_ids", [])
-    idx = data.get("idx", 0)
-    if idx >= len(ids):
-        await show_summary(callback.message, state)
+async def _advance(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+    user_ctx: UserContext,
+    practice: PracticeSession | None,
+) -> None:
+    card = practice.advance() if practice else None
+    if practice:
+        await save_practice(state, practice)
+    if not card:
+        await show_summary(callback.message, state, session, user_ctx)
         await callback.answer()
         return
-    next_idx = idx + 1
-    await state.update_data(idx=next_idx)
-    if next_idx >= len(ids):
-        await show_summary(callback.message, state)
-        await callback.answer()
-        return
-    word = pick_review(data.get("items", []), next_idx)
-    if not word:
-        await callback.answer()
-        return
-    await update_current_review(callback.from_user.id, word.id)
+    maybe_prefetch(practice, user_ctx.user_id, session_limit(user_ctx))
     await state.set_state(PracticeStates.quick_word)
     await edit_or_send(
         callback.message,
         state,
-        _quick_word_text(next_idx + 1, len(ids), word.word),
+        _quick_word_text(practice.idx + 1, practice.total, card.word),
         reply_markup=practice_quick_step_kb(),
     )
     await callback.answer()
@@ -58,10 +57,9 @@ async def _advance(callback: CallbackQuery, state: FSMContext) -> None:
 
 @router.callback_query(PracticeStates.quick_word, F.data == "practice:quick:show")
 async def quick_show(callback: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if not word:
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if not card:
         await state.set_state(PracticeStates.done)
         await callback.answer()
         return
@@ -69,39 +67,37 @@ async def quick_show(callback: CallbackQuery, state: FSMContext) -> None:
     await edit_or_send(
         callback.message,
         state,
-        _quick_reveal_text(word.word, word.translation, word.example),
+        _quick_reveal_text(card.word, card.translation, card.example),
         reply_markup=practice_quick_rate_kb(),
     )
     await callback.answer()
 
 
 @router.callback_query(PracticeStates.quick_word, F.data == "practice:quick:skip")
-async def quick_skip(callback: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if word:
-        await apply_rating(word.id, 0)
-        stats = data.get("stats", {"again": 0, "hard": 0, "good": 0, "easy": 0})
-        stats["again"] += 1
-        await state.update_data(stats=stats)
-    await _advance(callback, state)
+async def quick_skip(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if card:
+        await apply_rating(session, user_ctx, card.id, 0)
+        practice.rate("again")
+    await _advance(callback, state, session, user_ctx, practice)
 
 
 @router.callback_query(PracticeStates.quick_reveal, F.data.startswith("practice:rate:"))
-async def quick_rate(callback: CallbackQuery, state: FSMContext) -> None:
+async def quick_rate(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     rating = callback.data.split(":")[-1]
     if rating not in {"again", "hard", "good", "easy"}:
         await callback.answer()
         return
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if word:
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if card:
         q_map = {"again": 0, "hard": 3, "good": 4, "easy": 5}
         q = q_map[rating]
-        await apply_rating(word.id, q)
-        stats = data.get("stats", {"again": 0, "hard": 0, "good": 0, "easy": 0})
-        stats[rating] += 1
-        await state.update_data(stats=stats)
-    await _advance(callback, state)
+        await apply_rating(session, user_ctx, card.id, q)
+        practice.rate(rating)
+    await _advance(callback, state, session, user_ctx, practice)
@@ -2,17 +2,19 @@ from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards.practice import practice_quick_rate_kb, practice_recall_prompt_kb
-from app.bot.handlers.practice.common import (
-    apply_rating,
-    edit_or_send,
-    fuzzy_match,
-    pick_review,
-    update_current_review,
+from app.bot.handlers.practice.common import apply_rating, edit_or_send, fuzzy_match, session_limit
+from app.bot.handlers.practice.engine import (
+    PracticeSession,
+    load_practice,
+    maybe_prefetch,
+    save_practice,
 )
 from app.bot.handlers.practice.states import PracticeStates
 from app.bot.handlers.practice.summary import show_summary
+from app.db.repo.user_context import UserContext
 from app.services.i18n import t
 
 router = Router()
@@ -37,31 +39,33 @@ def _recall_result_text(word: str, translation: str, answer: str, is_close: bool
     )
 
 
-async def _advance(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
-    ids = data.get("word_ids", [])
-    idx = data.get("idx", 0)
-    next_idx = idx + 1
-    await state.update_data(idx=next_idx)
-    if next_idx >= len(ids):
-        await show_summary(message, state)
+async def _advance(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+    user_ctx: UserContext,
+    practice: PracticeSession | None,
+) -> None:
+    card = practice.advance() if practice else None
+    if practice:
+        await save_practice(state, practice)
+    if not card:
+        await show_summary(message, state, session, user_ctx)
         return
-    word = pick_review(data.get("items", []), next_idx)
-    if not word:
-        await show_summary(message, state)
-        return
-    await update_current_review(message.from_user.id, word.id)
+    maybe_prefetch(practice, user_ctx.user_id, session_limit(user_ctx))
     await state.set_state(PracticeStates.recall_await_answer)
     await edit_or_send(
         message,
         state,
-        _recall_prompt_text(word.translation),
+        _recall_prompt_text(card.translation),
         reply_markup=practice_recall_prompt_kb(),
     )
 
 
 @router.message(PracticeStates.recall_await_answer)
-async def recall_answer(message: Message, state: FSMContext) -> None:
+async def recall_answer(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     if not message.text:
         await message.answer(t("common.answer_required"))
         return
@@ -69,18 +73,17 @@ async def recall_answer(message: Message, state: FSMContext) -> None:
     if not answer:
         await message.answer(t("common.answer_required"))
         return
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if not word:
-        await show_summary(message, state)
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if not card:
+        await show_summary(message, state, session, user_ctx)
         return
-    is_close = fuzzy_match(answer, word.word)
+    is_close = fuzzy_match(answer, card.word)
     await state.set_state(PracticeStates.scoring)
     await edit_or_send(
         message,
         state,
-        _recall_result_text(word.translation, word.word, answer, is_close),
+        _recall_result_text(card.translation, card.word, answer, is_close),
         reply_markup=practice_quick_rate_kb(),
     )
     try:
@@ -90,32 +93,30 @@ async def recall_answer(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(PracticeStates.recall_await_answer, F.data == "practice:recall:skip")
-async def recall_skip(callback: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if word:
-        await apply_rating(word.id, 0)
-        stats = data.get("stats", {"again": 0, "hard": 0, "good": 0, "easy": 0})
-        stats["again"] += 1
-        await state.update_data(stats=stats)
-    await _advance(callback.message, state)
+async def recall_skip(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if card:
+        await apply_rating(session, user_ctx, card.id, 0)
+        practice.rate("again")
+    await _advance(callback.message, state, session, user_ctx, practice)
 
 
 @router.callback_query(PracticeStates.scoring, F.data.startswith("practice:rate:"))
-async def recall_rate(callback: CallbackQuery, state: FSMContext) -> None:
+async def recall_rate(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     rating = callback.data.split(":")[-1]
     if rating not in {"again", "hard", "good", "easy"}:
         await callback.answer()
         return
-    data = await state.get_data()
-    idx = data.get("idx", 0)
-    word = pick_review(data.get("items", []), idx)
-    if word:
+    practice = await load_practice(state)
+    card = practice.current if practice else None
+    if card:
         q_map = {"again": 0, "hard": 3, "good": 4, "easy": 5}
         q = q_map[rating]
-        await apply_rating(word.id, q)
-        stats = data.get("stats", {"again": 0, "hard": 0, "good": 0, "easy": 0})
-        stats[rating] += 1
-        await state.update_data(stats=stats)
-    await _advance(callback.message, state)
+        await apply_rating(session, user_ctx, card.id, q)
+        practice.rate(rating)
+    await _advance(callback.message, state, session, user_ctx, practice)
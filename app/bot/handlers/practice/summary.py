@@ -1,16 +1,22 @@
+import logging
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards.practice import practice_summary_kb
 from app.bot.handlers.practice.common import edit_or_send
+from app.bot.handlers.practice.engine import load_practice
 from app.db.repo.sessions import delete_session
-from app.db.repo.users import get_or_create_user
-from app.db.session import AsyncSessionLocal
+from app.db.repo.user_context import UserContext
 from app.bot.handlers.practice.states import PracticeStates
+from app.config import settings
+from app.services.review_buffer import review_buffer
 from app.services.i18n import t
 
 router = Router()
+logger = logging.getLogger("practice")
 
 
 def _summary_text(stats: dict[str, int], streak: int, longest: int) -> str:
@@ -28,27 +34,36 @@ def _summary_text(stats: dict[str, int], streak: int, longest: int) -> str:
     return text
 
 
-async def show_summary(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
+async def show_summary(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    practice = await load_practice(state)
     await state.set_state(PracticeStates.done)
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, message.from_user.id)
-        await delete_session(session, user.id)
-        streak = user.current_streak
-        longest = user.longest_streak
+    await delete_session(session, user_ctx.user_id)
+    user = user_ctx.user
+    if settings.review_write_behind:
+        # The flush covers every user's pending reviews; a failure in it must not fail this
+        # handler. The journal keeps them and the background flusher retries.
+        try:
+            await review_buffer.flush()
+        except Exception:
+            logger.exception("REVIEW_BUFFER_FLUSH_ERROR user_id=%s", user_ctx.user_id)
+        await session.refresh(user)
     await edit_or_send(
         message,
         state,
-        _summary_text(data.get("stats", {}), streak, longest),
+        _summary_text(practice.stats if practice else {}, user.current_streak, user.longest_streak),
         reply_markup=practice_summary_kb(),
         parse_mode=None,
     )
 
 
 @router.callback_query(F.data == "practice:again")
-async def practice_again(callback: CallbackQuery, state: FSMContext) -> None:
+async def practice_again(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     from app.bot.handlers.practice.menu import _start_mode
 
     await callback.message.edit_reply_markup(reply_markup=None)
-    await _start_mode(callback.message, state, "quick", callback.from_user.id)
+    await _start_mode(callback.message, state, "quick", session, user_ctx)
     await callback.answer()
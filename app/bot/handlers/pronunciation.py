@@ -4,7 +4,6 @@ import asyncio
 import logging
 import random
 import time
-from pathlib import Path
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
@@ -15,6 +14,7 @@ from aiogram.exceptions import TelegramBadRequest
 from app.bot.keyboards.main import main_menu_kb
 from app.bot.keyboards.credits import credits_buy_kb
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards.pronunciation import (
     pronunciation_menu_kb,
@@ -27,6 +27,7 @@ from app.bot.keyboards.pronunciation import (
 )
 from app.config import settings
 from app.db.repo.pronunciation_logs import log_pronunciation
+from app.db.repo.user_context import UserContext
 from app.db.repo.user_settings import get_or_create_user_settings
 from app.db.repo.users import get_or_create_user
 from app.db.models import Word
@@ -39,16 +40,25 @@ from app.services.pronunciation.stt_engine import STTPronunciationEngine
 from app.utils.bad_words import contains_bad_words
 from app.services.stt.base import STTProviderError
 from app.services.stt.assemblyai_transcribe import AssemblyAITranscribeSTT
+from app.services.stt.local_cpu import local_stt
+from app.services.stt.scheduler import (
+    PRIORITY_QUIZ,
+    PRIORITY_SINGLE,
+    STTRequest,
+    stt_request,
+    stt_scheduler,
+)
 from app.services.i18n import t
 from app.db.repo.credits import CreditError, finalize_charge, refund_charge, reserve_credits
 from app.db.repo.srs import get_due_words
-from app.utils.audio import convert_to_wav, download_voice
+from app.utils.audio import AudioTranscodeError, download_voice
 
 router = Router()
 
 PAGE_SIZE = 10
 MAX_VOICE_SECONDS = 15
 MAX_VOICE_BYTES = 3 * 1024 * 1024
+QUEUE_NOTICE_SECONDS = 3
 _LOCKS: dict[int, asyncio.Lock] = {}
 logger = logging.getLogger("pronunciation")
 STT_UNAVAILABLE_MESSAGE = t("stt.unavailable")
@@ -65,6 +75,8 @@ class PronunciationStates(StatesGroup):
 
 
 def _engine() -> PronunciationEngine:
+    if settings.stt_provider == "local":
+        return STTPronunciationEngine(local_stt())
     return STTPronunciationEngine(AssemblyAITranscribeSTT())
 
 
@@ -155,13 +167,6 @@ async def _start_pron_quiz(
     )
 
 
-async def _require_user(message: Message) -> int | None:
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, message.from_user.id)
-        await get_or_create_user_settings(session, user)
-        return message.from_user.id
-
-
 async def _render_results(callback: CallbackQuery, state: FSMContext, page: int, context: str) -> None:
     async with AsyncSessionLocal() as session:
         user = await get_or_create_user(session, callback.from_user.id)
@@ -196,14 +201,6 @@ async def _render_results(callback: CallbackQuery, state: FSMContext, page: int,
     )
 
 
-async def _cleanup_files(paths: list[Path]) -> None:
-    for path in paths:
-        try:
-            path.unlink(missing_ok=True)
-        except Exception:
-            pass
-
-
 async def _process_voice(
     message: Message,
     state: FSMContext,
@@ -211,6 +208,7 @@ async def _process_voice(
     reference: str,
     retry_prompt: str | None = None,
     retry_markup=None,
+    priority: int = PRIORITY_SINGLE,
 ) -> tuple[str, str | None, int | None] | None:
     if not message.voice:
         return None
@@ -220,28 +218,25 @@ async def _process_voice(
             text = f"{text}\n\n{retry_prompt}"
         await _edit_session_message(message, state, text, reply_markup=retry_markup)
         return None
-    ogg_path = None
-    wav_path = None
+    if (message.voice.file_size or 0) > MAX_VOICE_BYTES:
+        text = t("pronunciation.voice_too_large")
+        if retry_prompt:
+            text = f"{text}\n\n{retry_prompt}"
+        await _edit_session_message(message, state, text, reply_markup=retry_markup)
+        return None
     start = None
     reservation_id = None
     db_user_id = None
     try:
-        ogg_path, size = await download_voice(message.bot, message.voice)
-        if size > MAX_VOICE_BYTES:
+        engine = _engine()
+        transcode = not (settings.stt_direct_upload and engine.accepts("audio/ogg"))
+        audio = await download_voice(message.bot, message.voice, transcode=transcode)
+        if len(audio.data) > MAX_VOICE_BYTES:
             text = t("pronunciation.voice_too_large")
             if retry_prompt:
                 text = f"{text}\n\n{retry_prompt}"
             await _edit_session_message(message, state, text, reply_markup=retry_markup)
             return None
-        try:
-            wav_path = await convert_to_wav(ogg_path)
-        except RuntimeError:
-            text = t("pronunciation.voice_process_failed")
-            if retry_prompt:
-                text = f"{text}\n\n{retry_prompt}"
-            await _edit_session_message(message, state, text, reply_markup=retry_markup)
-            return None
-        engine = _engine()
         audio_duration_seconds = int(message.voice.duration or 0)
         async with AsyncSessionLocal() as session:
             user = await get_or_create_user(
@@ -252,12 +247,19 @@ async def _process_voice(
                 session,
                 db_user_id,
                 audio_duration_seconds=audio_duration_seconds,
-                provider="assemblyai",
+                provider=settings.stt_provider,
             )
             reservation_id = reservation.ledger_id
+        request = STTRequest(user_id=user_id, priority=priority, cost=max(1.0, audio_duration_seconds))
+        stt_request.set(request)
+        wait_seconds = stt_scheduler.estimate_wait(request)
+        if wait_seconds >= QUEUE_NOTICE_SECONDS:
+            await _edit_session_message(
+                message, state, t("pronunciation.queue_wait", seconds=int(wait_seconds + 0.5))
+            )
         start = time.monotonic()
-        logger.info("STT_START user=%s", user_id)
-        result = await engine.assess(str(wav_path), reference)
+        logger.info("STT_START user=%s format=%s", user_id, audio.upload_mime_type)
+        result = await engine.assess(audio, reference)
         duration_ms = int((time.monotonic() - start) * 1000)
         transcript_len = len(result.transcript) if result.transcript else 0
         logger.info(
@@ -299,6 +301,17 @@ async def _process_voice(
             reply_markup_final = credits_buy_kb()
         await _edit_session_message(message, state, text, reply_markup=reply_markup_final)
         return None
+    except AudioTranscodeError:
+        # ffmpeg runs inside the upload now, so a bad file surfaces after the reservation.
+        logger.warning("STT_TRANSCODE_ERROR user=%s", user_id)
+        if reservation_id:
+            async with AsyncSessionLocal() as session:
+                await refund_charge(session, reservation_id, reason="stt_error")
+        text = t("pronunciation.voice_process_failed")
+        if retry_prompt:
+            text = f"{text}\n\n{retry_prompt}"
+        await _edit_session_message(message, state, text, reply_markup=retry_markup)
+        return None
     except STTProviderError as exc:
         if start is not None:
             duration_ms = int((time.monotonic() - start) * 1000)
@@ -325,27 +338,19 @@ async def _process_voice(
             text = f"{text}\n\n{retry_prompt}"
         await _edit_session_message(message, state, text, reply_markup=retry_markup)
         return None
-    finally:
-        paths = [p for p in [ogg_path, wav_path] if p]
-        await _cleanup_files(paths)
 
 
-async def open_pronunciation_menu(message: Message, state: FSMContext) -> None:
+async def open_pronunciation_menu(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     if not settings.pronunciation_enabled:
         await message.answer(t("pronunciation.disabled_global"))
         return
     await state.clear()
-    user_id = await _require_user(message)
-    if not user_id:
+    if not await is_feature_enabled(session, "pronunciation"):
+        await message.answer(t("pronunciation.disabled_feature"))
         return
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "pronunciation"):
-            await message.answer(t("pronunciation.disabled_feature"))
-            return
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, user_id)
-        user_settings = await get_or_create_user_settings(session, user)
-    if not user_settings.pronunciation_enabled:
+    if not user_ctx.settings.pronunciation_enabled:
         await message.answer(t("pronunciation.disabled_user"))
         return
     await state.set_state(PronunciationStates.menu)
@@ -367,14 +372,14 @@ async def pron_menu_back(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "pron:menu:single")
-async def pron_single_menu(callback: CallbackQuery, state: FSMContext) -> None:
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "pronunciation"):
-            await callback.message.answer(t("pronunciation.disabled_feature"))
-            await callback.answer()
-            return
-        user = await get_or_create_user(session, callback.from_user.id)
-        user_settings = await get_or_create_user_settings(session, user)
+async def pron_single_menu(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    if not await is_feature_enabled(session, "pronunciation"):
+        await callback.message.answer(t("pronunciation.disabled_feature"))
+        await callback.answer()
+        return
+    user_settings = user_ctx.settings
     if not user_settings.pronunciation_enabled:
         await callback.message.answer(t("pronunciation.disabled_user"))
         await callback.answer()
@@ -419,14 +424,14 @@ async def pron_recent_page(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("pron:pick:"))
-async def pron_pick_word(callback: CallbackQuery, state: FSMContext) -> None:
+async def pron_pick_word(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     _, _, word_id, context, page = callback.data.split(":")
     word_id_int = int(word_id)
     page_int = int(page)
 
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        word = await get_word(session, user.id, word_id_int)
+    word = await get_word(session, user_ctx.user_id, word_id_int)
 
     if not word:
         await callback.message.edit_text(t("pronunciation.word_not_found"), reply_markup=single_mode_kb())
@@ -463,16 +468,14 @@ async def pron_back(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "pron:exit")
-async def pron_exit(callback: CallbackQuery, state: FSMContext) -> None:
+async def pron_exit(callback: CallbackQuery, state: FSMContext, user_ctx: UserContext) -> None:
     await state.clear()
     await callback.message.edit_text(t("pronunciation.back_to_menu"), reply_markup=None)
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        streak = user.current_streak
     await callback.message.answer(
         t("common.main_menu"),
         reply_markup=main_menu_kb(
-            is_admin=callback.from_user.id in settings.admin_user_ids, streak=streak
+            is_admin=callback.from_user.id in settings.admin_user_ids,
+            streak=user_ctx.user.current_streak,
         ),
     )
     await callback.answer()
@@ -490,7 +493,9 @@ async def pron_retry(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
 
 
-async def _handle_single_voice(message: Message, state: FSMContext) -> None:
+async def _handle_single_voice(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     data = await state.get_data()
     reference = data.get("reference")
     context = data.get("context", "recent")
@@ -510,15 +515,13 @@ async def _handle_single_voice(message: Message, state: FSMContext) -> None:
     if not result:
         return
     verdict, transcript, _ = result
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, message.from_user.id)
-        await log_pronunciation(
-            session,
-            user.id,
-            verdict=verdict,
-            reference_word=reference,
-            mode="single",
-        )
+    await log_pronunciation(
+        session,
+        user_ctx.user_id,
+        verdict=verdict,
+        reference_word=reference,
+        mode="single",
+    )
     if transcript:
         await _edit_session_message(
             message,
@@ -540,40 +543,40 @@ async def _handle_single_voice(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "pron:menu:quiz")
-async def pron_quiz_start(callback: CallbackQuery, state: FSMContext) -> None:
+async def pron_quiz_start(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     await state.clear()
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "pronunciation"):
-            await callback.message.edit_text(t("pronunciation.disabled_feature"))
-            await callback.answer()
-            return
-        user = await get_or_create_user(session, callback.from_user.id)
-        user_settings = await get_or_create_user_settings(session, user)
-        if not user_settings.pronunciation_enabled:
-            await callback.message.edit_text(t("pronunciation.disabled_user"))
-            await callback.answer()
-            return
-        if user_settings.pronunciation_mode not in {"quiz", "both"}:
-            await callback.message.edit_text(t("pronunciation.mode_only_single"))
-            await callback.answer()
-            return
-        recent_words = await list_recent_words(
-            session, user.id, user_settings.quiz_words_per_session, 0
-        )
+    if not await is_feature_enabled(session, "pronunciation"):
+        await callback.message.edit_text(t("pronunciation.disabled_feature"))
+        await callback.answer()
+        return
+    user_settings = user_ctx.settings
+    if not user_settings.pronunciation_enabled:
+        await callback.message.edit_text(t("pronunciation.disabled_user"))
+        await callback.answer()
+        return
+    if user_settings.pronunciation_mode not in {"quiz", "both"}:
+        await callback.message.edit_text(t("pronunciation.mode_only_single"))
+        await callback.answer()
+        return
+    recent_words = await list_recent_words(
+        session, user_ctx.user_id, user_settings.quiz_words_per_session, 0
+    )
     await _start_pron_quiz(callback.message, state, recent_words, user_settings.quiz_words_per_session)
     await callback.answer()
 
 
 @router.callback_query(F.data == "pron:menu:select")
-async def pron_select_menu(callback: CallbackQuery, state: FSMContext) -> None:
-    async with AsyncSessionLocal() as session:
-        if not await is_feature_enabled(session, "pronunciation"):
-            await callback.message.edit_text(t("pronunciation.disabled_feature"))
-            await callback.answer()
-            return
-        user = await get_or_create_user(session, callback.from_user.id)
-        user_settings = await get_or_create_user_settings(session, user)
-        total_words = await count_words(session, user.id)
+async def pron_select_menu(
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
+    if not await is_feature_enabled(session, "pronunciation"):
+        await callback.message.edit_text(t("pronunciation.disabled_feature"))
+        await callback.answer()
+        return
+    user_settings = user_ctx.settings
+    total_words = await count_words(session, user_ctx.user_id)
     if not user_settings.pronunciation_enabled:
         await callback.message.edit_text(t("pronunciation.disabled_user"))
         await callback.answer()
@@ -608,7 +611,9 @@ async def start_pron_quiz_selected_words(
     await _start_pron_quiz(message, state, words, user_settings.quiz_words_per_session)
 
 
-async def _handle_quiz_voice(message: Message, state: FSMContext) -> None:
+async def _handle_quiz_voice(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     data = await state.get_data()
     questions = data.get("questions", [])
     idx = data.get("idx", 0)
@@ -627,6 +632,7 @@ async def _handle_quiz_voice(message: Message, state: FSMContext) -> None:
         reference,
         retry_prompt=retry_prompt,
         retry_markup=quiz_kb(),
+        priority=PRIORITY_QUIZ,
     )
     if not result:
         return
@@ -644,15 +650,13 @@ async def _handle_quiz_voice(message: Message, state: FSMContext) -> None:
     else:
         wrong += 1
 
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, message.from_user.id)
-        await log_pronunciation(
-            session,
-            user.id,
-            verdict=verdict,
-            reference_word=reference,
-            mode="quiz",
-        )
+    await log_pronunciation(
+        session,
+        user_ctx.user_id,
+        verdict=verdict,
+        reference_word=reference,
+        mode="quiz",
+    )
 
     next_idx = idx + 1
     total = len(questions)
@@ -707,23 +711,23 @@ async def _handle_quiz_voice(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "pron:quiz:stop")
-async def pron_quiz_stop(callback: CallbackQuery, state: FSMContext) -> None:
+async def pron_quiz_stop(callback: CallbackQuery, state: FSMContext, user_ctx: UserContext) -> None:
     await state.clear()
     await callback.message.edit_text(t("pronunciation.quiz_stopped"))
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        streak = user.current_streak
     await callback.message.answer(
         t("common.main_menu"),
         reply_markup=main_menu_kb(
-            is_admin=callback.from_user.id in settings.admin_user_ids, streak=streak
+            is_admin=callback.from_user.id in settings.admin_user_ids,
+            streak=user_ctx.user.current_streak,
         ),
     )
     await callback.answer()
 
 
 @router.message(F.voice)
-async def pron_voice_handler(message: Message, state: FSMContext) -> None:
+async def pron_voice_handler(
+    message: Message, state: FSMContext, session: AsyncSession, user_ctx: UserContext
+) -> None:
     current = await state.get_state()
     if current not in {
         PronunciationStates.waiting_voice_single.state,
@@ -736,25 +740,23 @@ async def pron_voice_handler(message: Message, state: FSMContext) -> None:
         )
         return
 
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, message.from_user.id)
-        user_settings = await get_or_create_user_settings(session, user)
-        if not user_settings.pronunciation_enabled:
-            await _edit_session_message(message, state, t("pronunciation.disabled_user"))
-            await state.clear()
-            return
-        if current == PronunciationStates.waiting_voice_single.state and user_settings.pronunciation_mode == "quiz":
-            await _edit_session_message(
-                message, state, t("pronunciation.mode_only_quiz")
-            )
-            await state.clear()
-            return
-        if current == PronunciationStates.quiz_active.state and user_settings.pronunciation_mode == "single":
-            await _edit_session_message(
-                message, state, t("pronunciation.mode_only_single")
-            )
-            await state.clear()
-            return
+    user_settings = user_ctx.settings
+    if not user_settings.pronunciation_enabled:
+        await _edit_session_message(message, state, t("pronunciation.disabled_user"))
+        await state.clear()
+        return
+    if current == PronunciationStates.waiting_voice_single.state and user_settings.pronunciation_mode == "quiz":
+        await _edit_session_message(
+            message, state, t("pronunciation.mode_only_quiz")
+        )
+        await state.clear()
+        return
+    if current == PronunciationStates.quiz_active.state and user_settings.pronunciation_mode == "single":
+        await _edit_session_message(
+            message, state, t("pronunciation.mode_only_single")
+        )
+        await state.clear()
+        return
 
     data = await state.get_data()
     if data.get("stt_processing"):
@@ -776,9 +778,9 @@ async def pron_voice_handler(message: Message, state: FSMContext) -> None:
     try:
         async with lock:
             if current == PronunciationStates.waiting_voice_single.state:
-                await _handle_single_voice(message, state)
+                await _handle_single_voice(message, state, session, user_ctx)
             else:
-                await _handle_quiz_voice(message, state)
+                await _handle_quiz_voice(message, state, session, user_ctx)
     finally:
         try:
             await message.delete()
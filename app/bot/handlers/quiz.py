@@ -1,23 +1,27 @@
 from __future__ import annotations
 
+import uuid
+from datetime import datetime
+from typing import Any
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
 from aiogram.exceptions import TelegramBadRequest
-from sqlalchemy import select
 
 from app.bot.keyboards.main import main_menu_kb
 from app.config import settings
 from app.bot.keyboards.quiz import quiz_menu_kb, quiz_options_kb
-from app.db.repo.srs import apply_review
+from app.db.repo.srs import PendingReview, apply_reviews_bulk
 from app.db.repo.admin import finish_quiz_session, log_quiz_session
 from app.db.repo.user_settings import get_or_create_user_settings
 from app.db.repo.users import get_or_create_user, get_user_by_telegram_id
-from app.db.models import User, Word
+from app.db.models import User
 from app.db.repo.words import count_words, list_recent_words
 from app.db.session import AsyncSessionLocal
 from app.bot.handlers.word_selection import start_selection
+from app.services.distractors import distractor_indexes
 from app.services.feature_flags import is_feature_enabled
 from app.services.i18n import t
 from app.services.quiz import build_quiz_questions
@@ -74,29 +78,71 @@ async def _edit_or_send(
     await state.update_data(quiz_message_id=sent.message_id)
 
 
+async def _finish_quiz(data: dict[str, Any], finish: bool = True) -> User | None:
+    user_db_id = data.get("user_id")
+    session_id = data.get("quiz_session_id")
+    reviews = [
+        PendingReview(
+            user_db_id,
+            int(answer[0]),
+            int(answer[1]),
+            datetime.fromisoformat(answer[2]),
+            answer[3] if len(answer) > 3 else None,
+        )
+        for answer in data.get("answers", [])
+    ]
+    async with AsyncSessionLocal() as session:
+        # Reviews, streak and the quiz row go out in one transaction.
+        if reviews and user_db_id:
+            await apply_reviews_bulk(session, reviews, commit=False)
+        if session_id and finish:
+            correct = data.get("correct", 0)
+            wrong = data.get("wrong", 0)
+            total = correct + wrong
+            accuracy = int((correct / total) * 100) if total else 0
+            await finish_quiz_session(session, session_id, total, correct, wrong, accuracy)
+        else:
+            await session.commit()
+        return await session.get(User, user_db_id) if user_db_id else None
+
+
+async def flush_quiz_answers(state: FSMContext) -> None:
+    # Must run before any state.clear() that can end a quiz early, or its answers are lost.
+    data = await state.get_data()
+    if data.get("answers") or data.get("quiz_session_id"):
+        await _finish_quiz(data)
+        # Review keys make a repeated flush harmless; clearing just avoids the extra work.
+        await state.update_data(answers=[])
+
+
+async def finish_abandoned_quiz(data: dict[str, Any]) -> None:
+    # FSM expire hook: the user never came back, so close the quiz with what was answered.
+    await _finish_quiz(data)
+
+
+async def apply_quiz_answers(state: FSMContext) -> None:
+    # Writes the reviews so far without marking the quiz session completed.
+    data = await state.get_data()
+    if data.get("answers"):
+        await _finish_quiz(data, finish=False)
+        await state.update_data(answers=[])
+
+
 async def _send_next_question(
-    message: Message, state: FSMContext, prefix: str | None = None
+    message: Message,
+    state: FSMContext,
+    prefix: str | None = None,
+    data: dict[str, Any] | None = None,
 ) -> None:
-    data = await state.get_data()
+    if data is None:
+        data = await state.get_data()
     questions = data.get("questions", [])
     index = data.get("index", 0)
     if index >= len(questions):
         text = _quiz_result_text(data.get("correct", 0), data.get("wrong", 0))
-        user_db_id = data.get("user_id")
-        session_id = data.get("quiz_session_id")
-        streak = 0
-        is_admin = False
-        async with AsyncSessionLocal() as session:
-            user = await session.get(User, user_db_id) if user_db_id else None
-            if user:
-                streak = user.current_streak
-                is_admin = user.telegram_id in settings.admin_user_ids
-            if session_id:
-                correct = data.get("correct", 0)
-                wrong = data.get("wrong", 0)
-                total = correct + wrong
-                accuracy = int((correct / total) * 100) if total else 0
-                await finish_quiz_session(session, session_id, total, correct, wrong, accuracy)
+        user = await _finish_quiz(data)
+        streak = user.current_streak if user else 0
+        is_admin = bool(user and user.telegram_id in settings.admin_user_ids)
         await _edit_or_send(message, state, text, reply_markup=None)
         await message.answer(
             t("common.main_menu"),
@@ -118,33 +164,32 @@ async def _start_quiz_with_words(
     message: Message,
     state: FSMContext,
     user: User,
-    words: list[Word],
+    word_ids: list[int],
     quiz_size: int,
 ) -> None:
-    if len(words) < 4:
-        await message.answer(t("quiz.need_words"))
-        await state.clear()
-        return
-    questions = build_quiz_questions(words, words, max_questions=quiz_size)
-    if not questions:
-        await message.answer(t("quiz.need_words"))
-        await state.clear()
-        return
     async with AsyncSessionLocal() as session:
+        index = await distractor_indexes.get(session, user.id)
+        questions = build_quiz_questions(index, word_ids, max_questions=quiz_size)
+        if not questions:
+            await message.answer(t("quiz.need_words"))
+            await flush_quiz_answers(state)
+            await state.clear()
+            return
         quiz_session_id = await log_quiz_session(session, user.id)
 
     await state.set_state(QuizStates.in_quiz)
-    await state.update_data(
+    data = await state.update_data(
         questions=questions,
         index=0,
         correct=0,
         wrong=0,
+        answers=[],
         user_id=user.id,
         quiz_session_id=quiz_session_id,
     )
     if message.from_user and message.from_user.is_bot:
-        await state.update_data(quiz_message_id=message.message_id)
-    await _send_next_question(message, state)
+        data = await state.update_data(quiz_message_id=message.message_id)
+    await _send_next_question(message, state, data=data)
 
 
 async def _load_quiz_context(user_id: int) -> tuple[User | None, int | None, str | None]:
@@ -171,6 +216,7 @@ async def start_quiz(callback: CallbackQuery, state: FSMContext) -> None:
 async def start_quiz_message(
     message: Message, user_id: int, state: FSMContext
 ) -> None:
+    await flush_quiz_answers(state)
     await state.clear()
     user, _, error = await _load_quiz_context(user_id)
     if error:
@@ -181,6 +227,7 @@ async def start_quiz_message(
 
 @router.callback_query(F.data == "quiz:menu:last")
 async def quiz_last_words(callback: CallbackQuery, state: FSMContext) -> None:
+    await flush_quiz_answers(state)
     await state.clear()
     user, quiz_size, error = await _load_quiz_context(callback.from_user.id)
     if error or not user or not quiz_size:
@@ -191,7 +238,9 @@ async def quiz_last_words(callback: CallbackQuery, state: FSMContext) -> None:
         words = await list_recent_words(
             session, user.id, max(quiz_size, 4), 0
         )
-    await _start_quiz_with_words(callback.message, state, user, words, quiz_size)
+    await _start_quiz_with_words(
+        callback.message, state, user, [word.id for word in words], quiz_size
+    )
     await callback.answer()
 
 
@@ -202,6 +251,7 @@ async def quiz_selected_words(callback: CallbackQuery, state: FSMContext) -> Non
         await callback.message.edit_text(error or t("quiz.need_words"))
         await callback.answer()
         return
+    await flush_quiz_answers(state)
     await state.clear()
     await start_selection(callback, state, "quiz_selected")
 
@@ -209,6 +259,7 @@ async def quiz_selected_words(callback: CallbackQuery, state: FSMContext) -> Non
 async def start_quiz_selected_words(
     message: Message, state: FSMContext, selected_ids: list[int], user_id: int
 ) -> None:
+    await flush_quiz_answers(state)
     await state.clear()
     async with AsyncSessionLocal() as session:
         user = await get_user_by_telegram_id(session, user_id)
@@ -216,13 +267,9 @@ async def start_quiz_selected_words(
             await message.answer(t("common.start_required"))
             return
         user_settings = await get_or_create_user_settings(session, user)
-        result = await session.execute(
-            select(Word)
-            .where(Word.user_id == user.id, Word.id.in_(selected_ids))
-            .order_by(Word.created_at.desc())
-        )
-        words = list(result.scalars().all())
-    await _start_quiz_with_words(message, state, user, words, user_settings.quiz_words_per_session)
+    await _start_quiz_with_words(
+        message, state, user, selected_ids, user_settings.quiz_words_per_session
+    )
 
 
 @router.callback_query(F.data.startswith("quiz:answer:"))
@@ -232,6 +279,7 @@ async def quiz_answer(callback: CallbackQuery, state: FSMContext) -> None:
     index = data.get("index", 0)
     if index >= len(questions):
         await callback.answer(t("quiz.questions_over"))
+        await flush_quiz_answers(state)
         await state.clear()
         return
 
@@ -239,31 +287,25 @@ async def quiz_answer(callback: CallbackQuery, state: FSMContext) -> None:
     question = questions[index]
     correct_id = int(question["word_id"])
 
-    async with AsyncSessionLocal() as session:
-        word = await session.get(Word, correct_id)
-        if not word:
-            await _edit_or_send(
-                callback.message,
-                state,
-                t("quiz.card_not_found"),
-            )
-            await state.clear()
-            return
-        if selected_id == correct_id:
-            await apply_review(session, word, 4)
-            feedback = t("quiz.feedback_correct")
-            await state.update_data(correct=data.get("correct", 0) + 1)
-        else:
-            await apply_review(session, word, 0)
-            feedback = t(
-                "quiz.feedback_wrong",
-                word=question["word"],
-                translation=question["translation"],
-            )
-            await state.update_data(wrong=data.get("wrong", 0) + 1)
+    # Outcomes are kept in FSM and written in bulk when the quiz ends.
+    answers = list(data.get("answers", []))
+    reviewed_at = datetime.utcnow().isoformat()
+    review_key = str(uuid.uuid4())
+    if selected_id == correct_id:
+        feedback = t("quiz.feedback_correct")
+        answers.append([correct_id, 4, reviewed_at, review_key])
+        score = {"correct": data.get("correct", 0) + 1}
+    else:
+        feedback = t(
+            "quiz.feedback_wrong",
+            word=question["word"],
+            translation=question["translation"],
+        )
+        answers.append([correct_id, 0, reviewed_at, review_key])
+        score = {"wrong": data.get("wrong", 0) + 1}
 
-    await state.update_data(index=index + 1)
-    await _send_next_question(callback.message, state, prefix=feedback)
+    data = await state.update_data(index=index + 1, answers=answers, **score)
+    await _send_next_question(callback.message, state, prefix=feedback, data=data)
     await callback.answer()
 
 
@@ -273,7 +315,6 @@ async def quiz_exit(callback: CallbackQuery, state: FSMContext) -> None:
     quiz_message_id = data.get("quiz_message_id")
     correct = data.get("correct", 0)
     wrong = data.get("wrong", 0)
-    session_id = data.get("quiz_session_id")
     await state.clear()
     if quiz_message_id:
         try:
@@ -283,13 +324,11 @@ async def quiz_exit(callback: CallbackQuery, state: FSMContext) -> None:
             )
         except TelegramBadRequest:
             pass
-    async with AsyncSessionLocal() as session:
-        user = await get_or_create_user(session, callback.from_user.id)
-        streak = user.current_streak
-    if session_id:
-        total = correct + wrong
-        accuracy = int((correct / total) * 100) if total else 0
-        await finish_quiz_session(session, session_id, total, correct, wrong, accuracy)
+    user = await _finish_quiz(data)
+    if user is None:
+        async with AsyncSessionLocal() as session:
+            user = await get_or_create_user(session, callback.from_user.id)
+    streak = user.current_streak
     await callback.message.answer(
         t("quiz.stopped", result=_quiz_result_text(correct, wrong)),
         reply_markup=main_menu_kb(
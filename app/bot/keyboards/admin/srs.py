@@ -3,6 +3,15 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from app.services.i18n import b
 
 
+def admin_srs_overview_kb() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=b("admin_srs.forecast"), callback_data="admin:srs:forecast")],
+            [InlineKeyboardButton(text=b("common.back"), callback_data="admin:menu")],
+        ]
+    )
+
+
 def admin_srs_reset_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -1,12 +1,12 @@
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.db.repo.users import get_user_by_telegram_id
 from app.db.session import AsyncSessionLocal
-from app.services.feature_flags import is_feature_enabled
+from app.services.access_cache import access_cache
+from app.services.feature_flags import is_feature_enabled_cached
 from app.services.i18n import t
+from app.services.runtime_config import runtime_config
 
 
 class BlockedUserMiddleware(BaseMiddleware):
@@ -22,21 +22,24 @@ class BlockedUserMiddleware(BaseMiddleware):
         if user_id in settings.admin_user_ids:
             return await handler(event, data)
 
-        async with AsyncSessionLocal() as session:
-            if await is_feature_enabled(session, "maintenance"):
-                text = t("system.maintenance")
-                if isinstance(event, CallbackQuery):
-                    await event.answer(text, show_alert=True)
-                else:
-                    await event.answer(text)
-                return
-            user = await get_user_by_telegram_id(session, user_id)
-            if user and user.is_blocked:
-                text = t("system.blocked")
-                if isinstance(event, CallbackQuery):
-                    await event.answer(text, show_alert=True)
-                else:
-                    await event.answer(text)
-                return
+        if not access_cache.loaded or runtime_config.snapshot is None:
+            async with AsyncSessionLocal() as session:
+                await runtime_config.get(session)
+                await access_cache.refresh(session)
+
+        if is_feature_enabled_cached("maintenance"):
+            text = t("system.maintenance")
+            if isinstance(event, CallbackQuery):
+                await event.answer(text, show_alert=True)
+            else:
+                await event.answer(text)
+            return
+        if access_cache.is_blocked(user_id):
+            text = t("system.blocked")
+            if isinstance(event, CallbackQuery):
+                await event.answer(text, show_alert=True)
+            else:
+                await event.answer(text)
+            return
 
         return await handler(event, data)
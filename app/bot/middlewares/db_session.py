@@ -0,0 +1,25 @@
+from aiogram import BaseMiddleware
+
+from app.db.repo.user_context import load_user_context
+from app.db.session import AsyncSessionLocal
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        # AsyncSession only checks out a connection on first use.
+        async with AsyncSessionLocal() as session:
+            data["session"] = session
+            return await handler(event, data)
+
+
+class UserContextMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        handler_object = data.get("handler")
+        wants_context = "user_ctx" in getattr(handler_object, "params", ())
+        from_user = data.get("event_from_user")
+        if wants_context and from_user and "user_ctx" not in data:
+            session = data["session"]
+            data["user_ctx"] = await load_user_context(session, from_user.id, from_user.username)
+            # End the read transaction so the connection goes back to the pool.
+            await session.commit()
+        return await handler(event, data)
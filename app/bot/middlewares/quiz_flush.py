@@ -0,0 +1,19 @@
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+from app.bot.handlers.quiz import QuizStates, apply_quiz_answers
+
+
+class QuizFlushMiddleware(BaseMiddleware):
+    # Quiz answers live in FSM data until the quiz ends. Any non-quiz handler (/start, menu
+    # buttons, practice) may clear the state, so write the answers out before it runs. The
+    # quiz itself may still continue, so its session row is finished only by quiz handlers.
+    async def __call__(self, handler, event, data):
+        state = data.get("state")
+        if state is not None and data.get("raw_state") == QuizStates.in_quiz.state:
+            is_quiz_callback = isinstance(event, CallbackQuery) and (event.data or "").startswith(
+                "quiz:"
+            )
+            if not is_quiz_callback:
+                await apply_quiz_answers(state)
+        return await handler(event, data)
@@ -0,0 +1,44 @@
+import time
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import Update
+
+from app.services.tracing import finish_trace, record_span, start_trace, tag_trace
+
+
+class TracingMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        trace = start_trace(
+            event.update_id if isinstance(event, Update) else None,
+            event.event_type if isinstance(event, Update) else type(event).__name__,
+        )
+        try:
+            return await handler(event, data)
+        finally:
+            finish_trace(trace)
+
+
+class TraceTagMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        callback = getattr(data.get("handler"), "callback", None)
+        if callback is not None:
+            tag_trace(
+                getattr(callback, "__module__", None),
+                getattr(callback, "__qualname__", None),
+                data.get("raw_state"),
+            )
+        return await handler(event, data)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    async def __call__(self, make_request, bot, method):
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            record_span(
+                "bot_api",
+                type(method).__name__,
+                (time.perf_counter() - start) * 1000,
+            )
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger("sharding")
+
+_HEARTBEAT_INTERVAL_SECONDS = 2.0
+_HEALTH_CHECK_INTERVAL_SECONDS = 5.0
+_ADMIN_REFRESH_SECONDS = 60.0
+_POLL_TIMEOUT_SECONDS = 30
+_STOP_TIMEOUT_SECONDS = 10.0
+
+
+def update_user_id(update: dict[str, Any]) -> int | None:
+    for key, value in update.items():
+        if key == "update_id" or not isinstance(value, dict):
+            continue
+        sender = value.get("from") or value.get("user")
+        if isinstance(sender, dict) and "id" in sender:
+            return int(sender["id"])
+        chat = value.get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+    return None
+
+
+def shard_for(update: dict[str, Any], workers: int) -> int:
+    user_id = update_user_id(update)
+    key = user_id if user_id is not None else int(update.get("update_id", 0))
+    return key % workers
+
+
+@dataclass
+class _Worker:
+    index: int
+    inbox: Any
+    heartbeat: Any
+    # Shared by all workers: reminder changes for the supervisor's scheduler.
+    outbox: Any
+    process: mp.process.BaseProcess | None = None
+    restarts: int = 0
+
+
+def _worker_main(index: int, inbox: Any, heartbeat: Any, outbox: Any) -> None:
+    asyncio.run(_worker_loop(index, inbox, heartbeat, outbox))
+
+
+async def _worker_loop(index: int, inbox: Any, heartbeat: Any, outbox: Any) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.main import (
+        bot,
+        load_admin_ids,
+        on_shutdown,
+        on_worker_startup,
+        refresh_access_cache,
+        reminder_service,
+        setup_dispatcher,
+    )
+
+    reminder_service.forward_to(outbox)
+    dp = setup_dispatcher()
+    await on_worker_startup()
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(settings.bot_worker_concurrency)
+    # Bounds updates taken off the inbox, including ones waiting behind the same user.
+    accepted = asyncio.Semaphore(settings.bot_worker_concurrency + settings.bot_worker_queue_size)
+    tails: dict[int, asyncio.Task] = {}
+
+    parent = mp.parent_process()
+
+    async def _beat() -> None:
+        while True:
+            # Workers are not daemonic, so they must notice a supervisor that died without _stop.
+            if parent is not None and not parent.is_alive():
+                logger.warning("SHARD_WORKER_ORPHANED worker=%s", index)
+                os._exit(1)
+            heartbeat.value = time.time()
+            await asyncio.sleep(_HEARTBEAT_INTERVAL_SECONDS)
+
+    async def _refresh_admins() -> None:
+        while True:
+            await asyncio.sleep(_ADMIN_REFRESH_SECONDS)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await load_admin_ids(session)
+            except Exception:
+                logger.exception("SHARD_ADMIN_REFRESH_ERROR worker=%s", index)
+
+    async def _refresh_access() -> None:
+        while True:
+            await asyncio.sleep(settings.access_cache_refresh_seconds)
+            await refresh_access_cache()
+
+    async def _handle(update: dict[str, Any], previous: asyncio.Task | None) -> None:
+        try:
+            if previous:
+                # Keeps per-user ordering: wait for the user's previous update. The slot is
+                # taken only afterwards so one user's burst cannot hold every slot.
+                await asyncio.wait({previous})
+            async with slots:
+                await dp.feed_raw_update(bot, update)
+        except Exception:
+            logger.exception(
+                "SHARD_UPDATE_ERROR worker=%s update_id=%s", index, update.get("update_id")
+            )
+        finally:
+            accepted.release()
+
+    def _forget(user_id: int, task: asyncio.Task) -> None:
+        if tails.get(user_id) is task:
+            tails.pop(user_id, None)
+
+    background = [
+        asyncio.create_task(_beat()),
+        asyncio.create_task(_refresh_admins()),
+        asyncio.create_task(_refresh_access()),
+    ]
+    logger.info("SHARD_WORKER_START worker=%s", index)
+    try:
+        while True:
+            update = await loop.run_in_executor(None, inbox.get)
+            if update is None:
+                break
+            await accepted.acquire()
+            user_id = update_user_id(update) or 0
+            task = asyncio.create_task(_handle(update, tails.get(user_id)))
+            tails[user_id] = task
+            task.add_done_callback(lambda done, uid=user_id: _forget(uid, done))
+        pending = list(tails.values())
+        if pending:
+            await asyncio.wait(pending, timeout=_STOP_TIMEOUT_SECONDS)
+    finally:
+        for task in background:
+            task.cancel()
+        await on_shutdown(dp)
+        await bot.session.close()
+
+
+def _spawn(ctx: Any, worker: _Worker) -> None:
+    worker.heartbeat.value = time.time()
+    process = ctx.Process(
+        target=_worker_main,
+        args=(worker.index, worker.inbox, worker.heartbeat, worker.outbox),
+        name=f"bot-worker-{worker.index}",
+        # Daemonic processes cannot have children, and workers may run process pools
+        # (local STT, SRS forecast). _stop joins them instead.
+        daemon=False,
+    )
+    process.start()
+    worker.process = process
+
+
+def _is_healthy(worker: _Worker) -> bool:
+    if not worker.process or not worker.process.is_alive():
+        return False
+    stale_for = time.time() - worker.heartbeat.value
+    return stale_for <= settings.bot_worker_heartbeat_timeout_seconds
+
+
+async def _monitor(ctx: Any, pool: list[_Worker]) -> None:
+    while True:
+        await asyncio.sleep(_HEALTH_CHECK_INTERVAL_SECONDS)
+        for worker in pool:
+            if _is_healthy(worker):
+                continue
+            process = worker.process
+            exitcode = process.exitcode if process else None
+            logger.warning(
+                "SHARD_WORKER_RESTART worker=%s exitcode=%s restarts=%s",
+                worker.index,
+                exitcode,
+                worker.restarts,
+            )
+            if process and process.is_alive():
+                process.kill()
+                process.join(timeout=_STOP_TIMEOUT_SECONDS)
+            worker.restarts += 1
+            _spawn(ctx, worker)
+
+
+def _stop(pool: list[_Worker]) -> None:
+    for worker in pool:
+        try:
+            worker.inbox.put_nowait(None)
+        except Exception:
+            pass
+    deadline = time.monotonic() + _STOP_TIMEOUT_SECONDS
+    for worker in pool:
+        if not worker.process:
+            continue
+        worker.process.join(timeout=max(0.0, deadline - time.monotonic()))
+        if worker.process.is_alive():
+            logger.warning("SHARD_WORKER_TERMINATE worker=%s", worker.index)
+            worker.process.terminate()
+            worker.process.join(timeout=_STOP_TIMEOUT_SECONDS)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+
+
+async def _relay_reminders(outbox: Any) -> None:
+    from app.main import reminder_service
+
+    loop = asyncio.get_running_loop()
+    while True:
+        command = await loop.run_in_executor(None, outbox.get)
+        if command is None:
+            return
+        try:
+            reminder_service.apply(command)
+        except Exception:
+            logger.exception("SHARD_REMINDER_ERROR command=%s", command)
+
+
+async def run_sharded(workers: int) -> None:
+    from app.main import bot, on_startup, setup_dispatcher
+
+    if settings.bot_mode != "polling":
+        raise RuntimeError("BOT_WORKERS > 1 requires BOT_MODE=polling")
+    ctx = mp.get_context("spawn")
+    dp = setup_dispatcher()
+    # The supervisor owns the singletons: bot commands, reminders, backups.
+    await on_startup(dp)
+    allowed_updates = dp.resolve_used_update_types()
+    outbox = ctx.Queue()
+    pool = [
+        _Worker(
+            index=index,
+            inbox=ctx.Queue(maxsize=settings.bot_worker_queue_size),
+            heartbeat=ctx.Value("d", 0.0),
+            outbox=outbox,
+        )
+        for index in range(workers)
+    ]
+    for worker in pool:
+        _spawn(ctx, worker)
+    monitor = asyncio.create_task(_monitor(ctx, pool))
+    relay = asyncio.create_task(_relay_reminders(outbox))
+    loop = asyncio.get_running_loop()
+    await bot.delete_webhook(drop_pending_updates=False)
+    logger.info("SHARD_SUPERVISOR_START workers=%s", workers)
+    offset: int | None = None
+    try:
+        while True:
+            try:
+                updates = await bot.get_updates(
+                    offset=offset,
+                    timeout=_POLL_TIMEOUT_SECONDS,
+                    allowed_updates=allowed_updates,
+                )
+            except Exception:
+                logger.exception("SHARD_POLL_ERROR")
+                await asyncio.sleep(1)
+                continue
+            for update in updates:
+                raw = update.model_dump(mode="json", by_alias=True, exclude_none=True)
+                worker = pool[shard_for(raw, workers)]
+                await loop.run_in_executor(None, worker.inbox.put, raw)
+                offset = update.update_id + 1
+    finally:
+        monitor.cancel()
+        _stop(pool)
+        # Unblocks the relay's outbox.get() after the workers' last changes.
+        outbox.put(None)
+        await asyncio.wait({relay}, timeout=_STOP_TIMEOUT_SECONDS)
+        await bot.session.close()
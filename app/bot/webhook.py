@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from app.config import settings
+from app.services.stt.assemblyai_webhook import setup_callback_route
+
+logger = logging.getLogger("webhook")
+
+_DRAIN_TIMEOUT_SECONDS = 10.0
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        max_in_flight: int,
+        max_pending: int,
+        secret_token: str | None = None,
+        **data: Any,
+    ) -> None:
+        super().__init__(
+            dispatcher,
+            bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def _background_feed_update(self, bot: Bot, update: dict[str, Any]) -> None:
+        async with self._slots:
+            try:
+                await super()._background_feed_update(bot, update)
+            except Exception:
+                logger.exception("WEBHOOK_UPDATE_ERROR update_id=%s", update.get("update_id"))
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        pending = len(self._background_feed_update_tasks)
+        if pending >= self.max_pending:
+            # Telegram redelivers on non-2xx, so shed load instead of buffering.
+            logger.warning("WEBHOOK_OVERLOAD pending=%s", pending)
+            return web.Response(status=503)
+        return await super()._handle_request_background(bot, request)
+
+    async def close(self) -> None:
+        tasks = list(self._background_feed_update_tasks)
+        if tasks:
+            logger.info("WEBHOOK_DRAIN pending=%s", len(tasks))
+            await asyncio.wait(tasks, timeout=_DRAIN_TIMEOUT_SECONDS)
+        await super().close()
+
+
+async def _health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+def webhook_url() -> str:
+    if not settings.webhook_base_url:
+        raise RuntimeError("WEBHOOK_BASE_URL is required when BOT_MODE=webhook")
+    return settings.webhook_base_url.rstrip("/") + settings.webhook_path
+
+
+def build_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dp,
+        bot,
+        max_in_flight=settings.webhook_max_in_flight,
+        max_pending=settings.webhook_max_pending,
+        secret_token=settings.webhook_secret,
+    )
+    handler.register(app, path=settings.webhook_path)
+    app.router.add_get("/healthz", _health)
+    setup_callback_route(app)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    url = webhook_url()
+    # aiogram skips the header check when the secret is empty, so refuse to start without one.
+    if not settings.webhook_secret:
+        raise RuntimeError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
+    app = build_webhook_app(dp, bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    await site.start()
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=min(100, settings.webhook_max_in_flight),
+    )
+    logger.info(
+        "WEBHOOK_START url=%s host=%s port=%s",
+        url,
+        settings.webhook_host,
+        settings.webhook_port,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -13,7 +13,21 @@ class Settings(BaseSettings):
     stt_max_concurrency: int = 5
     stt_overload_mode: str = "queue"
     stt_queue_max_wait_seconds: int = 10
+    stt_direct_upload: bool = True
+    stt_provider: str = "assemblyai"
+    stt_local_model: str = "stub"
+    stt_local_workers: int = 2
+    stt_local_queue_size: int = 8
+    stt_queue_stats_minutes: int = 15
+    assemblyai_base_url: str = "https://api.assemblyai.com/v2"
+    assemblyai_webhook_base_url: str | None = None
+    assemblyai_webhook_path: str = "/assemblyai/webhook"
+    assemblyai_webhook_secret: str | None = None
+    assemblyai_webhook_port: int = 8090
+    assemblyai_webhook_timeout_seconds: int = 30
+    assemblyai_webhook_poll_seconds: float = 5.0
     basic_monthly_seconds: int = 500
+    credit_usage_reconcile_hours: int = 6
     timezone: str = "Asia/Tashkent"
     admin_contact_username: str | None = None
     telegram_stars_provider_token: str | None = None
@@ -21,6 +35,15 @@ class Settings(BaseSettings):
     google_translate_api_key: str | None = None
     google_translate_url: str = "https://translation.googleapis.com/language/translate/v2"
     google_translate_timeout_seconds: int = 15
+    google_translate_batch_window_ms: int = 10
+    google_translate_batch_size: int = 32
+    google_translate_max_in_flight: int = 4
+    translation_memory_cache_size: int = 10000
+    translation_cache_ttl_seconds: int = 6 * 3600
+    translation_negative_ttl_seconds: int = 3600
+    translation_error_ttl_seconds: int = 60
+    translation_cache_stats_minutes: int = 15
+    translation_speculative: bool = True
     admin_owner_id: int | None = None
     admin_user_ids: set[int] = set()
     backup_dir: str = "/app/backups"
@@ -34,6 +57,43 @@ class Settings(BaseSettings):
     manual_backup_prefix: str = "manual_vocab_"
     pre_restore_backup_prefix: str = "pre_restore_vocab_"
     backup_lock_timeout_seconds: int = 600
+    bot_mode: str = "polling"
+    telegram_api_base_url: str | None = None
+    webhook_base_url: str | None = None
+    webhook_path: str = "/telegram/webhook"
+    webhook_secret: str | None = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_max_in_flight: int = 64
+    webhook_max_pending: int = 1024
+    bot_workers: int = 1
+    bot_worker_concurrency: int = 32
+    bot_worker_queue_size: int = 1000
+    bot_worker_heartbeat_timeout_seconds: int = 30
+    fsm_storage: str = "postgres"
+    fsm_state_ttl_seconds: int = 7 * 24 * 3600
+    trace_enabled: bool = True
+    trace_slow_update_ms: int = 1000
+    access_cache_refresh_seconds: int = 30
+    runtime_config_listen: bool = True
+    runtime_config_poll_seconds: int = 60
+    review_write_behind: bool = False
+    review_buffer_dir: str = "data/review_journal"
+    review_buffer_flush_seconds: int = 5
+    srs_forecast_days: int = 30
+    srs_forecast_history_days: int = 90
+    srs_scheduler: str = "exact"
+    srs_fuzz_ratio: float = 0.05
+    srs_due_histogram_max_users: int = 10000
+    srs_due_histogram_ttl_seconds: int = 3600
+    reminder_spread_seconds: int = 0
+    distractor_index_max_users: int = 2000
+    distractor_index_ttl_seconds: int = 3600
+    http2_enabled: bool = True
+    http_pool_max_connections: int = 20
+    http_pool_max_keepalive: int = 10
+    http_keepalive_expiry_seconds: float = 60.0
+    http_pool_stats_minutes: int = 15
 
     @field_validator("log_level")
     @classmethod
@@ -91,5 +151,41 @@ class Settings(BaseSettings):
             raise ValueError("Invalid STT_OVERLOAD_MODE value")
         return normalized
 
+    @field_validator("stt_provider")
+    @classmethod
+    def validate_stt_provider(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"assemblyai", "local"}
+        if normalized not in allowed:
+            raise ValueError("Invalid STT_PROVIDER value")
+        return normalized
+
+    @field_validator("bot_mode")
+    @classmethod
+    def validate_bot_mode(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"polling", "webhook"}
+        if normalized not in allowed:
+            raise ValueError("Invalid BOT_MODE value")
+        return normalized
+
+    @field_validator("fsm_storage")
+    @classmethod
+    def validate_fsm_storage(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"memory", "postgres"}
+        if normalized not in allowed:
+            raise ValueError("Invalid FSM_STORAGE value")
+        return normalized
+
+    @field_validator("srs_scheduler")
+    @classmethod
+    def validate_srs_scheduler(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"exact", "balanced"}
+        if normalized not in allowed:
+            raise ValueError("Invalid SRS_SCHEDULER value")
+        return normalized
+
 
 settings = Settings()
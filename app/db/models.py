@@ -12,6 +12,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     Time,
@@ -134,6 +135,7 @@ class Review(Base):
 
 class ReviewLog(Base):
     __tablename__ = "review_logs"
+    __table_args__ = (Index("ix_review_logs_review_key", "review_key", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -144,6 +146,8 @@ class ReviewLog(Base):
     ef_after: Mapped[float | None] = mapped_column(Float)
     interval_before: Mapped[int | None] = mapped_column(Integer)
     interval_after: Mapped[int | None] = mapped_column(Integer)
+    # Set for buffered reviews so a replayed batch is not applied twice.
+    review_key: Mapped[str | None] = mapped_column(String(36))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
 
@@ -204,6 +208,18 @@ class CreditLedger(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
 
+class CreditUsageMonthly(Base):
+    __tablename__ = "credit_usage_monthly"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    # First day of the UTC month, matching how charges were summed from the ledger.
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    basic_used_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    topup_used_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    charge_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
+
+
 class StarsPayment(Base):
     __tablename__ = "stars_payments"
     __table_args__ = (UniqueConstraint("payload", name="uq_stars_payments_payload"),)
@@ -334,3 +350,15 @@ class TrainingSession(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, unique=True)
     current_word_id: Mapped[int | None] = mapped_column(ForeignKey("words.id"))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+
+class FsmState(Base):
+    __tablename__ = "fsm_states"
+    __table_args__ = (Index("ix_fsm_states_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[str | None] = mapped_column(String(128))
+    data: Mapped[bytes | None] = mapped_column(LargeBinary)
+    version: Mapped[int] = mapped_column(BigInteger, default=1, nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
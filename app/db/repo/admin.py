@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Date, cast, func, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import AdminAuditLog, CreditBalance, CreditLedger, FeatureFlag, PronunciationLog, QuizSession, ReviewLog, User, Word
+from app.db.models import AdminAuditLog, CreditBalance, FeatureFlag, PronunciationLog, QuizSession, ReviewLog, User, Word
 from app.db.repo.app_settings import get_basic_monthly_seconds
+from app.db.repo.credits import basic_used_this_month
 from app.config import settings
+from app.services.access_cache import access_cache
+from app.services.due_histogram import due_histograms
+from app.services.runtime_config import runtime_config
 from app.services.srs import initial_ease_factor, initial_interval_days
 
 
@@ -159,17 +164,7 @@ async def get_user_summary(session: AsyncSession, telegram_id: int) -> dict[str,
     )
     last_activity = await _get_user_last_activity(session, user.id)
     balance = await session.get(CreditBalance, user.id)
-    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    used_basic = (
-        await session.execute(
-            select(func.coalesce(func.sum(CreditLedger.basic_delta_seconds), 0)).where(
-                CreditLedger.user_id == user.id,
-                CreditLedger.event_type == "charge",
-                CreditLedger.created_at >= month_start,
-            )
-        )
-    ).scalar_one()
-    used_basic_seconds = int(-(used_basic or 0))
+    used_basic_seconds = await basic_used_this_month(session, user.id, datetime.utcnow())
     basic_limit = await get_basic_monthly_seconds(session)
     if not basic_limit or basic_limit <= 0:
         basic_limit = settings.basic_monthly_seconds
@@ -221,10 +216,16 @@ async def _get_user_last_activity(session: AsyncSession, user_id: int) -> dateti
 
 
 async def set_user_blocked(session: AsyncSession, user_id: int, blocked: bool) -> None:
-    await session.execute(
-        update(User).where(User.id == user_id).values(is_blocked=blocked)
+    result = await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_blocked=blocked)
+        .returning(User.telegram_id)
     )
+    telegram_id = result.scalar_one_or_none()
     await session.commit()
+    if telegram_id is not None:
+        access_cache.set_blocked(int(telegram_id), blocked)
 
 
 async def srs_health_overview(session: AsyncSession) -> dict[str, object]:
@@ -253,6 +254,34 @@ async def srs_health_overview(session: AsyncSession) -> dict[str, object]:
     }
 
 
+async def stream_forecast_cards(
+    session: AsyncSession, today: date, chunk_size: int = 100_000
+) -> AsyncIterator[list[tuple[int, int, int, float, int]]]:
+    due_day = cast(Word.srs_due_at, Date) - literal(today, Date)
+    result = await session.stream(
+        select(
+            Word.user_id,
+            Word.srs_repetitions,
+            Word.srs_interval_days,
+            Word.srs_ease_factor,
+            due_day,
+        ).execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.partitions():
+        yield partition
+
+
+async def review_quality_counts(
+    session: AsyncSession, since: datetime
+) -> list[tuple[int, int, int]]:
+    result = await session.execute(
+        select(ReviewLog.user_id, ReviewLog.q, func.count(ReviewLog.id))
+        .where(ReviewLog.q.is_not(None), ReviewLog.created_at >= since)
+        .group_by(ReviewLog.user_id, ReviewLog.q)
+    )
+    return [(int(row[0]), int(row[1]), int(row[2])) for row in result.all()]
+
+
 async def _top_again_words(session: AsyncSession) -> list[tuple[str, int]]:
     result = await session.execute(
         select(Word.word, func.count(ReviewLog.id).label("cnt"))
@@ -281,17 +310,23 @@ async def reset_user_srs(session: AsyncSession, user_id: int, full_reset: bool)
         )
     await session.execute(update(Word).where(Word.user_id == user_id).values(**values))
     await session.commit()
+    due_histograms.forget(user_id)
 
 
 async def get_feature_flag(
     session: AsyncSession, name: str, default: bool = True
 ) -> bool:
+    snapshot = await runtime_config.get(session)
+    if name in snapshot.feature_flags:
+        return snapshot.feature_flags[name]
     result = await session.execute(select(FeatureFlag).where(FeatureFlag.name == name))
     flag = result.scalar_one_or_none()
     if not flag:
         session.add(FeatureFlag(name=name, enabled=default))
         await session.commit()
+        runtime_config.remember_flag(name, default)
         return default
+    runtime_config.remember_flag(name, flag.enabled)
     return flag.enabled
 
 
@@ -302,4 +337,6 @@ async def set_feature_flag(session: AsyncSession, name: str, enabled: bool) -> N
         session.add(FeatureFlag(name=name, enabled=enabled))
     else:
         flag.enabled = enabled
+    await runtime_config.notify(session)
     await session.commit()
+    await runtime_config.reload(session)
@@ -4,17 +4,15 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import AppSetting, SettingsChangeLog
+from app.services.runtime_config import runtime_config
 
 ADMIN_CONTACT_KEY = "admin_contact_username"
 BASIC_MONTHLY_SECONDS_KEY = "basic_monthly_seconds"
 
 
 async def get_setting(session: AsyncSession, key: str) -> str | None:
-    result = await session.execute(
-        select(AppSetting).where(AppSetting.key == key)
-    )
-    setting = result.scalar_one_or_none()
-    return setting.value if setting else None
+    snapshot = await runtime_config.get(session)
+    return snapshot.app_settings.get(key)
 
 
 async def set_setting(session: AsyncSession, key: str, value: str | None) -> None:
@@ -26,7 +24,9 @@ async def set_setting(session: AsyncSession, key: str, value: str | None) -> Non
         setting.value = value
     else:
         session.add(AppSetting(key=key, value=value))
+    await runtime_config.notify(session)
     await session.commit()
+    await runtime_config.reload(session)
 
 
 async def get_admin_contact_username(session: AsyncSession) -> str | None:
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from math import ceil
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Date, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.db.models import CreditBalance, CreditLedger
+from app.db.models import CreditBalance, CreditLedger, CreditUsageMonthly
 from app.db.repo.app_settings import get_basic_monthly_seconds
 from app.services.i18n import t
 
+logger = logging.getLogger("credits")
+
 
 class CreditError(Exception):
     def __init__(
@@ -106,25 +110,55 @@ async def _apply_refill_if_due(
     )
 
 
-async def _basic_used_this_month(session: AsyncSession, user_id: int, now_utc: datetime) -> int:
-    month_start = now_utc.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    used = (
-        await session.execute(
-            select(func.coalesce(func.sum(CreditLedger.basic_delta_seconds), 0)).where(
-                CreditLedger.user_id == user_id,
-                CreditLedger.event_type == "charge",
-                CreditLedger.created_at >= month_start,
-            )
+def usage_month(now_utc: datetime) -> date:
+    return now_utc.date().replace(day=1)
+
+
+async def basic_used_this_month(session: AsyncSession, user_id: int, now_utc: datetime) -> int:
+    used = await session.scalar(
+        select(CreditUsageMonthly.basic_used_seconds).where(
+            CreditUsageMonthly.user_id == user_id,
+            CreditUsageMonthly.month == usage_month(now_utc),
+        )
+    )
+    return int(used or 0)
+
+
+async def _add_usage(
+    session: AsyncSession, user_id: int, now_utc: datetime, basic_seconds: int, topup_seconds: int
+) -> None:
+    stmt = pg_insert(CreditUsageMonthly).values(
+        user_id=user_id,
+        month=usage_month(now_utc),
+        basic_used_seconds=basic_seconds,
+        topup_used_seconds=topup_seconds,
+        charge_count=1,
+        updated_at=now_utc,
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CreditUsageMonthly.user_id, CreditUsageMonthly.month],
+            set_={
+                "basic_used_seconds": CreditUsageMonthly.basic_used_seconds
+                + stmt.excluded.basic_used_seconds,
+                "topup_used_seconds": CreditUsageMonthly.topup_used_seconds
+                + stmt.excluded.topup_used_seconds,
+                "charge_count": CreditUsageMonthly.charge_count + 1,
+                "updated_at": stmt.excluded.updated_at,
+            },
         )
-    ).scalar_one()
-    return int(-used or 0)
+    )
 
 
 async def _enforce_basic_limit(
-    session: AsyncSession, balance: CreditBalance, now_utc: datetime
+    session: AsyncSession,
+    balance: CreditBalance,
+    now_utc: datetime,
+    limit_seconds: int | None = None,
 ) -> tuple[int, int]:
-    limit_seconds = await _get_basic_monthly_seconds(session)
-    used_basic = await _basic_used_this_month(session, balance.user_id, now_utc)
+    if limit_seconds is None:
+        limit_seconds = await _get_basic_monthly_seconds(session)
+    used_basic = await basic_used_this_month(session, balance.user_id, now_utc)
     allowed_remaining = max(0, limit_seconds - used_basic)
     if balance.basic_remaining_seconds > allowed_remaining:
         balance.basic_remaining_seconds = allowed_remaining
@@ -147,6 +181,61 @@ def _out_of_credit_message(balance: CreditBalance) -> str:
     )
 
 
+async def _charge_balance(
+    session: AsyncSession, user_id: int, charge_seconds: int, limit_seconds: int, now_utc: datetime
+) -> tuple[int, int] | None:
+    # Common case: balance exists, no refill due, enough credit. The row is locked by its own
+    # statement first so the UPDATE's snapshot starts after the lock and sees the usage counter
+    # committed by the previous holder; a snapshot taken before the wait would clamp to a
+    # stale counter and let concurrent charges overrun a lowered monthly limit.
+    locked = await session.scalar(
+        select(CreditBalance.user_id)
+        .where(CreditBalance.user_id == user_id, CreditBalance.next_basic_refill_at > now_utc)
+        .with_for_update()
+    )
+    if locked is None:
+        return None
+    used = func.coalesce(
+        select(CreditUsageMonthly.basic_used_seconds)
+        .where(
+            CreditUsageMonthly.user_id == CreditBalance.user_id,
+            CreditUsageMonthly.month == usage_month(now_utc),
+        )
+        .scalar_subquery(),
+        0,
+    )
+    current = (
+        select(
+            CreditBalance.user_id,
+            func.least(
+                CreditBalance.basic_remaining_seconds, func.greatest(0, limit_seconds - used)
+            ).label("basic"),
+            CreditBalance.topup_remaining_seconds.label("topup"),
+        )
+        .where(CreditBalance.user_id == user_id)
+        .cte("current_balance")
+    )
+    basic_deduct = func.least(current.c.basic, charge_seconds)
+    result = await session.execute(
+        update(CreditBalance)
+        .where(
+            CreditBalance.user_id == current.c.user_id,
+            current.c.basic + current.c.topup >= charge_seconds,
+        )
+        .values(
+            basic_remaining_seconds=current.c.basic - basic_deduct,
+            topup_remaining_seconds=current.c.topup - (charge_seconds - basic_deduct),
+            updated_at=now_utc,
+        )
+        .returning(basic_deduct)
+        .execution_options(synchronize_session=False)
+    )
+    deducted = result.scalar_one_or_none()
+    if deducted is None:
+        return None
+    return deducted, charge_seconds - deducted
+
+
 async def reserve_credits(
     session: AsyncSession,
     user_id: int,
@@ -154,27 +243,19 @@ async def reserve_credits(
     provider: str | None = None,
 ) -> CreditReservation:
     now_utc = _now_utc()
-    balance = await _get_or_create_balance_for_update(session, user_id, now_utc)
-    await _apply_refill_if_due(session, balance, now_utc)
-    await _enforce_basic_limit(session, balance, now_utc)
     charge_seconds = _calculate_charge_seconds(audio_duration_seconds)
     if charge_seconds <= 0:
         raise CreditError(
             "Invalid audio duration", user_message=t("credits.invalid_duration")
         )
-    total_available = balance.basic_remaining_seconds + balance.topup_remaining_seconds
-    if total_available < charge_seconds:
-        raise CreditError(
-            "Insufficient credits",
-            user_message=_out_of_credit_message(balance),
-            code="out_of_credit",
+    limit_seconds = await _get_basic_monthly_seconds(session)
+    deducted = await _charge_balance(session, user_id, charge_seconds, limit_seconds, now_utc)
+    if deducted is None:
+        basic_deduct, topup_deduct = await _charge_slow(
+            session, user_id, charge_seconds, limit_seconds, now_utc
         )
-    basic_deduct = min(balance.basic_remaining_seconds, charge_seconds)
-    remaining = charge_seconds - basic_deduct
-    topup_deduct = min(balance.topup_remaining_seconds, remaining)
-    balance.basic_remaining_seconds -= basic_deduct
-    balance.topup_remaining_seconds -= topup_deduct
-    balance.updated_at = now_utc
+    else:
+        basic_deduct, topup_deduct = deducted
     ledger = CreditLedger(
         user_id=user_id,
         event_type="charge",
@@ -183,8 +264,10 @@ async def reserve_credits(
         charge_seconds=charge_seconds,
         audio_duration_seconds=audio_duration_seconds,
         provider=provider,
+        created_at=now_utc,
     )
     session.add(ledger)
+    await _add_usage(session, user_id, now_utc, basic_deduct, topup_deduct)
     await session.flush()
     await session.commit()
     return CreditReservation(
@@ -195,6 +278,28 @@ async def reserve_credits(
     )
 
 
+async def _charge_slow(
+    session: AsyncSession, user_id: int, charge_seconds: int, limit_seconds: int, now_utc: datetime
+) -> tuple[int, int]:
+    balance = await _get_or_create_balance_for_update(session, user_id, now_utc)
+    await _apply_refill_if_due(session, balance, now_utc)
+    await _enforce_basic_limit(session, balance, now_utc, limit_seconds)
+    total_available = balance.basic_remaining_seconds + balance.topup_remaining_seconds
+    if total_available < charge_seconds:
+        raise CreditError(
+            "Insufficient credits",
+            user_message=_out_of_credit_message(balance),
+            code="out_of_credit",
+        )
+    basic_deduct = min(balance.basic_remaining_seconds, charge_seconds)
+    remaining = charge_seconds - basic_deduct
+    topup_deduct = min(balance.topup_remaining_seconds, remaining)
+    balance.basic_remaining_seconds -= basic_deduct
+    balance.topup_remaining_seconds -= topup_deduct
+    balance.updated_at = now_utc
+    return basic_deduct, topup_deduct
+
+
 async def finalize_charge(
     session: AsyncSession, ledger_id: int, provider_request_id: str | None = None
 ) -> None:
@@ -255,6 +360,72 @@ async def refund_charge(
     await session.commit()
 
 
+_RECONCILE_BATCH_USERS = 500
+
+
+async def reconcile_usage_counters(session: AsyncSession, since: date) -> int:
+    user_ids = (
+        await session.scalars(
+            select(CreditLedger.user_id)
+            .where(CreditLedger.event_type == "charge", CreditLedger.created_at >= since)
+            .group_by(CreditLedger.user_id)
+            .order_by(CreditLedger.user_id)
+        )
+    ).all()
+    await session.commit()
+    fixed = []
+    for start in range(0, len(user_ids), _RECONCILE_BATCH_USERS):
+        batch = user_ids[start : start + _RECONCILE_BATCH_USERS]
+        # Charges hold their balance row lock until they commit. Taking the same locks first
+        # waits out in-flight charges, so the totals below (a new snapshot) include them, and
+        # blocks new charges for these users until the counters are written.
+        await session.execute(
+            select(CreditBalance.user_id)
+            .where(CreditBalance.user_id.in_(batch))
+            .order_by(CreditBalance.user_id)
+            .with_for_update()
+        )
+        month = func.date_trunc("month", CreditLedger.created_at)
+        totals = (
+            select(
+                CreditLedger.user_id,
+                cast(month, Date).label("month"),
+                (-func.sum(CreditLedger.basic_delta_seconds)).label("basic"),
+                (-func.sum(CreditLedger.topup_delta_seconds)).label("topup"),
+                func.count().label("charges"),
+                func.now().label("updated_at"),
+            )
+            .where(
+                CreditLedger.event_type == "charge",
+                CreditLedger.created_at >= since,
+                CreditLedger.user_id.in_(batch),
+            )
+            .group_by(CreditLedger.user_id, cast(month, Date))
+        )
+        stmt = pg_insert(CreditUsageMonthly).from_select(
+            ["user_id", "month", "basic_used_seconds", "topup_used_seconds", "charge_count", "updated_at"],
+            totals,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CreditUsageMonthly.user_id, CreditUsageMonthly.month],
+            set_={
+                "basic_used_seconds": stmt.excluded.basic_used_seconds,
+                "topup_used_seconds": stmt.excluded.topup_used_seconds,
+                "charge_count": stmt.excluded.charge_count,
+                "updated_at": func.now(),
+            },
+            where=(CreditUsageMonthly.basic_used_seconds != stmt.excluded.basic_used_seconds)
+            | (CreditUsageMonthly.topup_used_seconds != stmt.excluded.topup_used_seconds)
+            | (CreditUsageMonthly.charge_count != stmt.excluded.charge_count),
+        ).returning(CreditUsageMonthly.user_id, CreditUsageMonthly.month)
+        fixed.extend((await session.execute(stmt)).all())
+        await session.commit()
+    for user_id, fixed_month in fixed[:20]:
+        logger.warning("CREDIT_USAGE_DRIFT user_id=%s month=%s", user_id, fixed_month)
+    logger.info("CREDIT_USAGE_RECONCILE since=%s users=%s fixed=%s", since, len(user_ids), len(fixed))
+    return len(fixed)
+
+
 async def add_topup(
     session: AsyncSession,
     user_id: int,
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import Collection
+from datetime import datetime
+
+from sqlalchemy import case, delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import FsmState
+
+
+async def load_fsm_state(
+    session: AsyncSession, key: str, known_version: int | None = None
+) -> tuple[int, str | None, bytes | None] | None:
+    now = datetime.utcnow()
+    data_column = (
+        FsmState.data
+        if known_version is None
+        else case((FsmState.version == known_version, None), else_=FsmState.data)
+    )
+    result = await session.execute(
+        select(FsmState.version, FsmState.state, data_column).where(
+            FsmState.key == key,
+            or_(FsmState.expires_at.is_(None), FsmState.expires_at > now),
+        )
+    )
+    row = result.one_or_none()
+    if not row:
+        return None
+    return int(row[0]), row[1], row[2]
+
+
+async def _upsert(session: AsyncSession, key: str, values: dict[str, object]) -> int:
+    now = datetime.utcnow()
+    stmt = insert(FsmState).values(key=key, version=1, updated_at=now, **values)
+    expired = FsmState.expires_at <= now
+    update_values: dict[str, object] = {
+        "version": FsmState.version + 1,
+        "expires_at": stmt.excluded.expires_at,
+        "updated_at": stmt.excluded.updated_at,
+        "state": case((expired, None), else_=FsmState.state),
+        "data": case((expired, None), else_=FsmState.data),
+    }
+    for column in values:
+        update_values[column] = getattr(stmt.excluded, column)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FsmState.key], set_=update_values
+    ).returning(FsmState.version)
+    version = (await session.execute(stmt)).scalar_one()
+    await session.commit()
+    return int(version)
+
+
+async def save_fsm_state(
+    session: AsyncSession, key: str, state: str | None, expires_at: datetime | None
+) -> int:
+    return await _upsert(session, key, {"state": state, "expires_at": expires_at})
+
+
+async def save_fsm_data(
+    session: AsyncSession, key: str, data: bytes | None, expires_at: datetime | None
+) -> int:
+    return await _upsert(session, key, {"data": data, "expires_at": expires_at})
+
+
+async def list_expired_fsm_states(
+    session: AsyncSession, states: Collection[str], now: datetime
+) -> list[tuple[str, str, bytes | None]]:
+    result = await session.execute(
+        select(FsmState.key, FsmState.state, FsmState.data).where(
+            FsmState.expires_at <= now, FsmState.state.in_(list(states))
+        )
+    )
+    return [(row[0], row[1], row[2]) for row in result.all()]
+
+
+async def purge_expired_fsm_states(
+    session: AsyncSession, now: datetime | None = None, keep: Collection[str] = ()
+) -> int:
+    stmt = delete(FsmState).where(FsmState.expires_at <= (now or datetime.utcnow()))
+    if keep:
+        stmt = stmt.where(FsmState.key.not_in(list(keep)))
+    result = await session.execute(stmt)
+    await session.commit()
+    return int(result.rowcount or 0)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Package, PackageChangeLog
 from app.services.i18n import t
+from app.services.runtime_config import runtime_config
 
 
 class PackageError(Exception):
@@ -27,18 +28,8 @@ class PackageDTO:
 
 
 async def list_packages(session: AsyncSession) -> list[PackageDTO]:
-    result = await session.execute(select(Package).order_by(Package.id))
-    return [
-        PackageDTO(
-            package_key=item.package_key,
-            seconds=item.seconds,
-            approx_attempts_5s=item.approx_attempts_5s,
-            manual_price_uzs=item.manual_price_uzs,
-            stars_price=item.stars_price,
-            is_active=item.is_active,
-        )
-        for item in result.scalars().all()
-    ]
+    snapshot = await runtime_config.get(session)
+    return list(snapshot.packages)
 
 
 async def get_package(session: AsyncSession, package_key: str) -> Package | None:
@@ -48,14 +39,13 @@ async def get_package(session: AsyncSession, package_key: str) -> Package | None
     return result.scalar_one_or_none()
 
 
-async def get_active_package(session: AsyncSession, package_key: str) -> Package | None:
-    result = await session.execute(
-        select(Package).where(
-            Package.package_key == package_key.upper(),
-            Package.is_active.is_(True),
-        )
-    )
-    return result.scalar_one_or_none()
+async def get_active_package(session: AsyncSession, package_key: str) -> PackageDTO | None:
+    snapshot = await runtime_config.get(session)
+    key = package_key.upper()
+    for package in snapshot.packages:
+        if package.package_key == key and package.is_active:
+            return package
+    return None
 
 
 def validate_manual_price(value: int) -> None:
@@ -134,7 +124,9 @@ async def update_package_prices(
             reason=reason,
         )
     )
+    await runtime_config.notify(session)
     await session.commit()
+    await runtime_config.reload(session)
     await session.refresh(package)
     return package
 
@@ -1,4 +1,6 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import delete, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,30 +14,21 @@ async def get_session(session: AsyncSession, user_id: int) -> TrainingSession |
     return result.scalar_one_or_none()
 
 
-async def create_session(session: AsyncSession, user_id: int) -> bool:
-    stmt = (
-        insert(TrainingSession)
-        .values(user_id=user_id)
-        .on_conflict_do_nothing(index_elements=[TrainingSession.user_id])
+async def upsert_session(session: AsyncSession, user_id: int, word_id: int | None) -> None:
+    stmt = insert(TrainingSession).values(
+        user_id=user_id, current_word_id=word_id, created_at=datetime.utcnow()
     )
-    result = await session.execute(stmt)
-    await session.commit()
-    return result.rowcount == 1
-
-
-async def update_session_word(
-    session: AsyncSession, user_id: int, word_id: int | None
-) -> None:
-    db_session = await get_session(session, user_id)
-    if not db_session:
-        return
-    db_session.current_word_id = word_id
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TrainingSession.user_id],
+        set_={
+            "current_word_id": stmt.excluded.current_word_id,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+    await session.execute(stmt)
     await session.commit()
 
 
 async def delete_session(session: AsyncSession, user_id: int) -> None:
-    db_session = await get_session(session, user_id)
-    if not db_session:
-        return
-    await session.delete(db_session)
+    await session.execute(delete(TrainingSession).where(TrainingSession.user_id == user_id))
     await session.commit()
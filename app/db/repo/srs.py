@@ -1,13 +1,50 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple
 from zoneinfo import ZoneInfo
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.db.models import ReviewLog, User, Word
-from app.services.srs import sm2_update
+from app.services.due_histogram import DueHistogram, due_histograms
+from app.services.srs import balanced_interval, sm2_update
+
+
+class PendingReview(NamedTuple):
+    user_id: int
+    word_id: int
+    q: int
+    reviewed_at: datetime
+    review_key: str | None = None
+
+
+class PracticeCard(NamedTuple):
+    id: int
+    word: str
+    translation: str
+    example: str | None
+
+
+async def get_practice_cards(
+    session: AsyncSession,
+    user_id: int,
+    limit: int,
+    new: bool = False,
+    exclude_ids: Iterable[int] = (),
+) -> list[PracticeCard]:
+    stmt = select(Word.id, Word.word, Word.translation, Word.example).where(Word.user_id == user_id)
+    if new:
+        stmt = stmt.where(Word.srs_repetitions == 0).order_by(Word.created_at.asc())
+    else:
+        stmt = stmt.where(Word.srs_due_at <= datetime.utcnow()).order_by(Word.srs_due_at.asc())
+    exclude_ids = list(exclude_ids)
+    if exclude_ids:
+        stmt = stmt.where(Word.id.not_in(exclude_ids))
+    result = await session.execute(stmt.limit(limit))
+    return [PracticeCard(*row) for row in result.all()]
 
 
 async def get_due_words(session: AsyncSession, user_id: int, limit: int) -> list[Word]:
@@ -20,17 +57,13 @@ async def get_due_words(session: AsyncSession, user_id: int, limit: int) -> list
     return list(result.scalars().all())
 
 
-async def get_new_words(session: AsyncSession, user_id: int, limit: int) -> list[Word]:
-    result = await session.execute(
-        select(Word)
-        .where(Word.user_id == user_id, Word.srs_repetitions == 0)
-        .order_by(Word.created_at.asc())
-        .limit(limit)
-    )
-    return list(result.scalars().all())
-
-
-async def apply_review(session: AsyncSession, word: Word, q: int) -> None:
+def _review_word(
+    word: Word,
+    q: int,
+    reviewed_at: datetime,
+    histogram: DueHistogram | None = None,
+    review_key: str | None = None,
+) -> ReviewLog:
     ef_before = word.srs_ease_factor
     interval_before = word.srs_interval_days
     lapses_before = word.srs_lapses
@@ -40,19 +73,30 @@ async def apply_review(session: AsyncSession, word: Word, q: int) -> None:
         interval_days=word.srs_interval_days,
         ease_factor=word.srs_ease_factor,
         q=q,
+        now=reviewed_at,
     )
+    if histogram is not None:
+        interval = balanced_interval(
+            interval,
+            lambda days: histogram.load((reviewed_at + timedelta(days=days)).date()),
+            seed=word.id + reps,
+            ratio=settings.srs_fuzz_ratio,
+        )
+        due_at = reviewed_at + timedelta(days=interval)
+        histogram.move(word.srs_due_at.date() if word.srs_due_at else None, due_at.date())
 
     word.srs_repetitions = reps
     word.srs_interval_days = interval
     word.srs_ease_factor = ef
     word.srs_due_at = due_at
-    word.srs_last_review_at = datetime.utcnow()
-    await _update_streak(session, word.user_id)
+    # A buffered rating can land after a newer immediate review of the same word.
+    if word.srs_last_review_at is None or word.srs_last_review_at < reviewed_at:
+        word.srs_last_review_at = reviewed_at
     if lapses:
         word.srs_lapses = lapses_before + lapses
 
     action = "known" if q >= 4 else "skip" if q == 3 else "forgot"
-    log = ReviewLog(
+    return ReviewLog(
         user_id=word.user_id,
         word_id=word.id,
         action=action,
@@ -61,20 +105,97 @@ async def apply_review(session: AsyncSession, word: Word, q: int) -> None:
         ef_after=ef,
         interval_before=interval_before,
         interval_after=interval,
+        review_key=review_key,
+        created_at=reviewed_at,
     )
-    session.add(log)
+
+
+async def _due_histogram(session: AsyncSession, user_id: int) -> DueHistogram | None:
+    if settings.srs_scheduler != "balanced":
+        return None
+    return await due_histograms.get(session, user_id)
+
+
+async def apply_review(session: AsyncSession, word: Word, q: int) -> None:
+    now = datetime.utcnow()
+    histogram = await _due_histogram(session, word.user_id)
+    session.add(_review_word(word, q, now, histogram))
+    await _update_streak(session, word.user_id, now)
     await session.commit()
 
 
-async def _update_streak(session: AsyncSession, user_id: int) -> None:
+async def apply_reviews_bulk(
+    session: AsyncSession, reviews: Iterable[PendingReview], commit: bool = True
+) -> int:
+    reviews = sorted(reviews, key=lambda review: review.reviewed_at)
+    if not reviews:
+        return 0
+    result = await session.execute(
+        select(Word)
+        .where(Word.id.in_({review.word_id for review in reviews}))
+        .order_by(Word.id)
+        .with_for_update()
+    )
+    words = {word.id: word for word in result.scalars().all()}
+    result = await session.execute(
+        select(User).where(User.id.in_({review.user_id for review in reviews}))
+    )
+    users = {user.id: user for user in result.scalars().all()}
+    keys = {review.review_key for review in reviews if review.review_key}
+    applied_keys: set[str] = set()
+    if keys:
+        # Word rows are locked above, so no other flush can log these keys concurrently.
+        result = await session.execute(
+            select(ReviewLog.review_key).where(ReviewLog.review_key.in_(keys))
+        )
+        applied_keys = set(result.scalars().all())
+    histograms = {
+        user_id: await _due_histogram(session, user_id)
+        for user_id in {word.user_id for word in words.values()}
+    }
+    applied = 0
+    for review in reviews:
+        word = words.get(review.word_id)
+        if not word or word.user_id != review.user_id:
+            continue
+        # Replays after a crash must not apply the same rating twice.
+        if review.review_key:
+            if review.review_key in applied_keys:
+                continue
+            applied_keys.add(review.review_key)
+        session.add(
+            _review_word(
+                word,
+                review.q,
+                review.reviewed_at,
+                histograms.get(word.user_id),
+                review.review_key,
+            )
+        )
+        user = users.get(review.user_id)
+        if user:
+            _apply_streak(user, review.reviewed_at)
+        applied += 1
+    if commit:
+        await session.commit()
+    else:
+        await session.flush()
+    return applied
+
+
+async def _update_streak(session: AsyncSession, user_id: int, reviewed_at: datetime) -> None:
     result = await session.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user:
         return
+    _apply_streak(user, reviewed_at)
+
+
+def _apply_streak(user: User, reviewed_at: datetime) -> None:
     try:
-        now = datetime.now(ZoneInfo(user.timezone or "UTC"))
+        now = reviewed_at.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(user.timezone or "UTC"))
     except Exception:
-        now = datetime.utcnow()
+        now = reviewed_at
     today = now.date()
     last = user.last_review_date
     if last is None:
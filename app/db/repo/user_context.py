@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User, UserPublicProfile, UserSettings
+from app.db.repo.user_settings import get_or_create_user_settings
+from app.db.repo.users import create_user
+
+
+@dataclass(frozen=True)
+class UserContext:
+    user: User
+    settings: UserSettings
+    profile: UserPublicProfile | None
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+    @property
+    def telegram_id(self) -> int:
+        return self.user.telegram_id
+
+
+async def load_user_context(
+    session: AsyncSession, telegram_id: int, username: str | None = None
+) -> UserContext:
+    result = await session.execute(
+        select(User, UserSettings, UserPublicProfile)
+        .outerjoin(UserSettings, UserSettings.user_id == User.id)
+        .outerjoin(UserPublicProfile, UserPublicProfile.user_id == User.id)
+        .where(User.telegram_id == telegram_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        user = await create_user(session, telegram_id, username=username)
+        user_settings, profile = None, None
+    else:
+        user, user_settings, profile = row
+        if username and user.username != username:
+            user.username = username
+            await session.commit()
+    if user_settings is None:
+        user_settings = await get_or_create_user_settings(session, user)
+    return UserContext(user=user, settings=user_settings, profile=profile)
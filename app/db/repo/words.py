@@ -4,6 +4,7 @@ from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Review, ReviewLog, TrainingSession, User, Word
+from app.services.distractors import distractor_indexes
 from app.services.srs import initial_ease_factor, initial_interval_days
 
 
@@ -49,6 +50,7 @@ async def create_word_with_review(
     )
     await session.commit()
     await session.refresh(new_word)
+    distractor_indexes.word_saved(new_word)
     return new_word
 
 
@@ -99,6 +101,7 @@ async def update_word_text(
         return
     word.word = new_word.strip().lower()
     await session.commit()
+    distractor_indexes.word_saved(word)
 
 
 async def update_translation(
@@ -109,6 +112,7 @@ async def update_translation(
         return
     word.translation = new_translation.strip().lower()
     await session.commit()
+    distractor_indexes.word_saved(word)
 
 
 async def update_example(
@@ -143,6 +147,7 @@ async def delete_word(session: AsyncSession, user_id: int, word_id: int) -> None
     )
     await session.delete(word)
     await session.commit()
+    distractor_indexes.word_deleted(user_id, word_id)
 
 
 async def exists_word(
@@ -1,8 +1,10 @@
 import asyncio
 import logging
+from datetime import datetime, timedelta
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.types import BotCommand, BotCommandScopeChat, BotCommandScopeDefault
 
 from app.bot.handlers import (
@@ -22,18 +24,39 @@ from app.bot.handlers import (
     profile,
     word_selection,
 )
+from app.bot.fsm_storage import PostgresStorage, build_fsm_storage
 from app.bot.middlewares.blocked import BlockedUserMiddleware
+from app.bot.middlewares.db_session import DbSessionMiddleware, UserContextMiddleware
 from app.bot.middlewares.ignore_not_modified import IgnoreNotModifiedMiddleware
+from app.bot.middlewares.quiz_flush import QuizFlushMiddleware
+from app.bot.middlewares.tracing import (
+    TraceTagMiddleware,
+    TracingMiddleware,
+    TracingRequestMiddleware,
+)
+from app.bot.sharding import run_sharded
+from app.bot.webhook import run_webhook
 from app.config import settings as app_settings
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, engine
+from app.db.repo.credits import reconcile_usage_counters
 from app.db.repo.stars_payments import reprocess_paid
 from app.db.repo.bot_admins import ensure_owner_admin, list_admins, upsert_admin
 from app.db.repo.users import get_user_by_telegram_id
 from app.bot.handlers.admin.common import get_main_admin_id
+from app.services.access_cache import access_cache
+from app.services.http_clients import http_clients
 from app.services.log_buffer import ErrorBufferHandler
 from app.services.reminders import ReminderService
+from app.services.review_buffer import review_buffer
+from app.services.runtime_config import runtime_config
+from app.services.srs_forecast import shutdown_forecast_executor
+from app.services.stt.assemblyai_webhook import start_callback_server
+from app.services.stt.local_cpu import local_stt, shutdown_local_stt
+from app.services.stt.scheduler import stt_scheduler
 from app.services.db_backup.scheduler import setup_backup_scheduler
 from app.services.i18n import load_locales, t
+from app.services.tracing import install_sqlalchemy_tracing
+from app.services.translation.cache import log_stats as log_translation_cache_stats
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 logging.basicConfig(level=app_settings.log_level)
@@ -41,7 +64,16 @@ _error_handler = ErrorBufferHandler()
 _error_handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
 logging.getLogger().addHandler(_error_handler)
 
-bot = Bot(token=app_settings.bot_token)
+
+def _build_bot_session() -> AiohttpSession | None:
+    if not app_settings.telegram_api_base_url:
+        return None
+    return AiohttpSession(api=TelegramAPIServer.from_base(app_settings.telegram_api_base_url))
+
+
+bot = Bot(token=app_settings.bot_token, session=_build_bot_session())
+if app_settings.trace_enabled:
+    bot.session.middleware(TracingRequestMiddleware())
 
 scheduler = AsyncIOScheduler()
 reminder_service = ReminderService(scheduler)
@@ -71,9 +103,24 @@ async def setup_bot_commands(bot: Bot) -> None:
 
 
 def setup_dispatcher() -> Dispatcher:
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.update.middleware(BlockedUserMiddleware())
+    storage = build_fsm_storage(
+        expire_hooks={quiz.QuizStates.in_quiz.state: quiz.finish_abandoned_quiz}
+    )
+    dp = Dispatcher(storage=storage)
+    if app_settings.trace_enabled:
+        install_sqlalchemy_tracing(engine)
+        dp.update.outer_middleware(TracingMiddleware())
+        dp.message.middleware(TraceTagMiddleware())
+        dp.callback_query.middleware(TraceTagMiddleware())
     dp.update.middleware(IgnoreNotModifiedMiddleware())
+    dp.update.middleware(DbSessionMiddleware())
+    # Registered per event type: on dp.update the event is an Update and the checks never match.
+    dp.message.middleware(BlockedUserMiddleware())
+    dp.callback_query.middleware(BlockedUserMiddleware())
+    dp.message.middleware(UserContextMiddleware())
+    dp.callback_query.middleware(UserContextMiddleware())
+    dp.message.middleware(QuizFlushMiddleware())
+    dp.callback_query.middleware(QuizFlushMiddleware())
     dp.include_router(admin.entry_router)
     dp.include_router(admin.menu_router)
     dp.include_router(admin.stats_router)
@@ -109,12 +156,70 @@ def setup_dispatcher() -> Dispatcher:
     return dp
 
 
-async def on_startup() -> None:
+async def on_startup(dp: Dispatcher) -> None:
     load_locales()
     await setup_bot_commands(bot)
     setup_backup_scheduler(scheduler)
+    if isinstance(dp.storage, PostgresStorage):
+        scheduler.add_job(
+            dp.storage.purge_expired,
+            trigger="interval",
+            hours=1,
+            id="fsm-purge",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    scheduler.add_job(
+        refresh_access_cache,
+        trigger="interval",
+        seconds=app_settings.access_cache_refresh_seconds,
+        id="access-cache-refresh",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        reconcile_credit_usage,
+        trigger="interval",
+        hours=app_settings.credit_usage_reconcile_hours,
+        id="credit-usage-reconcile",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        log_translation_cache_stats,
+        trigger="interval",
+        minutes=app_settings.translation_cache_stats_minutes,
+        id="translation-cache-stats",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        http_clients.log_stats,
+        trigger="interval",
+        minutes=app_settings.http_pool_stats_minutes,
+        id="http-pool-stats",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        stt_scheduler.log_stats,
+        trigger="interval",
+        minutes=app_settings.stt_queue_stats_minutes,
+        id="stt-queue-stats",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
     scheduler.start()
+    await http_clients.start()
     async with AsyncSessionLocal() as session:
+        await runtime_config.reload(session)
+        await access_cache.refresh(session)
         owner_id = get_main_admin_id()
         if owner_id:
             owner_name = str(owner_id)
@@ -132,17 +237,88 @@ async def on_startup() -> None:
                 user = await get_user_by_telegram_id(session, admin_id)
                 first_name = user.username if user and user.username else str(admin_id)
                 await upsert_admin(session, admin_id, first_name, user.username if user else None, owner_id)
-            admins = await list_admins(session)
-            app_settings.admin_user_ids.update({admin.tg_user_id for admin in admins})
-            app_settings.admin_user_ids.add(owner_id)
+            await load_admin_ids(session)
         await reminder_service.load_users(session)
         await reprocess_paid(session)
+    runtime_config.start()
+    if app_settings.review_write_behind:
+        await review_buffer.start()
+    if app_settings.stt_provider == "local" and app_settings.bot_workers <= 1:
+        # With sharding only the workers transcribe.
+        await local_stt().start()
+
+
+async def load_admin_ids(session) -> None:
+    owner_id = get_main_admin_id()
+    if not owner_id:
+        return
+    admins = await list_admins(session)
+    admin_ids = {admin.tg_user_id for admin in admins}
+    admin_ids.add(owner_id)
+    app_settings.admin_user_ids.intersection_update(admin_ids)
+    app_settings.admin_user_ids.update(admin_ids)
+
+
+async def refresh_access_cache() -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            await access_cache.refresh(session)
+    except Exception:
+        logging.getLogger("access_cache").exception("ACCESS_CACHE_REFRESH_ERROR")
+
+
+async def reconcile_credit_usage() -> None:
+    # Current and previous month; older counters no longer affect charging.
+    since = (datetime.utcnow().replace(day=1) - timedelta(days=1)).replace(day=1).date()
+    try:
+        async with AsyncSessionLocal() as session:
+            await reconcile_usage_counters(session, since)
+    except Exception:
+        logging.getLogger("credits").exception("CREDIT_USAGE_RECONCILE_ERROR")
+
+
+async def on_worker_startup() -> None:
+    load_locales()
+    async with AsyncSessionLocal() as session:
+        await load_admin_ids(session)
+        await runtime_config.reload(session)
+        await access_cache.refresh(session)
+    runtime_config.start()
+    await http_clients.start()
+    if app_settings.review_write_behind:
+        await review_buffer.start()
+    if app_settings.stt_provider == "local":
+        await local_stt().start()
+
+
+async def on_shutdown(dispatcher: Dispatcher | None = None) -> None:
+    if dispatcher is not None:
+        # aiogram never closes the storage itself; the memory one flushes quiz answers here.
+        await dispatcher.storage.close()
+    shutdown_forecast_executor()
+    shutdown_local_stt()
+    if app_settings.review_write_behind:
+        await review_buffer.close()
+    await http_clients.close()
 
 
 async def main() -> None:
+    if app_settings.bot_workers > 1:
+        await run_sharded(app_settings.bot_workers)
+        return
     dp = setup_dispatcher()
-    await on_startup()
-    await dp.start_polling(bot)
+    dp.shutdown.register(on_shutdown)
+    await on_startup(dp)
+    if app_settings.bot_mode == "webhook":
+        await run_webhook(dp, bot)
+        return
+    await bot.delete_webhook(drop_pending_updates=False)
+    stt_callbacks = await start_callback_server()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if stt_callbacks is not None:
+            await stt_callbacks.cleanup()
 
 
 if __name__ == "__main__":
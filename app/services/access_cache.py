@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+
+logger = logging.getLogger("access_cache")
+
+
+class AccessCache:
+    def __init__(self) -> None:
+        self.loaded = False
+        self._blocked: frozenset[int] = frozenset()
+        # Bumped by local writes so a refresh that raced with them is discarded.
+        self._generation = 0
+
+    def is_blocked(self, telegram_id: int) -> bool:
+        return telegram_id in self._blocked
+
+    def set_blocked(self, telegram_id: int, blocked: bool) -> None:
+        self._generation += 1
+        if blocked:
+            self._blocked = self._blocked | {telegram_id}
+        else:
+            self._blocked = self._blocked - {telegram_id}
+
+    async def refresh(self, session: AsyncSession) -> None:
+        generation = self._generation
+        result = await session.execute(select(User.telegram_id).where(User.is_blocked.is_(True)))
+        blocked = frozenset(int(row[0]) for row in result.all())
+        if generation != self._generation:
+            return
+        changed = blocked != self._blocked
+        self._blocked = blocked
+        if changed or not self.loaded:
+            logger.info("ACCESS_CACHE_REFRESH blocked=%s", len(blocked))
+        self.loaded = True
+
+
+access_cache = AccessCache()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Word
+
+# Candidates kept per word; quiz options are sampled from these.
+CANDIDATES_PER_WORD = 8
+SAME_POS_BONUS = 20
+LENGTH_PENALTY = 3
+CDIST_CHUNK_ROWS = 512
+_EXCLUDED = int(np.iinfo(np.int16).min)
+
+
+def _codes(rows: list[str | None], columns: list[str | None]) -> tuple[np.ndarray, np.ndarray]:
+    # Integer codes make the pairwise comparisons cheap; None/empty maps to 0.
+    codes: dict[str, int] = {}
+    encode = lambda value: codes.setdefault(value, len(codes) + 1) if value else 0  # noqa: E731
+    return (
+        np.array([encode(v) for v in rows], dtype=np.int32),
+        np.array([encode(v) for v in columns], dtype=np.int32),
+    )
+
+
+class IndexedWord(NamedTuple):
+    id: int
+    word: str
+    translation: str
+    pos: str | None
+
+
+class DistractorIndex:
+    def __init__(self, words: list[IndexedWord]) -> None:
+        self.loaded_at = time.monotonic()
+        self.words: dict[int, IndexedWord] = {}
+        # word id -> [(score, candidate id)], best first.
+        self.candidates: dict[int, list[tuple[int, int]]] = {}
+        self._rebuild(words)
+
+    def _scores(self, rows: list[IndexedWord], columns: list[IndexedWord]) -> np.ndarray:
+        similarity = process.cdist(
+            [w.word for w in rows],
+            [w.word for w in columns],
+            scorer=fuzz.ratio,
+            dtype=np.int16,
+            workers=-1,
+        )
+        row_pos, col_pos = _codes([w.pos for w in rows], [w.pos for w in columns])
+        row_len = np.array([len(w.word) for w in rows], dtype=np.int16)[:, None]
+        col_len = np.array([len(w.word) for w in columns], dtype=np.int16)[None, :]
+        same_pos = (row_pos[:, None] == col_pos[None, :]) & (row_pos[:, None] > 0)
+        scores = similarity + SAME_POS_BONUS * same_pos.astype(np.int16)
+        scores -= LENGTH_PENALTY * np.minimum(np.abs(row_len - col_len), 10)
+        # A word sharing the translation would be a second correct answer.
+        row_tr, col_tr = _codes([w.translation for w in rows], [w.translation for w in columns])
+        scores[row_tr[:, None] == col_tr[None, :]] = _EXCLUDED
+        return scores
+
+    def _top(self, word: IndexedWord, ids: np.ndarray, row: np.ndarray) -> list[tuple[int, int]]:
+        valid = (row > _EXCLUDED) & (ids != word.id)
+        ids, row = ids[valid], row[valid]
+        if len(ids) > CANDIDATES_PER_WORD:
+            keep = np.argpartition(row, -CANDIDATES_PER_WORD)[-CANDIDATES_PER_WORD:]
+            ids, row = ids[keep], row[keep]
+        order = np.argsort(-row, kind="stable")
+        return [(int(row[i]), int(ids[i])) for i in order]
+
+    def _rebuild(self, words: list[IndexedWord]) -> None:
+        self.words = {w.id: w for w in words}
+        self.candidates = {}
+        ids = np.array([w.id for w in words], dtype=np.int64)
+        keep = min(CANDIDATES_PER_WORD, max(len(words) - 1, 0))
+        for start in range(0, len(words), CDIST_CHUNK_ROWS):
+            chunk = words[start : start + CDIST_CHUNK_ROWS]
+            scores = self._scores(chunk, words)
+            rows = np.arange(len(chunk))
+            scores[rows, rows + start] = _EXCLUDED
+            if keep < len(words):
+                top = np.argpartition(scores, -keep, axis=1)[:, -keep:]
+            else:
+                top = np.broadcast_to(np.arange(len(words)), scores.shape)
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for offset, word in enumerate(chunk):
+                valid = top_scores[offset] > _EXCLUDED
+                self.candidates[word.id] = list(
+                    zip(top_scores[offset][valid].tolist(), ids[top[offset][valid]].tolist())
+                )
+
+    def _refresh_word(self, word_id: int) -> None:
+        word = self.words[word_id]
+        others = list(self.words.values())
+        ids = np.array([w.id for w in others], dtype=np.int64)
+        self.candidates[word_id] = self._top(word, ids, self._scores([word], others)[0])
+
+    def add(self, word: IndexedWord) -> None:
+        self.words[word.id] = word
+        self._refresh_word(word.id)
+        others = [w for w in self.words.values() if w.id != word.id]
+        if not others:
+            return
+        scores = self._scores(others, [word])[:, 0]
+        for other, score in zip(others, scores.tolist()):
+            if score == _EXCLUDED:
+                continue
+            candidates = self.candidates.setdefault(other.id, [])
+            if len(candidates) < CANDIDATES_PER_WORD or score > candidates[-1][0]:
+                candidates.append((score, word.id))
+                candidates.sort(key=lambda item: -item[0])
+                del candidates[CANDIDATES_PER_WORD:]
+
+    def remove(self, word_id: int) -> None:
+        if self.words.pop(word_id, None) is None:
+            return
+        self.candidates.pop(word_id, None)
+        for other_id, candidates in self.candidates.items():
+            kept = [item for item in candidates if item[1] != word_id]
+            if len(kept) == len(candidates):
+                continue
+            candidates[:] = kept
+            if len(self.words) > len(kept) + 1:
+                self._refresh_word(other_id)
+
+    def update(self, word: IndexedWord) -> None:
+        self.remove(word.id)
+        self.add(word)
+
+    def distractors(self, word_id: int, count: int = 3) -> list[IndexedWord]:
+        candidates = [i for _, i in self.candidates.get(word_id, []) if i in self.words]
+        if len(candidates) < count:
+            # Tiny vocabularies: anything that is not a second correct answer.
+            word = self.words[word_id]
+            extra = [
+                w.id
+                for w in self.words.values()
+                if w.id != word_id and w.id not in candidates and w.translation != word.translation
+            ]
+            candidates += random.sample(extra, min(len(extra), count - len(candidates)))
+        picked = random.sample(candidates, min(count, len(candidates)))
+        return [self.words[i] for i in picked]
+
+
+class DistractorIndexes:
+    def __init__(self, max_users: int, ttl_seconds: int) -> None:
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[int, DistractorIndex] = OrderedDict()
+
+    async def get(self, session: AsyncSession, user_id: int) -> DistractorIndex:
+        index = self._items.get(user_id)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl_seconds:
+            result = await session.execute(
+                select(Word.id, Word.word, Word.translation, Word.pos).where(Word.user_id == user_id)
+            )
+            words = [IndexedWord(*row) for row in result.all()]
+            index = await asyncio.to_thread(DistractorIndex, words)
+            self._items[user_id] = index
+        self._items.move_to_end(user_id)
+        while len(self._items) > self.max_users:
+            self._items.popitem(last=False)
+        return index
+
+    def word_saved(self, word: Word) -> None:
+        index = self._items.get(word.user_id)
+        if index is not None:
+            index.update(IndexedWord(word.id, word.word, word.translation, word.pos))
+
+    def word_deleted(self, user_id: int, word_id: int) -> None:
+        index = self._items.get(user_id)
+        if index is not None:
+            index.remove(word_id)
+
+
+distractor_indexes = DistractorIndexes(
+    settings.distractor_index_max_users, settings.distractor_index_ttl_seconds
+)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Word
+
+
+class DueHistogram:
+    def __init__(self, counts: dict[date, int]) -> None:
+        self.counts = counts
+        self.loaded_at = time.monotonic()
+
+    def load(self, day: date) -> int:
+        return self.counts.get(day, 0)
+
+    def move(self, old: date | None, new: date) -> None:
+        if old is not None and self.counts.get(old, 0) > 0:
+            self.counts[old] -= 1
+        self.counts[new] = self.counts.get(new, 0) + 1
+
+
+class DueHistograms:
+    def __init__(self, max_users: int, ttl_seconds: int) -> None:
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[int, DueHistogram] = OrderedDict()
+
+    async def get(self, session: AsyncSession, user_id: int) -> DueHistogram:
+        histogram = self._items.get(user_id)
+        if histogram is None or time.monotonic() - histogram.loaded_at > self.ttl_seconds:
+            histogram = DueHistogram(await self._load(session, user_id))
+            self._items[user_id] = histogram
+        self._items.move_to_end(user_id)
+        while len(self._items) > self.max_users:
+            self._items.popitem(last=False)
+        return histogram
+
+    def forget(self, user_id: int) -> None:
+        self._items.pop(user_id, None)
+
+    async def _load(self, session: AsyncSession, user_id: int) -> dict[date, int]:
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        due_day = cast(Word.srs_due_at, Date)
+        result = await session.execute(
+            select(due_day, func.count(Word.id))
+            .where(Word.user_id == user_id, Word.srs_due_at >= today + timedelta(days=1))
+            .group_by(due_day)
+        )
+        return {row[0]: int(row[1]) for row in result.all()}
+
+
+due_histograms = DueHistograms(
+    settings.srs_due_histogram_max_users, settings.srs_due_histogram_ttl_seconds
+)
@@ -1,4 +1,5 @@
 from app.db.repo.admin import get_feature_flag, set_feature_flag
+from app.services.runtime_config import runtime_config
 
 
 FEATURE_DEFAULTS: dict[str, bool] = {
@@ -15,6 +16,10 @@ async def is_feature_enabled(session, name: str) -> bool:
     return await get_feature_flag(session, name, default=default)
 
 
+def is_feature_enabled_cached(name: str) -> bool:
+    return runtime_config.flag(name, FEATURE_DEFAULTS.get(name, True))
+
+
 async def toggle_feature(session, name: str) -> bool:
     current = await is_feature_enabled(session, name)
     await set_feature_flag(session, name, not current)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.config import settings
+from app.services.tracing import httpx_event_hooks
+
+logger = logging.getLogger("http_clients")
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    connections: int = 0
+    tls_handshakes: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.connections)
+
+
+@dataclass
+class ClientSpec:
+    timeout: httpx.Timeout
+    max_connections: int
+    max_keepalive: int
+    http2: bool = True
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpClients:
+    def __init__(self) -> None:
+        self._specs: dict[str, ClientSpec] = {}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self.stats: dict[str, PoolStats] = {}
+
+    def register(self, name: str, spec: ClientSpec) -> None:
+        self._specs[name] = spec
+        self.stats.setdefault(name, PoolStats())
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        spec = self._specs[name]
+        stats = self.stats[name]
+
+        async def trace(event_name: str, info: dict) -> None:
+            # httpcore only emits connect events when it opens a new connection.
+            if event_name == "connection.connect_tcp.complete":
+                stats.connections += 1
+            elif event_name == "connection.start_tls.complete":
+                stats.tls_handshakes += 1
+
+        async def on_request(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = trace
+
+        hooks = httpx_event_hooks()
+        hooks = {**hooks, "request": [on_request, *hooks.get("request", [])]}
+        http2 = spec.http2 and settings.http2_enabled and _http2_available()
+        return httpx.AsyncClient(
+            timeout=spec.timeout,
+            limits=httpx.Limits(
+                max_connections=spec.max_connections,
+                max_keepalive_connections=spec.max_keepalive,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            http2=http2,
+            headers=spec.headers,
+            event_hooks=hooks,
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            # Scripts and tests may call in without on_startup having run.
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    async def start(self) -> None:
+        if settings.http2_enabled and not _http2_available():
+            logger.warning("HTTP2_UNAVAILABLE install httpx[http2] to enable it")
+        for name in self._specs:
+            self.get(name)
+
+    def log_stats(self) -> None:
+        for name, stats in self.stats.items():
+            if not stats.requests:
+                continue
+            logger.info(
+                "HTTP_POOL name=%s requests=%s connections=%s tls=%s reused=%s reuse_pct=%.0f",
+                name,
+                stats.requests,
+                stats.connections,
+                stats.tls_handshakes,
+                stats.reused,
+                stats.reused / stats.requests * 100,
+            )
+
+    async def close(self) -> None:
+        self.log_stats()
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HttpClients()
+http_clients.register(
+    "assemblyai",
+    ClientSpec(
+        timeout=httpx.Timeout(15.0, connect=5.0),
+        max_connections=settings.http_pool_max_connections,
+        max_keepalive=settings.http_pool_max_keepalive,
+    ),
+)
+http_clients.register(
+    "google_translate",
+    ClientSpec(
+        timeout=httpx.Timeout(settings.google_translate_timeout_seconds),
+        max_connections=settings.http_pool_max_connections,
+        max_keepalive=settings.http_pool_max_keepalive,
+    ),
+)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Literal, Protocol
 
+from app.utils.audio import VoiceAudio
+
 
 @dataclass
 class AssessmentResult:
@@ -13,5 +15,8 @@ class AssessmentResult:
 
 
 class PronunciationEngine(Protocol):
-    async def assess(self, audio_wav_path: str, reference_text: str) -> AssessmentResult:
+    def accepts(self, mime_type: str) -> bool:
+        ...
+
+    async def assess(self, audio: VoiceAudio, reference_text: str) -> AssessmentResult:
         ...
@@ -3,14 +3,20 @@ from __future__ import annotations
 from app.services.pronunciation.base import AssessmentResult, PronunciationEngine
 from app.services.pronunciation.matching import match_transcript
 from app.services.stt.base import STTProvider
+from app.services.stt.scheduler import stt_scheduler
+from app.utils.audio import VoiceAudio
 
 
 class STTPronunciationEngine(PronunciationEngine):
     def __init__(self, provider: STTProvider) -> None:
         self.provider = provider
 
-    async def assess(self, audio_wav_path: str, reference_text: str) -> AssessmentResult:
-        result = await self.provider.transcribe(audio_wav_path)
+    def accepts(self, mime_type: str) -> bool:
+        return self.provider.accepts(mime_type)
+
+    async def assess(self, audio: VoiceAudio, reference_text: str) -> AssessmentResult:
+        async with stt_scheduler.slot():
+            result = await self.provider.transcribe(audio)
         verdict, score = match_transcript(reference_text, result.transcript)
         return AssessmentResult(
             transcript=result.transcript,
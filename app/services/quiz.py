@@ -1,22 +1,25 @@
 import random
 
-from app.db.models import Word
+from app.services.distractors import DistractorIndex
 
 
 def build_quiz_questions(
-    all_words: list[Word], due_words: list[Word], max_questions: int = 10
+    index: DistractorIndex, word_ids: list[int], max_questions: int = 10
 ) -> list[dict[str, object]]:
-    if len(all_words) < 4:
+    if len(index.words) < 4:
         return []
 
-    pool = due_words if len(due_words) >= 4 else all_words
+    pool = [word_id for word_id in dict.fromkeys(word_ids) if word_id in index.words]
     question_count = min(len(pool), max_questions)
-    question_words = random.sample(pool, question_count)
+    question_ids = random.sample(pool, question_count)
 
     questions: list[dict[str, object]] = []
-    for word in question_words:
-        distractors = [w for w in all_words if w.id != word.id]
-        options = random.sample(distractors, 3) + [word]
+    for word_id in question_ids:
+        word = index.words[word_id]
+        distractors = index.distractors(word_id, 3)
+        if len(distractors) < 3:
+            continue
+        options = distractors + [word]
         random.shuffle(options)
         questions.append(
             {
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import time
+from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -8,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings as app_settings
 from app.db.models import User, UserSettings
 from app.db.repo.stats import get_due_count
 from app.db.repo.user_settings import get_user_settings
@@ -19,6 +21,18 @@ from app.services.i18n import t
 class ReminderService:
     def __init__(self, scheduler: AsyncIOScheduler) -> None:
         self.scheduler = scheduler
+        self._forward: Any = None
+
+    def forward_to(self, queue: Any) -> None:
+        # Shard workers have no running scheduler; changes go to the supervisor that owns it.
+        self._forward = queue
+
+    def apply(self, command: tuple) -> None:
+        action, telegram_id, *args = command
+        if action == "schedule":
+            self.schedule_user(telegram_id, *args)
+        else:
+            self.remove_user(telegram_id)
 
     def _job_id(self, telegram_id: int) -> str:
         return f"reminder:{telegram_id}"
@@ -26,7 +40,19 @@ class ReminderService:
     def schedule_user(
         self, telegram_id: int, reminder_time: time, timezone: str
     ) -> None:
-        trigger = CronTrigger(hour=reminder_time.hour, minute=reminder_time.minute, timezone=timezone)
+        if self._forward is not None:
+            self._forward.put(("schedule", telegram_id, reminder_time, timezone))
+            return
+        seconds = reminder_time.hour * 3600 + reminder_time.minute * 60
+        if app_settings.reminder_spread_seconds > 0:
+            # Stable per-user offset so reminders set to the same minute don't fire together.
+            seconds = (seconds + telegram_id % app_settings.reminder_spread_seconds) % 86400
+        trigger = CronTrigger(
+            hour=seconds // 3600,
+            minute=seconds % 3600 // 60,
+            second=seconds % 60,
+            timezone=timezone,
+        )
         self.scheduler.add_job(
             self.send_reminder,
             trigger=trigger,
@@ -36,6 +62,9 @@ class ReminderService:
         )
 
     def remove_user(self, telegram_id: int) -> None:
+        if self._forward is not None:
+            self._forward.put(("remove", telegram_id))
+            return
         job_id = self._job_id(telegram_id)
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
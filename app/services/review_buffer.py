@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.config import settings
+from app.db.repo.srs import PendingReview, apply_reviews_bulk
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger("review_buffer")
+
+
+def _encode(review: PendingReview) -> bytes:
+    payload = {
+        "user_id": review.user_id,
+        "word_id": review.word_id,
+        "q": review.q,
+        "reviewed_at": review.reviewed_at.isoformat(),
+        "key": review.review_key,
+    }
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode()
+
+
+def _read_journal(path: Path) -> list[PendingReview]:
+    if not path.exists():
+        return []
+    reviews: list[PendingReview] = []
+    for line in path.read_text().splitlines():
+        try:
+            item = json.loads(line)
+            reviews.append(
+                PendingReview(
+                    user_id=int(item["user_id"]),
+                    word_id=int(item["word_id"]),
+                    q=int(item["q"]),
+                    reviewed_at=datetime.fromisoformat(item["reviewed_at"]),
+                    review_key=item.get("key"),
+                )
+            )
+        except (ValueError, KeyError, TypeError):
+            # A crash mid-append can leave a torn last line.
+            logger.warning("REVIEW_JOURNAL_BAD_LINE path=%s", path)
+    return reviews
+
+
+def _append(path: Path, data: bytes) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _rotate(journal: Path, flushing: Path) -> None:
+    if not journal.exists():
+        return
+    if not flushing.exists():
+        os.replace(journal, flushing)
+        return
+    _append(flushing, journal.read_bytes())
+    journal.unlink()
+
+
+class ReviewBuffer:
+    def __init__(self, directory: str, name: str) -> None:
+        self.directory = Path(directory)
+        self.journal = self.directory / f"reviews-{name}.jsonl"
+        # Holds the batch being flushed; replayed on startup if the flush never finished.
+        self.flushing = self.directory / f"reviews-{name}.flushing.jsonl"
+        self._pending: list[PendingReview] = []
+        self._journal_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def add(self, user_id: int, word_id: int, q: int) -> None:
+        review = PendingReview(user_id, word_id, q, datetime.utcnow(), str(uuid.uuid4()))
+        async with self._journal_lock:
+            await asyncio.to_thread(_append, self.journal, _encode(review))
+            self._pending.append(review)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            async with self._journal_lock:
+                if not self._pending and not self.flushing.exists():
+                    return 0
+                batch = _read_journal(self.flushing)
+                batch.extend(self._pending)
+                self._pending = []
+                await asyncio.to_thread(_rotate, self.journal, self.flushing)
+            async with AsyncSessionLocal() as session:
+                applied = await apply_reviews_bulk(session, batch)
+            self.flushing.unlink(missing_ok=True)
+        logger.info("REVIEW_FLUSH reviews=%s applied=%s", len(batch), applied)
+        return applied
+
+    async def replay(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        async with self._journal_lock:
+            self._pending = _read_journal(self.journal) + self._pending
+        if self._pending or self.flushing.exists():
+            logger.info("REVIEW_REPLAY reviews=%s", len(self._pending))
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("REVIEW_FLUSH_ERROR during replay, will retry")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.review_buffer_flush_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("REVIEW_FLUSH_ERROR")
+
+    async def start(self) -> None:
+        await self.replay()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("REVIEW_FLUSH_ERROR on shutdown, journal kept for replay")
+
+
+review_buffer = ReviewBuffer(
+    settings.review_buffer_dir, multiprocessing.current_process().name
+)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import AppSetting, FeatureFlag, Package
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger("runtime_config")
+
+CHANNEL = "runtime_config"
+_RECONNECT_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    version: int
+    feature_flags: dict[str, bool] = field(default_factory=dict)
+    app_settings: dict[str, str | None] = field(default_factory=dict)
+    packages: tuple[Any, ...] = ()
+
+
+def _listen_dsn() -> str:
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class RuntimeConfig:
+    def __init__(self) -> None:
+        self.snapshot: ConfigSnapshot | None = None
+        self.listening = False
+        self._version = 0
+        self._task: asyncio.Task | None = None
+        self._reload_task: asyncio.Task | None = None
+        self._dirty = False
+
+    def flag(self, name: str, default: bool) -> bool:
+        if self.snapshot is None:
+            return default
+        return self.snapshot.feature_flags.get(name, default)
+
+    async def get(self, session: AsyncSession) -> ConfigSnapshot:
+        if self.snapshot is None:
+            return await self.reload(session)
+        return self.snapshot
+
+    async def reload(self, session: AsyncSession) -> ConfigSnapshot:
+        from app.db.repo.packages import PackageDTO
+
+        # Versions are taken before reading so a slower, older reload cannot overwrite a newer one.
+        self._version += 1
+        version = self._version
+        flags = await session.execute(select(FeatureFlag.name, FeatureFlag.enabled))
+        app_settings = await session.execute(select(AppSetting.key, AppSetting.value))
+        packages = await session.execute(select(Package).order_by(Package.id))
+        snapshot = ConfigSnapshot(
+            version=version,
+            feature_flags={name: bool(enabled) for name, enabled in flags.all()},
+            app_settings={key: value for key, value in app_settings.all()},
+            packages=tuple(
+                PackageDTO(
+                    package_key=item.package_key,
+                    seconds=item.seconds,
+                    approx_attempts_5s=item.approx_attempts_5s,
+                    manual_price_uzs=item.manual_price_uzs,
+                    stars_price=item.stars_price,
+                    is_active=item.is_active,
+                )
+                for item in packages.scalars().all()
+            ),
+        )
+        if self.snapshot is not None and self.snapshot.version > version:
+            return self.snapshot
+        self.snapshot = snapshot
+        logger.debug("RUNTIME_CONFIG_RELOAD version=%s", snapshot.version)
+        return snapshot
+
+    def remember_flag(self, name: str, enabled: bool) -> None:
+        if self.snapshot is None:
+            return
+        flags = {**self.snapshot.feature_flags, name: enabled}
+        self.snapshot = replace(self.snapshot, feature_flags=flags)
+
+    async def notify(self, session: AsyncSession) -> None:
+        # Delivered to listeners only when the caller's transaction commits.
+        await session.execute(select(func.pg_notify(CHANNEL, str(self._version))))
+
+    async def _reload_quietly(self) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.reload(session)
+        except Exception:
+            logger.exception("RUNTIME_CONFIG_RELOAD_ERROR")
+
+    async def _reload_while_dirty(self) -> None:
+        # A reload already running may have read before the notifying commit; run once more.
+        while self._dirty:
+            self._dirty = False
+            await self._reload_quietly()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._dirty = True
+        if self._reload_task and not self._reload_task.done():
+            return
+        self._reload_task = asyncio.get_running_loop().create_task(self._reload_while_dirty())
+
+    async def _run(self) -> None:
+        poll_seconds = settings.runtime_config_poll_seconds
+        while True:
+            if not settings.runtime_config_listen:
+                await self._reload_quietly()
+                await asyncio.sleep(poll_seconds)
+                continue
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+            except Exception as exc:
+                logger.warning("RUNTIME_CONFIG_LISTEN_UNAVAILABLE error=%s", exc)
+                await self._reload_quietly()
+                await asyncio.sleep(poll_seconds)
+                continue
+            try:
+                await connection.add_listener(CHANNEL, self._on_notify)
+                self.listening = True
+                logger.info("RUNTIME_CONFIG_LISTEN channel=%s", CHANNEL)
+                # Catch up on anything that changed while we were not listening.
+                await self._reload_quietly()
+                while True:
+                    await asyncio.sleep(poll_seconds)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("RUNTIME_CONFIG_LISTEN_LOST error=%s", exc)
+            finally:
+                self.listening = False
+                connection.terminate()
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+runtime_config = RuntimeConfig()
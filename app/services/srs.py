@@ -1,6 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def initial_ease_factor() -> float:
@@ -16,12 +22,14 @@ def sm2_update(
     interval_days: int,
     ease_factor: float,
     q: int,
+    now: datetime | None = None,
 ) -> tuple[int, int, float, datetime, int]:
     ef = ease_factor + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
     if ef < 1.3:
         ef = 1.3
 
-    now = datetime.utcnow()
+    if now is None:
+        now = datetime.utcnow()
     lapses = 0
 
     if q < 3:
@@ -41,3 +49,107 @@ def sm2_update(
 
     due_at = now + timedelta(days=interval_days)
     return repetitions, interval_days, ef, due_at, lapses
+
+
+def fuzz_window(interval_days: int, ratio: float) -> int:
+    if interval_days < 3:
+        return 0
+    return min(interval_days - 1, max(1, int(round(interval_days * ratio))))
+
+
+def balanced_interval(
+    interval_days: int,
+    day_load: Callable[[int], int],
+    seed: int,
+    ratio: float = 0.05,
+) -> int:
+    window = fuzz_window(interval_days, ratio)
+    if not window:
+        return interval_days
+    candidates = list(range(interval_days - window, interval_days + window + 1))
+    # Rotate by seed so ties resolve deterministically but not always to the same side.
+    shift = seed % len(candidates)
+    candidates = candidates[shift:] + candidates[:shift]
+    return min(candidates, key=day_load)
+
+
+class SM2Batch(NamedTuple):
+    repetitions: Sequence[int]
+    interval_days: Sequence[int]
+    ease_factors: Sequence[float]
+    due_at: Sequence[datetime]
+    lapses: Sequence[int]
+
+
+def _sm2_batch_python(
+    repetitions: Sequence[int],
+    interval_days: Sequence[int],
+    ease_factors: Sequence[float],
+    qualities: Sequence[int],
+    now: datetime,
+) -> SM2Batch:
+    batch = SM2Batch([], [], [], [], [])
+    for reps, interval, ef, q in zip(repetitions, interval_days, ease_factors, qualities):
+        new_reps, new_interval, new_ef, due_at, lapses = sm2_update(
+            int(reps), int(interval), float(ef), int(q), now=now
+        )
+        batch.repetitions.append(new_reps)
+        batch.interval_days.append(new_interval)
+        batch.ease_factors.append(new_ef)
+        batch.due_at.append(due_at)
+        batch.lapses.append(lapses)
+    return batch
+
+
+def sm2_step_arrays(reps, intervals, ease_factors, q):
+    # Same operation order as sm2_update so float64 results match bit for bit.
+    penalty = 5 - q
+    ef = ease_factors + (0.1 - penalty * (0.08 + penalty * 0.02))
+    ef = np.where(ef < 1.3, 1.3, ef)
+
+    lapsed = q < 3
+    new_reps = np.where(lapsed, 0, reps + 1)
+    # np.rint rounds half to even, like the built-in round().
+    grown = np.maximum(1, np.rint(intervals * ef).astype(np.int64))
+    new_intervals = np.where(
+        lapsed | (new_reps == 1), 1, np.where(new_reps == 2, 6, grown)
+    )
+    return new_reps, new_intervals, ef, lapsed
+
+
+def _sm2_batch_numpy(
+    repetitions: Sequence[int],
+    interval_days: Sequence[int],
+    ease_factors: Sequence[float],
+    qualities: Sequence[int],
+    now: datetime,
+) -> SM2Batch:
+    new_reps, new_intervals, ef, lapsed = sm2_step_arrays(
+        np.asarray(repetitions, dtype=np.int64),
+        np.asarray(interval_days, dtype=np.int64),
+        np.asarray(ease_factors, dtype=np.float64),
+        np.asarray(qualities, dtype=np.int64),
+    )
+    due_at = np.datetime64(now, "us") + new_intervals.astype("timedelta64[D]")
+    return SM2Batch(new_reps, new_intervals, ef, due_at, lapsed.astype(np.int64))
+
+
+def sm2_update_batch(
+    repetitions: Sequence[int],
+    interval_days: Sequence[int],
+    ease_factors: Sequence[float],
+    qualities: Sequence[int],
+    now: datetime | None = None,
+    use_numpy: bool | None = None,
+) -> SM2Batch:
+    if not len(repetitions) == len(interval_days) == len(ease_factors) == len(qualities):
+        raise ValueError("SM-2 batch inputs must have the same length")
+    if now is None:
+        now = datetime.utcnow()
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        return _sm2_batch_numpy(repetitions, interval_days, ease_factors, qualities, now)
+    return _sm2_batch_python(repetitions, interval_days, ease_factors, qualities, now)
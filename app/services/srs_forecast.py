@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db.repo.admin import review_quality_counts, stream_forecast_cards
+from app.services.srs import np, sm2_step_arrays
+
+logger = logging.getLogger("srs_forecast")
+
+# Quality buckets as written to review_logs: AGAIN, HARD, GOOD, EASY.
+QUALITIES = (0, 3, 4, 5)
+DEFAULT_QUALITY_WEIGHTS = (0.15, 0.15, 0.5, 0.2)
+# Users with few logs are pulled towards the global distribution.
+PRIOR_REVIEWS = 20
+
+
+@dataclass(frozen=True)
+class ForecastCards:
+    user_ids: np.ndarray
+    repetitions: np.ndarray
+    intervals: np.ndarray
+    ease_factors: np.ndarray
+    due_days: np.ndarray
+
+
+@dataclass(frozen=True)
+class SrsForecast:
+    start: date
+    daily: list[int]
+    overdue: int
+    cards: int
+    load_seconds: float
+    simulate_seconds: float
+
+
+def quality_buckets(q):
+    return np.clip(np.asarray(q, dtype=np.int64) - 2, 0, 3)
+
+
+def quality_probabilities(hist_counts: np.ndarray) -> np.ndarray:
+    totals = hist_counts.sum(axis=0)
+    if totals.sum() > 0:
+        global_probs = totals / totals.sum()
+    else:
+        global_probs = np.asarray(DEFAULT_QUALITY_WEIGHTS, dtype=np.float64)
+    smoothed = hist_counts + PRIOR_REVIEWS * global_probs
+    probs = smoothed / smoothed.sum(axis=1, keepdims=True)
+    # Last row is for users without any history.
+    return np.vstack([probs, global_probs])
+
+
+def simulate_due_counts(
+    cards: ForecastCards,
+    hist_user_ids: np.ndarray,
+    hist_counts: np.ndarray,
+    days: int,
+    seed: int = 0,
+) -> tuple[list[int], int]:
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    rng = np.random.default_rng(seed)
+    cumulative = np.cumsum(quality_probabilities(hist_counts), axis=1)[:, :-1]
+    qualities = np.asarray(QUALITIES, dtype=np.int64)
+
+    # Overdue cards land on day 0, which is what users actually see when they open practice.
+    overdue = int(np.count_nonzero(cards.due_days < 0))
+    # Cards first due after the horizon can never show up in it.
+    active = np.flatnonzero(cards.due_days < days)
+    due = np.maximum(cards.due_days[active], 0).astype(np.int32)
+    reps = cards.repetitions[active].astype(np.int64)
+    intervals = cards.intervals[active].astype(np.int64)
+    efs = cards.ease_factors[active].astype(np.float64)
+
+    # User ids are dense primary keys, so a lookup table beats searchsorted.
+    user_ids = cards.user_ids[active]
+    fallback = len(hist_user_ids)
+    max_user_id = int(max(hist_user_ids.max(initial=0), user_ids.max(initial=0)))
+    lookup = np.full(max_user_id + 1, fallback, dtype=np.int32)
+    lookup[hist_user_ids] = np.arange(fallback, dtype=np.int32)
+    rows = lookup[user_ids]
+
+    daily = np.zeros(days, dtype=np.int64)
+    for day in range(days):
+        idx = np.flatnonzero(due == day)
+        daily[day] = idx.size
+        if not idx.size:
+            continue
+        card_rows = rows[idx]
+        draws = rng.random(idx.size)
+        bucket = (draws >= cumulative[card_rows, 0]).astype(np.int64)
+        bucket += draws >= cumulative[card_rows, 1]
+        bucket += draws >= cumulative[card_rows, 2]
+        q = qualities[bucket]
+        new_reps, new_intervals, new_efs, _ = sm2_step_arrays(reps[idx], intervals[idx], efs[idx], q)
+        reps[idx] = new_reps
+        intervals[idx] = new_intervals
+        efs[idx] = new_efs
+        due[idx] = day + new_intervals
+    return daily.tolist(), overdue
+
+
+def build_quality_histogram(counts: list[tuple[int, int, int]]) -> tuple[np.ndarray, np.ndarray]:
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(QUALITIES)), dtype=np.float64)
+    data = np.asarray(counts, dtype=np.int64)
+    user_ids, rows = np.unique(data[:, 0], return_inverse=True)
+    hist = np.zeros((len(user_ids), len(QUALITIES)), dtype=np.float64)
+    np.add.at(hist, (rows, quality_buckets(data[:, 1])), data[:, 2])
+    return user_ids, hist
+
+
+def _concat(chunks: list[np.ndarray], dtype) -> np.ndarray:
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(chunks).astype(dtype, copy=False)
+
+
+async def _load_inputs(today: date, history_days: int):
+    # Runs in the worker process with its own event loop, so no shared pool.
+    engine = create_async_engine(
+        settings.database_url,
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": 0},
+    )
+    columns: list[list[np.ndarray]] = [[], [], [], [], []]
+    try:
+        async with AsyncSession(engine) as session:
+            counts = await review_quality_counts(
+                session, datetime.utcnow() - timedelta(days=history_days)
+            )
+            async for partition in stream_forecast_cards(session, today):
+                block = np.asarray(partition, dtype=np.float64)
+                for column, values in zip(columns, block.T):
+                    column.append(values)
+    finally:
+        await engine.dispose()
+    cards = ForecastCards(
+        user_ids=_concat(columns[0], np.int64),
+        repetitions=_concat(columns[1], np.int32),
+        intervals=_concat(columns[2], np.int32),
+        ease_factors=_concat(columns[3], np.float64),
+        due_days=_concat(columns[4], np.int32),
+    )
+    return cards, *build_quality_histogram(counts)
+
+
+def _run_forecast(days: int, history_days: int) -> SrsForecast:
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    started = time.perf_counter()
+    today = datetime.utcnow().date()
+    cards, hist_user_ids, hist_counts = asyncio.run(_load_inputs(today, history_days))
+    loaded = time.perf_counter()
+    # Same seed for the whole day so repeated views agree.
+    daily, overdue = simulate_due_counts(
+        cards, hist_user_ids, hist_counts, days, seed=today.toordinal()
+    )
+    return SrsForecast(
+        start=today,
+        daily=daily,
+        overdue=overdue,
+        cards=len(cards.user_ids),
+        load_seconds=loaded - started,
+        simulate_seconds=time.perf_counter() - loaded,
+    )
+
+
+_executor: ProcessPoolExecutor | None = None
+_lock = asyncio.Lock()
+
+
+async def forecast_due_load(days: int | None = None) -> SrsForecast | None:
+    global _executor
+    days = days or settings.srs_forecast_days
+    async with _lock:
+        # Daemonic processes cannot start a pool; run in a thread there instead.
+        in_process = multiprocessing.current_process().daemon
+        if _executor is None and not in_process:
+            _executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            forecast = await loop.run_in_executor(
+                None if in_process else _executor,
+                _run_forecast,
+                days,
+                settings.srs_forecast_history_days,
+            )
+        except BrokenProcessPool:
+            _executor = None
+            logger.exception("SRS_FORECAST_ERROR worker died")
+            return None
+        except Exception:
+            logger.exception("SRS_FORECAST_ERROR")
+            return None
+    logger.info(
+        "SRS_FORECAST cards=%s days=%s peak=%s load_ms=%.0f simulate_ms=%.0f",
+        forecast.cards,
+        days,
+        max(forecast.daily, default=0),
+        forecast.load_seconds * 1000,
+        forecast.simulate_seconds * 1000,
+    )
+    return forecast
+
+
+def shutdown_forecast_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
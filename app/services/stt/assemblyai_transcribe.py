@@ -3,39 +3,65 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from pathlib import Path
+from collections import deque
+from typing import AsyncIterator, Callable
 
 import httpx
 
 from app.config import settings
+from app.services.http_clients import http_clients
 from app.services.i18n import t
+from app.services.stt.assemblyai_webhook import SECRET_HEADER, callback_url, transcript_waiters
 from app.services.stt.base import STTProvider, STTProviderError, TranscriptionResult
+from app.services.stt.scheduler import stt_scheduler
+from app.utils.audio import VoiceAudio
 
 logger = logging.getLogger("stt.assemblyai")
 
 _RATE_LIMIT_MESSAGE = t("stt.unavailable")
 _TRANSIENT_BACKOFFS = (0.5, 1.5)
-_POLL_INTERVAL_SECONDS = 0.5
 _MAX_POLL_SECONDS = 15.0
-_BASE_URL = "https://api.assemblyai.com/v2"
-_OVERLOAD_MESSAGE = _RATE_LIMIT_MESSAGE
-_CONCURRENCY_SEMAPHORE = asyncio.Semaphore(settings.stt_max_concurrency)
+_BASE_URL = settings.assemblyai_base_url.rstrip("/")
 
 
-async def _acquire_slot() -> bool:
-    if settings.stt_overload_mode == "failfast":
-        if _CONCURRENCY_SEMAPHORE.locked():
-            return False
-        await _CONCURRENCY_SEMAPHORE.acquire()
-        return True
-    try:
-        await asyncio.wait_for(
-            _CONCURRENCY_SEMAPHORE.acquire(),
-            timeout=float(settings.stt_queue_max_wait_seconds),
-        )
-        return True
-    except asyncio.TimeoutError:
-        return False
+class PollSchedule:
+    # Poll times follow the recent completion-time distribution instead of a fixed tick.
+    QUANTILES = (0.5, 0.75, 0.9, 0.95)
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        first_delay: float = 1.0,
+        min_interval: float = 0.25,
+        max_interval: float = 2.0,
+    ) -> None:
+        self.min_samples = min_samples
+        self.first_delay = first_delay
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self._targets: list[float] = []
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        if len(self._samples) >= self.min_samples:
+            ordered = sorted(self._samples)
+            self._targets = [ordered[int(q * (len(ordered) - 1))] for q in self.QUANTILES]
+
+    def next_delay(self, elapsed: float) -> float:
+        if not self._targets:
+            if elapsed <= 0:
+                return self.first_delay
+        else:
+            for target in self._targets:
+                if target >= elapsed + self.min_interval:
+                    return target - elapsed
+        # Past the slow tail: back off geometrically.
+        return min(self.max_interval, max(self.min_interval, elapsed * 0.5))
+
+
+_poll_schedule = PollSchedule()
 
 
 def _extract_request_id(response: httpx.Response | None) -> str | None:
@@ -79,9 +105,13 @@ async def _request_with_retries(
     client: httpx.AsyncClient,
     method: str,
     url: str,
+    body: Callable[[], bytes | AsyncIterator[bytes]] | None = None,
     **kwargs,
 ) -> httpx.Response:
     for attempt in range(len(_TRANSIENT_BACKOFFS) + 1):
+        if body is not None:
+            # A streamed body can only be sent once, so every attempt gets a fresh one.
+            kwargs["content"] = body()
         try:
             response = await client.request(method, url, **kwargs)
             logger.info(
@@ -106,51 +136,43 @@ async def _request_with_retries(
 
 
 class AssemblyAITranscribeSTT(STTProvider):
+    input_formats = frozenset({"audio/ogg", "audio/wav"})
+
     def __init__(self) -> None:
         self.api_key = settings.assemblyai_api_key
 
-    async def transcribe(self, wav_path: str) -> TranscriptionResult:
-        acquired = await _acquire_slot()
-        if not acquired:
-            logger.warning(
-                "AssemblyAI STT overload mode=%s max_concurrency=%s queue_wait=%ss",
-                settings.stt_overload_mode,
-                settings.stt_max_concurrency,
-                settings.stt_queue_max_wait_seconds,
-            )
-            raise STTProviderError("STT concurrency limit reached", user_message=_OVERLOAD_MESSAGE)
-        try:
-            return await self._transcribe_with_client(wav_path)
-        finally:
-            _CONCURRENCY_SEMAPHORE.release()
-
-    async def _transcribe_with_client(self, wav_path: str) -> TranscriptionResult:
+    async def transcribe(self, audio: VoiceAudio) -> TranscriptionResult:
         headers = {"authorization": self.api_key}
-        timeout = httpx.Timeout(15.0, connect=5.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            upload_url = await self._upload_audio(client, headers, wav_path)
-            transcript_id = await self._create_transcript(client, headers, upload_url)
-            text = await self._poll_transcript(client, headers, transcript_id)
-            return TranscriptionResult(
-                transcript=text.strip(),
-                debug={"provider_request_id": transcript_id},
-            )
+        client = http_clients.get("assemblyai")
+        upload_url = await self._upload_audio(client, headers, audio)
+        webhook_url = callback_url()
+        transcript_id = await self._create_transcript(client, headers, upload_url, webhook_url)
+        submitted_at = time.monotonic()
+        if webhook_url:
+            # The job is queued at AssemblyAI; the callback needs no scheduler slot.
+            stt_scheduler.release_current()
+            text = await self._wait_for_callback(client, headers, transcript_id, submitted_at)
+        else:
+            text = await self._poll_transcript(client, headers, transcript_id, submitted_at)
+        return TranscriptionResult(
+            transcript=text.strip(),
+            debug={"provider_request_id": transcript_id},
+        )
 
     async def _upload_audio(
-        self, client: httpx.AsyncClient, headers: dict[str, str], wav_path: str
+        self, client: httpx.AsyncClient, headers: dict[str, str], audio: VoiceAudio
     ) -> str:
-        path = Path(wav_path)
-        with path.open("rb") as audio_file:
-            response = await _request_with_retries(
-                client,
-                "POST",
-                f"{_BASE_URL}/upload",
-                headers=headers,
-                content=audio_file.read(),
-            )
+        # Either the original OGG bytes or ffmpeg output streamed as a chunked body.
+        response = await _request_with_retries(
+            client,
+            "POST",
+            f"{_BASE_URL}/upload",
+            body=audio.upload_body,
+            headers=headers,
+        )
         if response.status_code >= 400:
             message = response.text
-            _log_api_error(message, response, transcript_id=transcript_id)
+            _log_api_error(message, response)
             if _is_quota_or_rate_limit(response.status_code, message) or _is_temporary_unavailable(
                 response.status_code
             ):
@@ -163,14 +185,24 @@ class AssemblyAITranscribeSTT(STTProvider):
         return upload_url
 
     async def _create_transcript(
-        self, client: httpx.AsyncClient, headers: dict[str, str], upload_url: str
+        self,
+        client: httpx.AsyncClient,
+        headers: dict[str, str],
+        upload_url: str,
+        webhook_url: str | None = None,
     ) -> str:
+        body = {"audio_url": upload_url, "language_code": "en"}
+        if webhook_url:
+            body["webhook_url"] = webhook_url
+            if settings.assemblyai_webhook_secret:
+                body["webhook_auth_header_name"] = SECRET_HEADER
+                body["webhook_auth_header_value"] = settings.assemblyai_webhook_secret
         response = await _request_with_retries(
             client,
             "POST",
             f"{_BASE_URL}/transcript",
             headers={**headers, "content-type": "application/json"},
-            json={"audio_url": upload_url, "language_code": "en"},
+            json=body,
         )
         if response.status_code >= 400:
             message = response.text
@@ -186,35 +218,108 @@ class AssemblyAITranscribeSTT(STTProvider):
             raise STTProviderError("AssemblyAI transcript response missing id")
         return transcript_id
 
-    async def _poll_transcript(
+    async def _fetch_transcript(
         self, client: httpx.AsyncClient, headers: dict[str, str], transcript_id: str
+    ) -> str | None:
+        response = await _request_with_retries(
+            client,
+            "GET",
+            f"{_BASE_URL}/transcript/{transcript_id}",
+            headers=headers,
+        )
+        if response.status_code >= 400:
+            message = response.text
+            _log_api_error(message, response)
+            if _is_quota_or_rate_limit(response.status_code, message) or _is_temporary_unavailable(
+                response.status_code
+            ):
+                raise STTProviderError(message, user_message=_RATE_LIMIT_MESSAGE)
+            raise STTProviderError(message)
+        payload = response.json()
+        status = payload.get("status")
+        if status == "completed":
+            text = payload.get("text", "")
+            return text or ""
+        if status in {"failed", "error"}:
+            error_message = payload.get("error", "AssemblyAI transcription failed")
+            _log_api_error(error_message, response, transcript_id=transcript_id)
+            if _is_quota_or_rate_limit(None, error_message):
+                raise STTProviderError(error_message, user_message=_RATE_LIMIT_MESSAGE)
+            raise STTProviderError(error_message)
+        return None
+
+    async def _poll_transcript(
+        self,
+        client: httpx.AsyncClient,
+        headers: dict[str, str],
+        transcript_id: str,
+        submitted_at: float,
     ) -> str:
-        deadline = time.monotonic() + _MAX_POLL_SECONDS
-        while time.monotonic() < deadline:
-            response = await _request_with_retries(
-                client,
-                "GET",
-                f"{_BASE_URL}/transcript/{transcript_id}",
-                headers=headers,
-            )
-            if response.status_code >= 400:
-                message = response.text
-                _log_api_error(message, response)
-                if _is_quota_or_rate_limit(response.status_code, message) or _is_temporary_unavailable(
-                    response.status_code
-                ):
-                    raise STTProviderError(message, user_message=_RATE_LIMIT_MESSAGE)
-                raise STTProviderError(message)
-            payload = response.json()
-            status = payload.get("status")
-            if status == "completed":
-                text = payload.get("text", "")
-                return text or ""
-            if status == "failed":
-                error_message = payload.get("error", "AssemblyAI transcription failed")
-                _log_api_error(error_message, response, transcript_id=transcript_id)
-                if _is_quota_or_rate_limit(None, error_message):
-                    raise STTProviderError(error_message, user_message=_RATE_LIMIT_MESSAGE)
-                raise STTProviderError(error_message)
-            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+        polls = 0
+        while True:
+            elapsed = time.monotonic() - submitted_at
+            delay = _poll_schedule.next_delay(elapsed)
+            if elapsed + delay > _MAX_POLL_SECONDS:
+                break
+            await asyncio.sleep(delay)
+            polls += 1
+            text = await self._fetch_transcript(client, headers, transcript_id)
+            if text is not None:
+                elapsed = time.monotonic() - submitted_at
+                _poll_schedule.record(elapsed)
+                logger.info(
+                    "AssemblyAI STT done transcript_id=%s polls=%s seconds=%.2f",
+                    transcript_id,
+                    polls,
+                    elapsed,
+                )
+                return text
         raise STTProviderError("AssemblyAI transcription timeout", user_message=_RATE_LIMIT_MESSAGE)
+
+    async def _wait_for_callback(
+        self,
+        client: httpx.AsyncClient,
+        headers: dict[str, str],
+        transcript_id: str,
+        submitted_at: float,
+    ) -> str:
+        future = transcript_waiters.expect(transcript_id)
+        deadline = submitted_at + settings.assemblyai_webhook_timeout_seconds
+        polls = 0
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # A lost callback is not fatal; the transcript can still be polled.
+                    logger.warning(
+                        "AssemblyAI STT callback timeout transcript_id=%s", transcript_id
+                    )
+                    return await self._poll_transcript(
+                        client, headers, transcript_id, time.monotonic()
+                    )
+                timeout = min(settings.assemblyai_webhook_poll_seconds, remaining)
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+                except asyncio.TimeoutError:
+                    # The callback may have reached another replica; a slow poll covers that.
+                    polls += 1
+                    text = await self._fetch_transcript(client, headers, transcript_id)
+                    if text is not None:
+                        break
+                    continue
+                text = await self._fetch_transcript(client, headers, transcript_id)
+                if text is None:
+                    raise STTProviderError("AssemblyAI callback before completion")
+                break
+        finally:
+            transcript_waiters.forget(transcript_id)
+        elapsed = time.monotonic() - submitted_at
+        _poll_schedule.record(elapsed)
+        logger.info(
+            "AssemblyAI STT done transcript_id=%s callback=%s polls=%s seconds=%.2f",
+            transcript_id,
+            int(future.done()),
+            polls,
+            elapsed,
+        )
+        return text
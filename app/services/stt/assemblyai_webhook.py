@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from aiohttp import web
+
+from app.config import settings
+
+logger = logging.getLogger("stt.assemblyai")
+
+SECRET_HEADER = "X-AssemblyAI-Webhook-Secret"
+# Callbacks that arrive before the submitter starts waiting.
+_EARLY_MAX = 1000
+_EARLY_TTL_SECONDS = 120
+
+
+class TranscriptWaiters:
+    def __init__(self) -> None:
+        self.enabled = False
+        self._futures: dict[str, asyncio.Future[str]] = {}
+        self._early: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def expect(self, transcript_id: str) -> asyncio.Future[str]:
+        future = asyncio.get_running_loop().create_future()
+        early = self._early.pop(transcript_id, None)
+        if early is not None and time.monotonic() - early[1] < _EARLY_TTL_SECONDS:
+            future.set_result(early[0])
+        else:
+            self._futures[transcript_id] = future
+        return future
+
+    def forget(self, transcript_id: str) -> None:
+        self._futures.pop(transcript_id, None)
+
+    def resolve(self, transcript_id: str, status: str) -> bool:
+        future = self._futures.pop(transcript_id, None)
+        if future is None:
+            self._early[transcript_id] = (status, time.monotonic())
+            while len(self._early) > _EARLY_MAX:
+                self._early.popitem(last=False)
+            return False
+        if not future.done():
+            future.set_result(status)
+        return True
+
+
+transcript_waiters = TranscriptWaiters()
+
+
+def callback_url() -> str | None:
+    if not transcript_waiters.enabled or not settings.assemblyai_webhook_base_url:
+        return None
+    return settings.assemblyai_webhook_base_url.rstrip("/") + settings.assemblyai_webhook_path
+
+
+async def handle_callback(request: web.Request) -> web.Response:
+    secret = settings.assemblyai_webhook_secret
+    if secret and request.headers.get(SECRET_HEADER) != secret:
+        return web.Response(status=401)
+    try:
+        payload = await request.json()
+    except ValueError:
+        return web.Response(status=400)
+    transcript_id = payload.get("transcript_id")
+    status = payload.get("status")
+    if not transcript_id or not status:
+        return web.Response(status=400)
+    waiting = transcript_waiters.resolve(transcript_id, status)
+    logger.info(
+        "AssemblyAI STT callback transcript_id=%s status=%s waiting=%s",
+        transcript_id,
+        status,
+        waiting,
+    )
+    return web.Response(status=200)
+
+
+def setup_callback_route(app: web.Application) -> None:
+    if not settings.assemblyai_webhook_base_url:
+        return
+    app.router.add_post(settings.assemblyai_webhook_path, handle_callback)
+    transcript_waiters.enabled = True
+
+
+async def start_callback_server() -> web.AppRunner | None:
+    # Polling mode has no aiohttp app of its own, so the receiver gets a small one.
+    if not settings.assemblyai_webhook_base_url:
+        return None
+    app = web.Application()
+    setup_callback_route(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.assemblyai_webhook_port)
+    await site.start()
+    logger.info(
+        "AssemblyAI STT callback receiver port=%s path=%s",
+        settings.assemblyai_webhook_port,
+        settings.assemblyai_webhook_path,
+    )
+    return runner
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from app.utils.audio import VoiceAudio
+
 
 @dataclass
 class TranscriptionResult:
@@ -17,5 +19,11 @@ class STTProviderError(Exception):
 
 
 class STTProvider:
-    async def transcribe(self, wav_path: str) -> TranscriptionResult:
+    # Upload formats the provider decodes itself; anything else is transcoded to WAV first.
+    input_formats: frozenset[str] = frozenset({"audio/wav"})
+
+    def accepts(self, mime_type: str) -> bool:
+        return mime_type in self.input_formats
+
+    async def transcribe(self, audio: VoiceAudio) -> TranscriptionResult:
         raise NotImplementedError
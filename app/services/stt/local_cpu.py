@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import settings
+from app.services.i18n import t
+from app.services.stt.base import STTProvider, STTProviderError, TranscriptionResult
+from app.utils.audio import VoiceAudio
+
+logger = logging.getLogger("stt.local")
+
+SAMPLE_RATE = 16000
+_STUB_WORDS = ("apple", "river", "window", "garden", "yellow", "travel", "pencil", "morning")
+
+
+class StubModel:
+    # Deterministic: the same audio always yields the same transcript.
+    def __init__(self, text: str | None = None) -> None:
+        self.text = text
+
+    def transcribe(self, pcm: bytes) -> tuple[str, float | None]:
+        if self.text is not None:
+            return self.text, 1.0
+        if not pcm.strip(b"\0"):
+            return "", None
+        digest = hashlib.sha1(pcm).digest()
+        return _STUB_WORDS[digest[0] % len(_STUB_WORDS)], digest[1] / 255
+
+
+class VoskModel:
+    def __init__(self, path: str) -> None:
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(path)
+
+    def transcribe(self, pcm: bytes) -> tuple[str, float | None]:
+        recognizer = self._vosk.KaldiRecognizer(self._model, SAMPLE_RATE)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", ""), None
+
+
+def load_model(spec: str) -> StubModel | VoskModel:
+    kind, _, arg = spec.partition(":")
+    if kind == "stub":
+        return StubModel(arg or None)
+    if kind == "vosk":
+        return VoskModel(arg)
+    raise ValueError(f"Unknown STT_LOCAL_MODEL: {spec}")
+
+
+def wav_to_pcm(data: bytes) -> bytes:
+    # ffmpeg writes a streaming WAV header with an unknown length; read frames until EOF.
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError("expected 16 kHz mono s16le WAV")
+        chunks = []
+        while chunk := wav.readframes(SAMPLE_RATE):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+_model: StubModel | VoskModel | None = None
+
+
+def _init_worker(spec: str) -> None:
+    global _model
+    started = time.perf_counter()
+    _model = load_model(spec)
+    # First inference pays for lazy allocations; do it before real traffic.
+    _model.transcribe(b"\0" * SAMPLE_RATE)
+    logging.getLogger("stt.local").info(
+        "STT_LOCAL_WORKER_READY model=%s load_ms=%.0f", spec, (time.perf_counter() - started) * 1000
+    )
+
+
+def _ping() -> bool:
+    return _model is not None
+
+
+def _transcribe_in_worker(wav: bytes) -> tuple[str, float | None, float]:
+    started = time.perf_counter()
+    text, confidence = _model.transcribe(wav_to_pcm(wav))
+    return text, confidence, time.perf_counter() - started
+
+
+class LocalCPUSTT(STTProvider):
+    input_formats = frozenset({"audio/wav"})
+
+    def __init__(self, model: str, workers: int, queue_size: int) -> None:
+        self.model = model
+        self.workers = workers
+        # Jobs running plus jobs waiting for a worker.
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model,),
+            )
+        return self._executor
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        # One task per worker forces every process to spawn and load the model now.
+        await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(self.workers)))
+        logger.info("STT_LOCAL_READY model=%s workers=%s", self.model, self.workers)
+
+    async def transcribe(self, audio: VoiceAudio) -> TranscriptionResult:
+        if self.pending >= self.max_pending:
+            logger.warning("STT_LOCAL_OVERLOAD pending=%s", self.pending)
+            raise STTProviderError("local STT queue is full", user_message=t("stt.unavailable"))
+        self.pending += 1
+        try:
+            body = audio.upload_body()
+            if isinstance(body, bytes):
+                wav = body
+            else:
+                wav = b"".join([chunk async for chunk in body])
+            loop = asyncio.get_running_loop()
+            try:
+                text, confidence, seconds = await loop.run_in_executor(
+                    self._pool(), _transcribe_in_worker, wav
+                )
+            except BrokenProcessPool as exc:
+                self._executor = None
+                logger.exception("STT_LOCAL_ERROR worker died")
+                raise STTProviderError(str(exc), user_message=t("stt.unavailable")) from exc
+            except ValueError as exc:
+                raise STTProviderError(str(exc)) from exc
+        finally:
+            self.pending -= 1
+        logger.info("STT_LOCAL_DONE infer_ms=%.0f transcript_len=%s", seconds * 1000, len(text))
+        return TranscriptionResult(transcript=text.strip(), confidence=confidence)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_provider: LocalCPUSTT | None = None
+
+
+def local_stt() -> LocalCPUSTT:
+    global _provider
+    if _provider is None:
+        _provider = LocalCPUSTT(
+            settings.stt_local_model, settings.stt_local_workers, settings.stt_local_queue_size
+        )
+    return _provider
+
+
+def shutdown_local_stt() -> None:
+    if _provider is not None:
+        _provider.close()
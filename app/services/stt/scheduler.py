@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from app.config import settings
+from app.services.i18n import t
+from app.services.stt.base import STTProviderError
+
+logger = logging.getLogger("stt.scheduler")
+
+# Lower value is served first.
+PRIORITY_SINGLE = 0
+PRIORITY_QUIZ = 1
+# Seconds of audio a user may send per round-robin turn.
+QUANTUM_SECONDS = 5.0
+DEFAULT_SERVICE_SECONDS = 3.0
+
+
+@dataclass(frozen=True)
+class STTRequest:
+    user_id: int
+    priority: int = PRIORITY_SINGLE
+    cost: float = 1.0
+
+
+@dataclass(eq=False)
+class Ticket:
+    request: STTRequest
+    enqueued_at: float
+    future: asyncio.Future | None = None
+    started_at: float | None = None
+    released: bool = False
+
+
+@dataclass
+class _PriorityClass:
+    # user id -> queued tickets; insertion order is the round-robin order.
+    users: OrderedDict[int, deque[Ticket]] = field(default_factory=OrderedDict)
+    deficits: dict[int, float] = field(default_factory=dict)
+    waiting: int = 0
+
+
+stt_request: ContextVar[STTRequest | None] = ContextVar("stt_request", default=None)
+_current_ticket: ContextVar[Ticket | None] = ContextVar("stt_ticket", default=None)
+
+
+class STTScheduler:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.running = 0
+        self._classes: dict[int, _PriorityClass] = {}
+        self._service_seconds = DEFAULT_SERVICE_SECONDS
+        self._waits: deque[float] = deque(maxlen=500)
+        self.served = 0
+        self.rejected = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(cls.waiting for cls in self._classes.values())
+
+    def estimate_wait(self, request: STTRequest) -> float:
+        if self.running < self.capacity and not self.depth:
+            return 0.0
+        ahead = 0
+        for priority, cls in self._classes.items():
+            if priority < request.priority:
+                ahead += cls.waiting
+            elif priority == request.priority:
+                # Round-robin: roughly one job from every other user, then our own backlog.
+                ahead += len(cls.users) - (request.user_id in cls.users)
+                ahead += len(cls.users.get(request.user_id, ()))
+        return (ahead + 1) * self._service_seconds / self.capacity
+
+    def _enqueue(self, ticket: Ticket) -> None:
+        cls = self._classes.setdefault(ticket.request.priority, _PriorityClass())
+        queue = cls.users.get(ticket.request.user_id)
+        if queue is None:
+            queue = cls.users[ticket.request.user_id] = deque()
+            cls.deficits[ticket.request.user_id] = 0.0
+        queue.append(ticket)
+        cls.waiting += 1
+
+    def _drop(self, ticket: Ticket) -> None:
+        cls = self._classes.get(ticket.request.priority)
+        queue = cls.users.get(ticket.request.user_id) if cls else None
+        if queue is None or ticket not in queue:
+            return
+        queue.remove(ticket)
+        cls.waiting -= 1
+        if not queue:
+            del cls.users[ticket.request.user_id]
+            del cls.deficits[ticket.request.user_id]
+
+    def _next(self) -> Ticket | None:
+        for priority in sorted(self._classes):
+            cls = self._classes[priority]
+            # Deficit round-robin: each turn adds a quantum, a job runs once it fits.
+            while cls.users:
+                user_id, queue = next(iter(cls.users.items()))
+                ticket = queue[0]
+                if cls.deficits[user_id] < ticket.request.cost:
+                    cls.deficits[user_id] += QUANTUM_SECONDS
+                    cls.users.move_to_end(user_id)
+                    continue
+                cls.deficits[user_id] -= ticket.request.cost
+                queue.popleft()
+                cls.waiting -= 1
+                if not queue:
+                    del cls.users[user_id]
+                    del cls.deficits[user_id]
+                return ticket
+        return None
+
+    def _dispatch(self) -> None:
+        while self.running < self.capacity:
+            ticket = self._next()
+            if ticket is None:
+                return
+            if ticket.future.done():
+                continue
+            self._start(ticket)
+            ticket.future.set_result(True)
+
+    def _start(self, ticket: Ticket) -> None:
+        self.running += 1
+        ticket.started_at = time.monotonic()
+        self._waits.append(ticket.started_at - ticket.enqueued_at)
+        self.served += 1
+
+    async def acquire(self, request: STTRequest, max_wait: float, failfast: bool) -> Ticket | None:
+        ticket = Ticket(request=request, enqueued_at=time.monotonic())
+        if self.running < self.capacity and not self.depth:
+            self._start(ticket)
+            return ticket
+        if failfast and self.estimate_wait(request) > max_wait:
+            self.rejected += 1
+            return None
+        ticket.future = asyncio.get_running_loop().create_future()
+        self._enqueue(ticket)
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if ticket.started_at is not None:
+                return ticket
+            self._drop(ticket)
+            ticket.future.cancel()
+            self.rejected += 1
+            return None
+        except asyncio.CancelledError:
+            if ticket.started_at is not None:
+                self.release(ticket)
+            else:
+                self._drop(ticket)
+                ticket.future.cancel()
+            raise
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.released or ticket.started_at is None:
+            return
+        ticket.released = True
+        self.running -= 1
+        held = time.monotonic() - ticket.started_at
+        self._service_seconds = 0.8 * self._service_seconds + 0.2 * held
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Ticket]:
+        request = stt_request.get() or STTRequest(user_id=0)
+        ticket = await self.acquire(
+            request,
+            max_wait=float(settings.stt_queue_max_wait_seconds),
+            failfast=settings.stt_overload_mode == "failfast",
+        )
+        if ticket is None:
+            logger.warning(
+                "STT_QUEUE_REJECT user=%s priority=%s depth=%s running=%s",
+                request.user_id,
+                request.priority,
+                self.depth,
+                self.running,
+            )
+            raise STTProviderError("STT queue is full", user_message=t("stt.unavailable"))
+        token = _current_ticket.set(ticket)
+        try:
+            yield ticket
+        finally:
+            _current_ticket.reset(token)
+            self.release(ticket)
+
+    def release_current(self) -> None:
+        # Providers that hand work off to a remote queue can free the slot early.
+        ticket = _current_ticket.get()
+        if ticket is not None:
+            self.release(ticket)
+
+    def log_stats(self) -> None:
+        waits = sorted(self._waits)
+        if not waits and not self.rejected:
+            return
+        p50 = waits[len(waits) // 2] if waits else 0.0
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        logger.info(
+            "STT_QUEUE depth=%s running=%s served=%s rejected=%s wait_p50_ms=%.0f wait_p95_ms=%.0f service_ms=%.0f",
+            self.depth,
+            self.running,
+            self.served,
+            self.rejected,
+            p50 * 1000,
+            p95 * 1000,
+            self._service_seconds * 1000,
+        )
+
+
+stt_scheduler = STTScheduler(settings.stt_max_concurrency)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger("trace.slow")
+
+_MAX_SPANS = 200
+_MAX_STATEMENT_LEN = 160
+_HTTPX_START_KEY = "trace_started_at"
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    duration_ms: float
+
+
+@dataclass
+class Trace:
+    update_id: int | None
+    event_type: str | None = None
+    router: str | None = None
+    handler: str | None = None
+    state: str | None = None
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: list[Span] = field(default_factory=list)
+    dropped_spans: int = 0
+    token: Token | None = field(default=None, repr=False)
+
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+
+_current: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_sqlalchemy_installed = False
+
+
+def start_trace(update_id: int | None, event_type: str | None = None) -> Trace:
+    trace = Trace(update_id=update_id, event_type=event_type)
+    trace.token = _current.set(trace)
+    return trace
+
+
+def finish_trace(trace: Trace) -> None:
+    _current.reset(trace.token)
+    duration_ms = trace.duration_ms()
+    if duration_ms < settings.trace_slow_update_ms:
+        return
+    db_spans = [span for span in trace.spans if span.kind == "db"]
+    http_spans = [span for span in trace.spans if span.kind != "db"]
+    lines = [
+        f"  {span.kind} {span.duration_ms:.1f}ms {span.name}" for span in trace.spans
+    ]
+    if trace.dropped_spans:
+        lines.append(f"  ... {trace.dropped_spans} more spans")
+    logger.warning(
+        "SLOW_UPDATE update_id=%s type=%s router=%s handler=%s state=%s duration_ms=%.1f "
+        "db_count=%s db_ms=%.1f http_count=%s http_ms=%.1f\n%s",
+        trace.update_id,
+        trace.event_type,
+        trace.router,
+        trace.handler,
+        trace.state,
+        duration_ms,
+        len(db_spans),
+        sum(span.duration_ms for span in db_spans),
+        len(http_spans),
+        sum(span.duration_ms for span in http_spans),
+        "\n".join(lines),
+    )
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+def tag_trace(router: str | None, handler: str | None, state: str | None) -> None:
+    trace = _current.get()
+    if not trace:
+        return
+    trace.router = router
+    trace.handler = handler
+    trace.state = state
+
+
+def record_span(kind: str, name: str, duration_ms: float) -> None:
+    trace = _current.get()
+    if not trace:
+        return
+    if len(trace.spans) >= _MAX_SPANS:
+        trace.dropped_spans += 1
+        return
+    trace.spans.append(Span(kind=kind, name=name, duration_ms=duration_ms))
+
+
+def _short_statement(statement: str) -> str:
+    text = " ".join(statement.split())
+    if len(text) <= _MAX_STATEMENT_LEN:
+        return text
+    return text[: _MAX_STATEMENT_LEN - 3] + "..."
+
+
+def install_sqlalchemy_tracing(engine: AsyncEngine) -> None:
+    global _sqlalchemy_installed
+    if _sqlalchemy_installed:
+        return
+    _sqlalchemy_installed = True
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("trace_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("trace_started_at")
+        if not stack:
+            return
+        started_at = stack.pop()
+        record_span(
+            "db",
+            _short_statement(statement),
+            (time.perf_counter() - started_at) * 1000,
+        )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute; keep the stack balanced.
+        conn = exception_context.connection
+        stack = conn.info.get("trace_started_at") if conn is not None else None
+        if not stack or exception_context.statement is None:
+            return
+        started_at = stack.pop()
+        record_span(
+            "db",
+            _short_statement(exception_context.statement) + " ERROR",
+            (time.perf_counter() - started_at) * 1000,
+        )
+
+
+async def _httpx_on_request(request: httpx.Request) -> None:
+    request.extensions[_HTTPX_START_KEY] = time.perf_counter()
+
+
+async def _httpx_on_response(response: httpx.Response) -> None:
+    request = response.request
+    started_at = request.extensions.get(_HTTPX_START_KEY)
+    if started_at is None:
+        return
+    record_span(
+        "http",
+        f"{request.method} {request.url.host}{request.url.path} {response.status_code}",
+        (time.perf_counter() - started_at) * 1000,
+    )
+
+
+def httpx_event_hooks() -> dict[str, list]:
+    if not settings.trace_enabled:
+        return {}
+    return {"request": [_httpx_on_request], "response": [_httpx_on_response]}
@@ -1,3 +1,4 @@
+from app.services.translation.cache import TranslationLookup, suggest_translation
 from app.services.translation.google import translate
 
-__all__ = ["translate"]
+__all__ = ["TranslationLookup", "suggest_translation", "translate"]
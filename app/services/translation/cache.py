@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+
+from app.config import settings
+from app.db.repo.translation_cache import get_cached_translation, save_translation
+from app.db.session import AsyncSessionLocal
+from app.services.translation.google import translate_result
+from app.utils.bad_words import contains_bad_words
+
+logger = logging.getLogger("translation")
+
+
+class _Entry(NamedTuple):
+    # None is a negative entry: no usable translation for now.
+    text: str | None
+    expires_at: float
+
+
+class TranslationMemoryCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, _Entry] = OrderedDict()
+
+    def get(self, key: str) -> _Entry | None:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return entry
+
+    def put(self, key: str, text: str | None, ttl_seconds: int) -> _Entry:
+        entry = self._items[key] = _Entry(text, time.monotonic() + ttl_seconds)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+memory_cache = TranslationMemoryCache(settings.translation_memory_cache_size)
+stats: Counter[str] = Counter()
+
+
+def normalize_source(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+_background: set[asyncio.Task] = set()
+
+
+def _keep(task: asyncio.Task) -> None:
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _save(word: str, normalized: str, translated: str) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            await save_translation(session, word, normalized, "en", "uz", translated)
+    except Exception:
+        logger.exception("TRANSLATION_CACHE_SAVE_ERROR")
+
+
+class TranslationLookup:
+    # Memory -> DB -> API; after a DB miss the API call can overlap the caller's other queries.
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.normalized = normalize_source(word)
+        self.entry = memory_cache.get(self.normalized)
+        self._api: asyncio.Task[str | None] | None = None
+        if self.entry is not None:
+            stats["memory_hit" if self.entry.text else "memory_negative_hit"] += 1
+            return
+        stats["memory_miss"] += 1
+
+    async def check_db(self, session, speculate: bool = False) -> None:
+        if self.entry is not None:
+            return
+        cached = await get_cached_translation(session, self.normalized, "en", "uz")
+        if cached and not contains_bad_words(cached):
+            stats["db_hit"] += 1
+            self.entry = memory_cache.put(
+                self.normalized, cached, settings.translation_cache_ttl_seconds
+            )
+            return
+        stats["db_miss"] += 1
+        if speculate:
+            self._start_api()
+
+    def _start_api(self) -> None:
+        if self._api is None:
+            self._api = asyncio.get_running_loop().create_task(self._fetch())
+            _keep(self._api)
+
+    async def _fetch(self) -> str | None:
+        result = await translate_result(self.word)
+        suggestion = result.text
+        if suggestion and contains_bad_words(suggestion):
+            suggestion = None
+        if suggestion:
+            stats["api_ok"] += 1
+            self.entry = memory_cache.put(
+                self.normalized, suggestion, settings.translation_cache_ttl_seconds
+            )
+            # The suggestion is already in memory; the DB write need not delay the reply.
+            _keep(asyncio.get_running_loop().create_task(_save(self.word, self.normalized, suggestion)))
+        elif result.ok:
+            stats["api_miss"] += 1
+            self.entry = memory_cache.put(
+                self.normalized, None, settings.translation_negative_ttl_seconds
+            )
+        else:
+            # Failures are retried sooner than genuine misses.
+            stats["api_error"] += 1
+            self.entry = memory_cache.put(
+                self.normalized, None, settings.translation_error_ttl_seconds
+            )
+        return suggestion
+
+    def detach(self) -> None:
+        # The request is already paid for; let it finish in the background and fill the cache.
+        if self._api is not None and not self._api.done():
+            stats["speculative_unused"] += 1
+        self._api = None
+
+    async def result(self) -> str | None:
+        if self.entry is not None:
+            return self.entry.text
+        self._start_api()
+        return await asyncio.shield(self._api)
+
+
+async def suggest_translation(word: str) -> str | None:
+    lookup = TranslationLookup(word)
+    if lookup.entry is None:
+        async with AsyncSessionLocal() as session:
+            await lookup.check_db(session)
+    return await lookup.result()
+
+
+def log_stats() -> None:
+    if not stats:
+        return
+    memory_total = stats["memory_hit"] + stats["memory_negative_hit"] + stats["memory_miss"]
+    db_total = stats["db_hit"] + stats["db_miss"]
+    logger.info(
+        "TRANSLATION_CACHE size=%s memory_hit=%s memory_negative_hit=%s memory_miss=%s "
+        "memory_hit_pct=%.0f db_hit=%s db_miss=%s db_hit_pct=%.0f api_ok=%s api_miss=%s api_error=%s "
+        "speculative_unused=%s",
+        len(memory_cache),
+        stats["memory_hit"],
+        stats["memory_negative_hit"],
+        stats["memory_miss"],
+        (stats["memory_hit"] + stats["memory_negative_hit"]) / max(memory_total, 1) * 100,
+        stats["db_hit"],
+        stats["db_miss"],
+        stats["db_hit"] / max(db_total, 1) * 100,
+        stats["api_ok"],
+        stats["api_miss"],
+        stats["api_error"],
+        stats["speculative_unused"],
+    )
@@ -4,51 +4,119 @@ import asyncio
 import html
 import logging
 import time
-
-import httpx
+from typing import NamedTuple
 
 from app.config import settings
+from app.services.http_clients import http_clients
 
 logger = logging.getLogger("translation")
-_semaphore = asyncio.Semaphore(2)
 
 
-async def translate(text: str) -> str | None:
+class TranslateResult(NamedTuple):
+    text: str | None
+    # False when the API call failed, as opposed to returning no translation.
+    ok: bool = True
+
+
+class BatchTranslator:
+    # Concurrent lookups within one window go out as a single request with many `q` values.
+    def __init__(self, window_seconds: float, max_batch: int, max_in_flight: int) -> None:
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._pending: dict[str, asyncio.Future[TranslateResult]] = {}
+        self._in_flight: dict[str, asyncio.Future[TranslateResult]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def translate(self, text: str) -> TranslateResult:
+        future = self._in_flight.get(text) or self._pending.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[text] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window_seconds, self._flush)
+        # One waiter giving up must not cancel the lookup for the others.
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._in_flight.update(batch)
+        asyncio.get_running_loop().create_task(self._send(batch))
+
+    async def _send(self, batch: dict[str, asyncio.Future[TranslateResult]]) -> None:
+        texts = list(batch)
+        results = [TranslateResult(None, ok=False)] * len(texts)
+        try:
+            async with self._slots:
+                results = await self._request(texts)
+        except Exception:
+            logger.exception("GTRANSLATE_ERROR batch=%s", len(texts))
+        finally:
+            for text, result in zip(texts, results):
+                self._in_flight.pop(text, None)
+                future = batch[text]
+                if not future.done():
+                    future.set_result(result)
+
+    async def _request(self, texts: list[str]) -> list[TranslateResult]:
+        start = time.monotonic()
+        client = http_clients.get("google_translate")
+        params = {"key": settings.google_translate_api_key}
+        data = {
+            "q": texts,
+            "source": "en",
+            "target": "uz",
+            "format": "text",
+        }
+        response = await client.post(settings.google_translate_url, params=params, data=data)
+        duration_ms = int((time.monotonic() - start) * 1000)
+        if response.status_code >= 400:
+            logger.warning(
+                "GTRANSLATE_ERROR status=%s duration_ms=%s batch=%s",
+                response.status_code,
+                duration_ms,
+                len(texts),
+            )
+            return [TranslateResult(None, ok=False)] * len(texts)
+        translations = response.json().get("data", {}).get("translations", [])
+        results = []
+        for index in range(len(texts)):
+            translated = translations[index].get("translatedText") if index < len(translations) else None
+            results.append(TranslateResult(html.unescape(translated) if translated else None))
+        logger.info(
+            "GTRANSLATE_OK duration_ms=%s batch=%s input_len=%s",
+            duration_ms,
+            len(texts),
+            sum(len(text) for text in texts),
+        )
+        return results
+
+
+_translator = BatchTranslator(
+    settings.google_translate_batch_window_ms / 1000,
+    settings.google_translate_batch_size,
+    settings.google_translate_max_in_flight,
+)
+
+
+async def translate_result(text: str) -> TranslateResult:
     cleaned = text.strip()
     if not cleaned:
-        return None
+        return TranslateResult(None)
     if len(cleaned) > 128:
-        return None
+        return TranslateResult(None)
     if not settings.translation_enabled or not settings.google_translate_api_key:
-        return None
-
-    start = time.monotonic()
-    async with _semaphore:
-        async with httpx.AsyncClient(
-            timeout=settings.google_translate_timeout_seconds
-        ) as client:
-            params = {"key": settings.google_translate_api_key}
-            data = {
-                "q": cleaned,
-                "source": "en",
-                "target": "uz",
-                "format": "text",
-            }
-            response = await client.post(
-                settings.google_translate_url, params=params, data=data
-            )
-    duration_ms = int((time.monotonic() - start) * 1000)
-    if response.status_code >= 400:
-        logger.warning("GTRANSLATE_ERROR status=%s duration_ms=%s", response.status_code, duration_ms)
-        return None
-    payload = response.json()
-    translated = (
-        payload.get("data", {})
-        .get("translations", [{}])[0]
-        .get("translatedText")
-    )
-    if not translated:
-        return None
-    translated = html.unescape(translated)
-    logger.info("GTRANSLATE_OK duration_ms=%s input_len=%s", duration_ms, len(cleaned))
-    return translated
+        return TranslateResult(None, ok=False)
+    return await _translator.translate(cleaned)
+
+
+async def translate(text: str) -> str | None:
+    return (await translate_result(text)).text
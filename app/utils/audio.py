@@ -1,43 +1,84 @@
 from __future__ import annotations
 
 import asyncio
-import tempfile
 from dataclasses import dataclass
-from pathlib import Path
+from typing import AsyncIterator
 
 from aiogram import Bot
 from aiogram.types import Voice
 
+_CHUNK_SIZE = 64 * 1024
 
-@dataclass
-class AudioFiles:
-    ogg_path: Path
-    wav_path: Path
 
+class AudioTranscodeError(RuntimeError):
+    pass
 
-async def download_voice(bot: Bot, voice: Voice) -> tuple[Path, int]:
+
+@dataclass(frozen=True)
+class VoiceAudio:
+    # Telegram voice notes are OGG/Opus; a few hundred KB at most.
+    data: bytes
+    mime_type: str = "audio/ogg"
+    transcode: bool = True
+
+    def wav_stream(self) -> AsyncIterator[bytes]:
+        return transcode_to_wav(self.data)
+
+    def upload_body(self) -> bytes | AsyncIterator[bytes]:
+        if self.transcode:
+            return self.wav_stream()
+        return self.data
+
+    @property
+    def upload_mime_type(self) -> str:
+        return "audio/wav" if self.transcode else self.mime_type
+
+
+async def download_voice(bot: Bot, voice: Voice, transcode: bool = True) -> VoiceAudio:
     file = await bot.get_file(voice.file_id)
-    tmp_ogg = Path(tempfile.mkstemp(suffix=".ogg")[1])
-    await bot.download_file(file.file_path, destination=tmp_ogg)
-    return tmp_ogg, voice.file_size or 0
+    buffer = await bot.download_file(file.file_path)
+    return VoiceAudio(data=buffer.getvalue(), transcode=transcode)
 
 
-async def convert_to_wav(ogg_path: Path) -> Path:
-    wav_path = Path(tempfile.mkstemp(suffix=".wav")[1])
+async def transcode_to_wav(data: bytes) -> AsyncIterator[bytes]:
     process = await asyncio.create_subprocess_exec(
         "ffmpeg",
-        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
         "-i",
-        str(ogg_path),
+        "pipe:0",
         "-ac",
         "1",
         "-ar",
         "16000",
-        str(wav_path),
-        stdout=asyncio.subprocess.DEVNULL,
+        "-f",
+        "wav",
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.DEVNULL,
     )
-    code = await process.wait()
-    if code != 0:
-        raise RuntimeError("ffmpeg error")
-    return wav_path
+
+    async def feed() -> None:
+        try:
+            process.stdin.write(data)
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            process.stdin.close()
+
+    # Writing and reading concurrently keeps both pipes from filling up.
+    feeder = asyncio.create_task(feed())
+    try:
+        while chunk := await process.stdout.read(_CHUNK_SIZE):
+            yield chunk
+        await feeder
+        if await process.wait() != 0:
+            raise AudioTranscodeError("ffmpeg error")
+    finally:
+        feeder.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
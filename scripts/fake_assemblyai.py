@@ -0,0 +1,148 @@
+"""Local fake AssemblyAI API for testing polling and the completion callback.
+
+1) Run the fake API (jobs finish after a log-normal delay):
+   python scripts/fake_assemblyai.py api --port 8089 --median-seconds 2
+2) Point the bot at it: ASSEMBLYAI_BASE_URL=http://127.0.0.1:8089/v2
+   (add ASSEMBLYAI_WEBHOOK_BASE_URL=http://127.0.0.1:8090 to test callbacks)
+3) Or drive the provider directly and compare both modes:
+   PYTHONPATH=. python scripts/fake_assemblyai.py run --count 40
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+
+from aiohttp import ClientSession, web
+
+_ids = itertools.count(1)
+
+
+class FakeAssemblyAI:
+    def __init__(self, median_seconds: float, sigma: float) -> None:
+        self.median_seconds = median_seconds
+        self.sigma = sigma
+        self.jobs: dict[str, dict] = {}
+        self.polls = 0
+        self.uploaded_bytes = 0
+
+    async def upload(self, request: web.Request) -> web.Response:
+        self.uploaded_bytes += len(await request.read())
+        return web.json_response({"upload_url": f"https://cdn.fake/{next(_ids)}"})
+
+    async def create(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        transcript_id = f"tr_{next(_ids)}"
+        delay = random.lognormvariate(0, self.sigma) * self.median_seconds
+        self.jobs[transcript_id] = {"done_at": time.monotonic() + delay}
+        if payload.get("webhook_url"):
+            asyncio.create_task(self._callback(transcript_id, delay, payload))
+        return web.json_response({"id": transcript_id, "status": "queued"})
+
+    async def _callback(self, transcript_id: str, delay: float, payload: dict) -> None:
+        await asyncio.sleep(delay)
+        headers = {}
+        if payload.get("webhook_auth_header_name"):
+            headers[payload["webhook_auth_header_name"]] = payload["webhook_auth_header_value"]
+        async with ClientSession() as session:
+            await session.post(
+                payload["webhook_url"],
+                json={"transcript_id": transcript_id, "status": "completed"},
+                headers=headers,
+            )
+
+    async def get(self, request: web.Request) -> web.Response:
+        self.polls += 1
+        transcript_id = request.match_info["transcript_id"]
+        job = self.jobs.get(transcript_id)
+        if job is None:
+            return web.json_response({"error": "not found"}, status=404)
+        if time.monotonic() < job["done_at"]:
+            return web.json_response({"id": transcript_id, "status": "processing"})
+        return web.json_response({"id": transcript_id, "status": "completed", "text": "hello"})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v2/upload", self.upload)
+        app.router.add_post("/v2/transcript", self.create)
+        app.router.add_get("/v2/transcript/{transcript_id}", self.get)
+        return app
+
+
+async def _start(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def run(count: int, concurrency: int, api_port: int, callback_port: int, median: float) -> None:
+    fake = FakeAssemblyAI(median, 0.4)
+    api = await _start(fake.app(), api_port)
+
+    # Settings are read at import time, so configure before importing the app.
+    os.environ.setdefault("BOT_TOKEN", "0:fake")
+    os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://fake/fake")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("ASSEMBLYAI_API_KEY", "fake")
+    os.environ["ASSEMBLYAI_BASE_URL"] = f"http://127.0.0.1:{api_port}/v2"
+    os.environ["ASSEMBLYAI_WEBHOOK_BASE_URL"] = f"http://127.0.0.1:{callback_port}"
+    os.environ["ASSEMBLYAI_WEBHOOK_PORT"] = str(callback_port)
+    os.environ["ASSEMBLYAI_WEBHOOK_SECRET"] = "test"
+    from app.services.stt import assemblyai_transcribe as stt
+    from app.services.stt.assemblyai_webhook import start_callback_server, transcript_waiters
+    from app.utils.audio import VoiceAudio
+
+    provider = stt.AssemblyAITranscribeSTT()
+    audio = VoiceAudio(b"\0" * 20_000, transcode=False)
+    callbacks = await start_callback_server()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with gate:
+            started = time.monotonic()
+            result = await provider.transcribe(audio)
+            assert result.transcript == "hello"
+            return time.monotonic() - started
+
+    for mode in ("poll", "callback"):
+        transcript_waiters.enabled = mode == "callback"
+        fake.polls = 0
+        started = time.monotonic()
+        timings = sorted(await asyncio.gather(*(one() for _ in range(count))))
+        wall = time.monotonic() - started
+        print(
+            f"{mode:8} jobs={count} get_requests={fake.polls} "
+            f"p50_s={timings[len(timings) // 2]:.2f} max_s={timings[-1]:.2f} wall_s={wall:.2f}"
+        )
+    await callbacks.cleanup()
+    await api.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    api = sub.add_parser("api")
+    api.add_argument("--port", type=int, default=8089)
+    api.add_argument("--median-seconds", type=float, default=2.0)
+    api.add_argument("--sigma", type=float, default=0.4)
+    runner = sub.add_parser("run")
+    runner.add_argument("--count", type=int, default=40)
+    runner.add_argument("--concurrency", type=int, default=20)
+    runner.add_argument("--port", type=int, default=8089)
+    runner.add_argument("--callback-port", type=int, default=8090)
+    runner.add_argument("--median-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    if args.command == "api":
+        fake = FakeAssemblyAI(args.median_seconds, args.sigma)
+        web.run_app(fake.app(), host="127.0.0.1", port=args.port)
+    else:
+        asyncio.run(
+            run(args.count, args.concurrency, args.port, args.callback_port, args.median_seconds)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Bulk-load an offline en→uz dictionary into translation_cache (COPY + set-based merge).
+
+python scripts/load_dictionary.py dictionary.tsv            # "english<TAB>uzbek" per line
+python scripts/load_dictionary.py dictionary.jsonl.gz --source-key en --target-key uz
+python scripts/load_dictionary.py dictionary.tsv --restart  # ignore the saved checkpoint
+
+The file is streamed in batches; each batch is COPYed into a temp staging table and merged with
+INSERT ... ON CONFLICT DO NOTHING, so existing (API or earlier) translations are never overwritten.
+Progress is checkpointed to <file>.progress after every committed batch; rerunning resumes there.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.services.translation.cache import normalize_source
+from app.utils.bad_words import contains_bad_words
+
+_MAX_NORM_LEN = 256
+
+_STAGING_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS translation_cache_staging (
+    source_text text NOT NULL,
+    source_text_norm varchar(256) NOT NULL,
+    translated_text text NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+_MERGE = """
+INSERT INTO translation_cache
+    (source_text, source_text_norm, source_lang, target_lang, translated_text, created_at)
+SELECT DISTINCT ON (source_text_norm)
+    source_text, source_text_norm, 'en', 'uz', translated_text, now() AT TIME ZONE 'utc'
+FROM translation_cache_staging
+ORDER BY source_text_norm
+ON CONFLICT (source_text_norm, source_lang, target_lang) DO NOTHING
+"""
+
+
+def _dsn() -> str:
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def _open(path: Path) -> BinaryIO:
+    # gzip supports forward seek, so a byte offset checkpoint works for both.
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+def _parse(line: bytes, fmt: str, source_key: str, target_key: str) -> tuple[str, str] | None:
+    text = line.decode("utf-8", errors="replace").strip()
+    if not text or text.startswith("#"):
+        return None
+    if fmt == "jsonl":
+        try:
+            item = json.loads(text)
+        except ValueError:
+            return None
+        source, target = item.get(source_key), item.get(target_key)
+    else:
+        parts = text.split("\t")
+        if len(parts) < 2:
+            return None
+        source, target = parts[0], parts[1]
+    if not isinstance(source, str) or not isinstance(target, str):
+        return None
+    source, target = source.strip(), target.strip()
+    if not source or not target:
+        return None
+    return source, target
+
+
+def _batches(
+    handle: BinaryIO, fmt: str, source_key: str, target_key: str, batch_size: int
+) -> Iterator[tuple[list[tuple[str, str, str]], int, int]]:
+    rows: list[tuple[str, str, str]] = []
+    lines = 0
+    for line in iter(handle.readline, b""):
+        lines += 1
+        parsed = _parse(line, fmt, source_key, target_key)
+        if parsed is not None:
+            source, target = parsed
+            norm = normalize_source(source)
+            if len(norm) <= _MAX_NORM_LEN and not contains_bad_words(target):
+                rows.append((source, norm, target))
+        if lines >= batch_size:
+            yield rows, lines, handle.tell()
+            rows, lines = [], 0
+    if lines:
+        yield rows, lines, handle.tell()
+
+
+def _read_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        return {"offset": 0, "lines": 0, "rows": 0, "inserted": 0}
+    return json.loads(path.read_text())
+
+
+def _write_checkpoint(path: Path, state: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+async def load(
+    path: Path, fmt: str, source_key: str, target_key: str, batch_size: int, restart: bool
+) -> None:
+    checkpoint_path = path.with_name(path.name + ".progress")
+    state = {"offset": 0, "lines": 0, "rows": 0, "inserted": 0}
+    if not restart:
+        state = _read_checkpoint(checkpoint_path)
+    total_bytes = path.stat().st_size if path.suffix != ".gz" else None
+    if state["offset"]:
+        print(f"resuming at line {state['lines']:,} (offset {state['offset']:,})")
+
+    connection = await asyncpg.connect(_dsn())
+    started = time.monotonic()
+    loaded_lines = 0
+    try:
+        await connection.execute(_STAGING_DDL)
+        with _open(path) as handle:
+            handle.seek(state["offset"])
+            for rows, lines, offset in _batches(handle, fmt, source_key, target_key, batch_size):
+                async with connection.transaction():
+                    if rows:
+                        await connection.copy_records_to_table(
+                            "translation_cache_staging",
+                            records=rows,
+                            columns=["source_text", "source_text_norm", "translated_text"],
+                        )
+                        status = await connection.execute(_MERGE)
+                        state["inserted"] += int(status.rsplit(" ", 1)[-1])
+                # A crash before the checkpoint replays one batch; the merge is idempotent.
+                state["offset"] = offset
+                state["lines"] += lines
+                state["rows"] += len(rows)
+                _write_checkpoint(checkpoint_path, state)
+                loaded_lines += lines
+                elapsed = time.monotonic() - started
+                progress = f" {offset / total_bytes:6.1%}" if total_bytes else ""
+                print(
+                    f"lines={state['lines']:,} rows={state['rows']:,} inserted={state['inserted']:,}"
+                    f"{progress} lines_per_sec={loaded_lines / max(elapsed, 1e-9):,.0f}",
+                    flush=True,
+                )
+    finally:
+        await connection.close()
+    print(f"done in {time.monotonic() - started:.1f}s; checkpoint kept at {checkpoint_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["tsv", "jsonl"])
+    parser.add_argument("--source-key", default="en")
+    parser.add_argument("--target-key", default="uz")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+    fmt = args.format or ("jsonl" if ".jsonl" in args.path.suffixes else "tsv")
+    asyncio.run(
+        load(args.path, fmt, args.source_key, args.target_key, args.batch_size, args.restart)
+    )
+
+
+if __name__ == "__main__":
+    main()
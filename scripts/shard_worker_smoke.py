@@ -0,0 +1,49 @@
+"""Start one sharded bot worker with the local STT provider and check it stays up (needs the database).
+
+STT_PROVIDER=local STT_LOCAL_MODEL=stub PYTHONPATH=. python scripts/shard_worker_smoke.py --seconds 15
+
+The worker runs on_worker_startup, which spawns the local STT process pool. It passes when the
+heartbeat starts (startup finished), the worker is still the first process after --seconds
+(no restart loop), and it exits cleanly on the stop sentinel.
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import time
+
+from app.bot import sharding
+from app.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=15.0)
+    args = parser.parse_args()
+    if settings.stt_provider != "local":
+        sys.exit("set STT_PROVIDER=local")
+
+    ctx = mp.get_context("spawn")
+    worker = sharding._Worker(
+        index=0, inbox=ctx.Queue(), heartbeat=ctx.Value("d", 0.0), outbox=ctx.Queue()
+    )
+    sharding._spawn(ctx, worker)
+    spawned_at = worker.heartbeat.value
+    deadline = time.monotonic() + args.seconds
+    started = False
+    while time.monotonic() < deadline:
+        time.sleep(0.5)
+        if not worker.process.is_alive():
+            break
+        started = started or worker.heartbeat.value > spawned_at
+    alive = worker.process.is_alive()
+    healthy = alive and sharding._is_healthy(worker)
+    sharding._stop([worker])
+    exitcode = worker.process.exitcode
+    print(f"started={started} alive={alive} healthy={healthy} exitcode={exitcode}")
+    if not (started and healthy and exitcode == 0):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""SM-2 throughput: scalar loop vs batch (pure Python and NumPy).
+
+python scripts/sm2_bench.py --cards 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from app.services.srs import np, sm2_update, sm2_update_batch
+
+
+def _cards(count: int, seed: int) -> tuple[list[int], list[int], list[float], list[int]]:
+    rng = random.Random(seed)
+    reps = [rng.randint(0, 20) for _ in range(count)]
+    intervals = [rng.randint(0, 365) for _ in range(count)]
+    efs = [round(rng.uniform(1.3, 3.0), 2) for _ in range(count)]
+    qualities = [rng.choice([0, 3, 4, 5]) for _ in range(count)]
+    return reps, intervals, efs, qualities
+
+
+def _report(name: str, count: int, seconds: float) -> None:
+    print(f"{name:<14} cards={count} seconds={seconds:.3f} cards_per_sec={count / seconds:,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    reps, intervals, efs, qualities = _cards(args.cards, args.seed)
+    now = datetime.utcnow()
+
+    start = time.perf_counter()
+    for r, i, ef, q in zip(reps, intervals, efs, qualities):
+        sm2_update(r, i, ef, q, now=now)
+    _report("scalar_loop", args.cards, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    sm2_update_batch(reps, intervals, efs, qualities, now=now, use_numpy=False)
+    _report("batch_python", args.cards, time.perf_counter() - start)
+
+    if np is None:
+        print("numpy is not installed, skipping batch_numpy")
+        return
+    arrays = (
+        np.asarray(reps, dtype=np.int64),
+        np.asarray(intervals, dtype=np.int64),
+        np.asarray(efs, dtype=np.float64),
+        np.asarray(qualities, dtype=np.int64),
+    )
+    start = time.perf_counter()
+    sm2_update_batch(*arrays, now=now, use_numpy=True)
+    _report("batch_numpy", args.cards, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
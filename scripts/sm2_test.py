@@ -1,6 +1,7 @@
+import random
 from datetime import datetime, timedelta
 
-from app.services.srs import sm2_update
+from app.services.srs import np, sm2_update, sm2_update_batch
 
 
 def _approx_days(delta: timedelta) -> int:
@@ -36,7 +37,33 @@ def case_lapse() -> None:
     assert _approx_days(due_at - datetime.utcnow()) in {1, 0}
 
 
+def case_batch_matches_scalar() -> None:
+    rng = random.Random(42)
+    now = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    size = 20_000
+    reps = [rng.randint(0, 30) for _ in range(size)]
+    intervals = [rng.choice([0, 1, 2, 6, rng.randint(0, 3650)]) for _ in range(size)]
+    efs = [rng.choice([1.3, 2.5, round(rng.uniform(1.3, 3.5), 2), rng.uniform(1.0, 4.0)]) for _ in range(size)]
+    qualities = [rng.randint(0, 5) for _ in range(size)]
+    expected = [
+        sm2_update(r, i, ef, q, now=now) for r, i, ef, q in zip(reps, intervals, efs, qualities)
+    ]
+    backends = [False] + ([True] if np is not None else [])
+    for use_numpy in backends:
+        batch = sm2_update_batch(reps, intervals, efs, qualities, now=now, use_numpy=use_numpy)
+        for idx, (r, i, ef, due_at, lapses) in enumerate(expected):
+            assert int(batch.repetitions[idx]) == r
+            assert int(batch.interval_days[idx]) == i
+            assert float(batch.ease_factors[idx]) == ef
+            assert int(batch.lapses[idx]) == lapses
+            got_due = batch.due_at[idx]
+            if use_numpy:
+                got_due = got_due.astype(datetime)
+            assert got_due == due_at
+
+
 if __name__ == "__main__":
     case_good_chain()
     case_lapse()
+    case_batch_matches_scalar()
     print("SM-2 tests passed.")
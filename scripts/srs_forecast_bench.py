@@ -0,0 +1,56 @@
+"""SRS forecast simulation on synthetic cards (no database).
+
+python scripts/srs_forecast_bench.py --cards 10000000 --users 50000 --days 30
+"""
+
+import argparse
+import time
+
+from app.services.srs import np
+from app.services.srs_forecast import ForecastCards, build_quality_histogram, simulate_due_counts
+
+
+def _cards(count: int, users: int, seed: int) -> ForecastCards:
+    rng = np.random.default_rng(seed)
+    return ForecastCards(
+        user_ids=rng.integers(1, users + 1, count, dtype=np.int64),
+        repetitions=rng.integers(0, 12, count, dtype=np.int32),
+        intervals=rng.integers(0, 120, count, dtype=np.int32),
+        ease_factors=rng.uniform(1.3, 3.0, count),
+        due_days=rng.integers(-10, 60, count, dtype=np.int32),
+    )
+
+
+def _history(users: int, seed: int) -> list[tuple[int, int, int]]:
+    rng = np.random.default_rng(seed + 1)
+    counts = []
+    # Every other user has history; the rest fall back to the global distribution.
+    for user_id in range(1, users + 1, 2):
+        for q in (0, 3, 4, 5):
+            counts.append((user_id, q, int(rng.integers(0, 50))))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if np is None:
+        print("numpy is not installed")
+        return
+    cards = _cards(args.cards, args.users, args.seed)
+    hist_user_ids, hist_counts = build_quality_histogram(_history(args.users, args.seed))
+
+    start = time.perf_counter()
+    daily, overdue = simulate_due_counts(cards, hist_user_ids, hist_counts, args.days, seed=args.seed)
+    seconds = time.perf_counter() - start
+    print(f"cards={args.cards} days={args.days} seconds={seconds:.2f} overdue={overdue}")
+    print(f"peak={max(daily)} first_days={daily[:7]}")
+
+
+if __name__ == "__main__":
+    main()
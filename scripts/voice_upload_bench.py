@@ -0,0 +1,121 @@
+"""Voice upload: direct OGG/Opus vs ffmpeg WAV transcode (local sink server, needs ffmpeg).
+
+python scripts/voice_upload_bench.py --seconds 5 --runs 20 --uplink-kbps 1000
+python scripts/voice_upload_bench.py --input voice.ogg
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from app.utils.audio import VoiceAudio
+
+
+def _synthetic_voice(seconds: int) -> bytes:
+    # Roughly what Telegram sends: mono Opus at 48 kHz, low bitrate.
+    return subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={seconds}",
+            "-ac",
+            "1",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            "32k",
+            "-f",
+            "ogg",
+            "pipe:1",
+        ],
+        check=True,
+        capture_output=True,
+    ).stdout
+
+
+def _sink(uplink_kbps: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _read_body(self) -> int:
+            if self.headers.get("transfer-encoding") == "chunked":
+                size = 0
+                while True:
+                    length = int(self.rfile.readline().strip(), 16)
+                    if length == 0:
+                        self.rfile.readline()
+                        return size
+                    size += len(self.rfile.read(length))
+                    self.rfile.readline()
+            return len(self.rfile.read(int(self.headers.get("content-length", 0))))
+
+        def do_POST(self) -> None:
+            size = self._read_body()
+            if uplink_kbps:
+                # Model a mobile-grade uplink between the bot and the provider.
+                time.sleep(size * 8 / (uplink_kbps * 1000))
+            body = str(size).encode()
+            self.send_response(200)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(url: str, audio: VoiceAudio, runs: int) -> tuple[list[float], int]:
+    timings = []
+    sent = 0
+    async with httpx.AsyncClient(timeout=60) as client:
+        for _ in range(runs):
+            started = time.perf_counter()
+            response = await client.post(url, content=audio.upload_body())
+            timings.append((time.perf_counter() - started) * 1000)
+            sent = int(response.text)
+    return timings, sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", help="OGG/Opus file; synthetic tone if omitted")
+    parser.add_argument("--seconds", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--uplink-kbps", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as f:
+            data = f.read()
+    else:
+        data = _synthetic_voice(args.seconds)
+    server = _sink(args.uplink_kbps)
+    url = f"http://127.0.0.1:{server.server_port}/upload"
+
+    print(f"input={len(data)} bytes runs={args.runs} uplink_kbps={args.uplink_kbps or 'unlimited'}")
+    for label, transcode in (("ogg-direct", False), ("wav-transcode", True)):
+        timings, sent = asyncio.run(_run(url, VoiceAudio(data, transcode=transcode), args.runs))
+        print(
+            f"{label:14} bytes_sent={sent:>8} "
+            f"p50_ms={statistics.median(timings):7.1f} max_ms={max(timings):7.1f}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
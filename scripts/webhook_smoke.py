@@ -0,0 +1,103 @@
+"""Local webhook smoke test against a fake Telegram Bot API.
+
+1) Run the fake Bot API:
+   python scripts/webhook_smoke.py api --port 8081
+2) Start the bot with BOT_MODE=webhook, TELEGRAM_API_BASE_URL=http://127.0.0.1:8081,
+   WEBHOOK_BASE_URL=http://127.0.0.1:8080 and WEBHOOK_SECRET=<secret>
+3) Push synthetic updates and measure ack latency:
+   python scripts/webhook_smoke.py push --secret <secret> --count 200
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from aiohttp import ClientSession, web
+
+_message_ids = itertools.count(1)
+
+
+def _fake_result(method: str, payload: dict) -> object:
+    now = int(time.time())
+    if method == "getme":
+        return {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+    if method == "getchat":
+        return {"id": int(payload.get("chat_id", 0)), "type": "private", "first_name": "Fake"}
+    if method in {"sendmessage", "editmessagetext"}:
+        chat_id = int(payload.get("chat_id", 0) or 0)
+        return {
+            "message_id": next(_message_ids),
+            "date": now,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": payload.get("text", ""),
+        }
+    return True
+
+
+async def _api_handler(request: web.Request) -> web.Response:
+    method = request.match_info["method"].lower()
+    payload = dict(await request.post())
+    print(f"API {method} {payload}")
+    return web.json_response({"ok": True, "result": _fake_result(method, payload)})
+
+
+def run_api(port: int) -> None:
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", _api_handler)
+    web.run_app(app, host="127.0.0.1", port=port)
+
+
+def _update(update_id: int, user_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Smoke"},
+            "text": "/help",
+        },
+    }
+
+
+async def push(url: str, secret: str, count: int, users: int) -> None:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret}
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    async with ClientSession() as session:
+
+        async def _send(update_id: int) -> None:
+            start = time.monotonic()
+            async with session.post(
+                url, json=_update(update_id, 1000 + update_id % users), headers=headers
+            ) as response:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append((time.monotonic() - start) * 1000)
+
+        await asyncio.gather(*(_send(i) for i in range(1, count + 1)))
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"statuses={statuses} ack_p50_ms={p50:.1f} ack_p99_ms={p99:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    api = sub.add_parser("api")
+    api.add_argument("--port", type=int, default=8081)
+    pusher = sub.add_parser("push")
+    pusher.add_argument("--url", default="http://127.0.0.1:8080/telegram/webhook")
+    pusher.add_argument("--secret", default="")
+    pusher.add_argument("--count", type=int, default=100)
+    pusher.add_argument("--users", type=int, default=10)
+    args = parser.parse_args()
+    if args.command == "api":
+        run_api(args.port)
+    else:
+        asyncio.run(push(args.url, args.secret, args.count, args.users))
+
+
+if __name__ == "__main__":
+    main()